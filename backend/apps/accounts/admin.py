@@ -1,5 +1,6 @@
 from apps.accounts.forms import UserChangeForm, UserCreateForm
 from apps.accounts.models import Profile
+from apps.accounts.services import add_users_to_group
 from base.widgets import DateSelectorWidget
 from django.contrib import admin
 from django.contrib.auth import get_user_model, models
@@ -59,20 +60,25 @@ class ProfileResource(resources.ModelResource):
         report_skipped = False
 
 
+def put_to_group(modeladmin, request, queryset, name: str):
+    """Add selected users to the group in bulk."""
+    group = models.Group.objects.get(name=name)
+    added = add_users_to_group(queryset, group)
+    modeladmin.message_user(
+        request,
+        _("%(added)d user(s) added to %(group)s, %(skipped)d already there.")
+        % {"added": added, "group": group.name, "skipped": queryset.count() - added},
+    )
+
+
 @admin.action(description="Add to Recruiters")
 def put_to_recruiters(self, request, queryset):
-    group = models.Group.objects.get(name="Recruiter")
-    for user in queryset:
-        if not user.has_group("Recruiter"):
-            user.groups.add(group)
+    put_to_group(self, request, queryset, "Recruiter")
 
 
 @admin.action(description="Add to Reviewers")
 def put_to_reviewers(self, request, queryset):
-    group = models.Group.objects.get(name="Reviewer")
-    for user in queryset:
-        if not user.has_group("Reviewer"):
-            user.groups.add(group)
+    put_to_group(self, request, queryset, "Reviewer")
 
 
 class CustomUserInline(admin.TabularInline):
@@ -109,6 +115,10 @@ class UserAdmin(ImportExportMixin, BaseUserAdmin):
     search_fields = ("email",)
     ordering = ("id",)
 
+    def get_queryset(self, request):
+        """Prefetch groups shown in the list."""
+        return super().get_queryset(request).with_access(permissions=False)
+
 
 @admin.register(Profile)
 class ProfileAdmin(ImportExportMixin, admin.ModelAdmin):
@@ -1,4 +1,5 @@
 import django_filters
+from apps.accounts.search import name_lookup
 from django.contrib.auth import get_user_model
 
 UserModel = get_user_model()
@@ -6,12 +7,16 @@ UserModel = get_user_model()
 
 class UserFilter(django_filters.FilterSet):
     first_name = django_filters.CharFilter(
-        field_name="user_profile__first_name", lookup_expr="icontains"
+        field_name="user_profile__first_name", method="filter_name"
     )
     last_name = django_filters.CharFilter(
-        field_name="user_profile__last_name", lookup_expr="icontains"
+        field_name="user_profile__last_name", method="filter_name"
     )
 
     class Meta:
         model = UserModel
         fields = ("email", "first_name", "last_name")
+
+    def filter_name(self, queryset, name, value):
+        """Match names with the indexed lookup of the user search."""
+        return queryset.filter(**{f"{name}__{name_lookup(queryset, value)}": value})
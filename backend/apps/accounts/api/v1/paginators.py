@@ -1,7 +1,6 @@
-from rest_framework.pagination import PageNumberPagination
+from base.pagination import KeysetPagination
 
 
-class UserListPagination(PageNumberPagination):
+class UserListPagination(KeysetPagination):
     page_size = 10
-    page_size_query_param = "page_size"
     max_page_size = 100
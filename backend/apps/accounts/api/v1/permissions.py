@@ -6,3 +6,31 @@ class IsUserAccount(permissions.BasePermission):
 
     def has_object_permission(self, request, view, obj):
         return request.user == obj
+
+
+class ModelPermissions(permissions.DjangoModelPermissions):
+    """
+    DjangoModelPermissions which check permissions cached on the user instance
+    (User.permission_codenames), so they are loaded at most once per request.
+    """
+
+    def has_permission(self, request, view):
+        user = request.user
+        if not user or (not user.is_authenticated and self.authenticated_users_only):
+            return False
+        if getattr(view, "_ignore_model_permissions", False):
+            return True
+
+        perms = self.get_required_permissions(request.method, self._queryset(view).model)
+        if user.is_active and user.is_superuser:
+            return True
+        return user.permission_codenames.issuperset(perms)
+
+
+class ChangeModelPermissions(ModelPermissions):
+    """ModelPermissions which require the change permission for POST requests."""
+
+    perms_map = {
+        **ModelPermissions.perms_map,
+        "POST": ["%(app_label)s.change_%(model_name)s"],
+    }
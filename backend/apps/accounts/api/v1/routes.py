@@ -9,5 +9,8 @@ urlpatterns = [
     path("password_reset/", include("django_rest_passwordreset.urls", namespace="password_reset")),
     # USER CRUD
     path("users/", views.UserListAPIView.as_view(), name="user_list"),
+    path("users/autocomplete/", views.UserAutocompleteAPIView.as_view(), name="user_autocomplete"),
     path("users/<int:pk>/", views.UserRetrieveUpdateDestroyAPIView.as_view(), name="user_detail"),
+    # GROUPS
+    path("groups/<int:pk>/members/", views.GroupMembersAPIView.as_view(), name="group_members"),
 ]
@@ -1,3 +1,4 @@
+from apps.accounts.avatars import avatar_urls
 from apps.accounts.models import Profile
 from django.contrib.auth import get_user_model
 from rest_framework import serializers
@@ -44,9 +45,23 @@ class UserLoginSerializer(serializers.Serializer):
         fields = ("email", "password")
 
 
+class AvatarField(serializers.ImageField):
+    """
+    Image field which represents an avatar with urls of its sizes, stored when they
+    were created, so the image itself is never read while serializing.
+    """
+
+    def to_representation(self, value):
+        if not value:
+            return None
+        return avatar_urls(value.instance, self.context.get("request"))
+
+
 class ProfileSerializer(serializers.ModelSerializer):
     """Serializer for the Profile model."""
 
+    avatar_image = AvatarField(required=False, allow_null=True)
+
     class Meta:
         model = Profile
         fields = (
@@ -70,6 +85,9 @@ class UserListSerializer(serializers.ModelSerializer):
     """Serializer for the user list api endpoint."""
 
     profile_info = ProfileSerializer(source="user_profile")
+    groups = serializers.ListField(
+        source="group_names", child=serializers.CharField(), read_only=True
+    )
 
     class Meta:
         model = UserModel
@@ -77,6 +95,7 @@ class UserListSerializer(serializers.ModelSerializer):
             "id",
             "email",
             "profile_info",
+            "groups",
         )
 
 
@@ -107,3 +126,9 @@ class UserRetrieveUpdateDestroySerializer(serializers.ModelSerializer):
         instance.email = validated_data.get("email", instance.email)
         instance.save()
         return instance
+
+
+class GroupMembersSerializer(serializers.Serializer):
+    """Serializer for the bulk group membership endpoint."""
+
+    user_ids = serializers.ListField(child=serializers.IntegerField(min_value=1), allow_empty=False)
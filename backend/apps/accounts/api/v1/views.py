@@ -1,23 +1,34 @@
-import requests
 from apps.accounts.api.v1.filters import UserFilter
 from apps.accounts.api.v1.paginators import UserListPagination
-from apps.accounts.api.v1.permissions import IsUserAccount
+from apps.accounts.api.v1.permissions import ChangeModelPermissions, IsUserAccount
 from apps.accounts.api.v1.serializers import (
+    GroupMembersSerializer,
     UserCreateSerializer,
     UserListSerializer,
     UserLoginSerializer,
     UserRetrieveUpdateDestroySerializer,
 )
-from apps.accounts.tasks import send_verification_email
+from apps.accounts.search import UserSearchFilter, search_users
+from apps.accounts.services import add_users_to_group
+from apps.accounts.tasks import queue_verification_email
 from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group, update_last_login
 from django.contrib.auth.tokens import default_token_generator
 from django.db.models import F
-from django.urls import reverse
 from django_filters import rest_framework as django_filters
 from rest_framework import filters, permissions, status
 from rest_framework.decorators import api_view
-from rest_framework.generics import CreateAPIView, ListAPIView, RetrieveUpdateDestroyAPIView
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.generics import (
+    CreateAPIView,
+    GenericAPIView,
+    ListAPIView,
+    RetrieveUpdateDestroyAPIView,
+)
 from rest_framework.response import Response
+from rest_framework.views import APIView
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
 
 UserModel = get_user_model()
 
@@ -60,7 +71,7 @@ class UserCreateAPIView(CreateAPIView):
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         user = serializer.save()
-        send_verification_email.delay(user_id=user.id)  # initiate celery task to send an email
+        queue_verification_email(user)  # initiate celery task to send an email
 
         return Response(
             {
@@ -81,6 +92,9 @@ class UserLoginAPIView(CreateAPIView):
         """
         Return JWT token if such user has already been registered.
         Send a confirmation email if account is inactive.
+
+        Tokens are issued in-process, the password is checked only here and
+        the response is the same as the one of `token_obtain_pair` endpoint.
         """
 
         serializer = self.get_serializer(data=request.data)
@@ -94,22 +108,34 @@ class UserLoginAPIView(CreateAPIView):
             )
         # User is inactive
         if not user.is_active:
-            send_verification_email.delay(user_id=user.id)  # run celery task to send an email
+            # run celery task to send an email, unless it has been queued recently
+            suppressed = not queue_verification_email(user)
             return Response(
                 {
-                    "message": "You have not activated your account yet."
-                    "Verification email has been sent to your email address. "
-                    "Please check your inbox."
+                    "message": "You have not activated your account yet. "
+                    "Verification email has {}been sent to your email address. "
+                    "Please check your inbox.".format("already " if suppressed else ""),
+                    "email_suppressed": suppressed,
                 },
                 status=status.HTTP_403_FORBIDDEN,
             )
 
+        # Wrong password
+        if not user.check_password(serializer.validated_data.get("password")):
+            raise AuthenticationFailed(
+                TokenObtainPairSerializer.default_error_messages["no_active_account"],
+                "no_active_account",
+            )
+
         # Obtain JWT token
-        response = requests.post(
-            url=request.build_absolute_uri(reverse("token_obtain_pair")), data=request.data
-        )
+        refresh = TokenObtainPairSerializer.get_token(user)
+        if jwt_settings.UPDATE_LAST_LOGIN:
+            update_last_login(None, user)
 
-        return Response(response.json(), status=status.HTTP_200_OK)
+        return Response(
+            {"refresh": str(refresh), "access": str(refresh.access_token)},
+            status=status.HTTP_200_OK,
+        )
 
 
 class UserListAPIView(ListAPIView):
@@ -128,27 +154,69 @@ class UserListAPIView(ListAPIView):
     permission_classes = [permissions.IsAuthenticated]
     filter_backends = [
         django_filters.DjangoFilterBackend,
-        filters.SearchFilter,
         filters.OrderingFilter,
+        UserSearchFilter,
     ]
     filterset_class = UserFilter
-    search_fields = ("=email", "user_profile__first_name", "user_profile__last_name")
     ordering_fields = ("email", "first_name", "last_name")
     ordering = ("first_name", "last_name")
 
     def get_queryset(self):
         """
         Annotate a queryset to be able to use user's `first_name` and `last_name`
-        with `ordering` query parameter.
+        with `ordering` query parameter. Profiles and groups are loaded with a
+        constant number of queries for any page size.
         """
 
         return (
             UserModel.objects.filter(is_active=True)
+            .select_related("user_profile")
+            .with_access(permissions=False)
             .annotate(first_name=F("user_profile__first_name"))
             .annotate(last_name=F("user_profile__last_name"))
         )
 
 
+class UserAutocompleteAPIView(APIView):
+    """
+    Autocomplete view for the User model.
+
+    API
+    ---
+    get:
+        Return up to `limit` (10 by default, 20 at most) active users matching the
+        `q` query parameter, the best matches first. Only the id, email and names
+        are returned, with a single query and without pagination.
+
+    """
+
+    permission_classes = [permissions.IsAuthenticated]
+    default_limit = 10
+    max_limit = 20
+
+    def get(self, request, *args, **kwargs):
+        """Return users matching the search term."""
+        term = request.query_params.get("q", "")
+        try:
+            limit = min(int(request.query_params.get("limit", self.default_limit)), self.max_limit)
+        except ValueError:
+            limit = self.default_limit
+        if not term.split() or limit < 1:
+            return Response([], status=status.HTTP_200_OK)
+
+        users = (
+            search_users(UserModel.objects.filter(is_active=True), term)
+            .order_by("search_rank", "user_profile__last_name", "user_profile__first_name", "id")
+            .values(
+                "id",
+                "email",
+                first_name=F("user_profile__first_name"),
+                last_name=F("user_profile__last_name"),
+            )
+        )
+        return Response(list(users[:limit]), status=status.HTTP_200_OK)
+
+
 class UserRetrieveUpdateDestroyAPIView(RetrieveUpdateDestroyAPIView):
     """
     GET / UPDATE / DELETE view for the User model.
@@ -194,3 +262,33 @@ class UserRetrieveUpdateDestroyAPIView(RetrieveUpdateDestroyAPIView):
     def perform_destroy(self, instance):
         instance.is_active = False
         instance.save(update_fields=["is_active"])
+
+
+class GroupMembersAPIView(GenericAPIView):
+    """
+    Bulk membership view for the Group model, available to staff who can change groups.
+
+    API
+    ---
+    post <id>:
+        Add users with the given ids to the group. Users who are already in the
+        group and unknown ids are skipped.
+
+    """
+
+    queryset = Group.objects.all()
+    serializer_class = GroupMembersSerializer
+    permission_classes = [permissions.IsAdminUser, ChangeModelPermissions]
+
+    def post(self, request, *args, **kwargs):
+        """Add users to the group. Return numbers of added and skipped users."""
+        group = self.get_object()
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        user_ids = set(serializer.validated_data["user_ids"])
+        added = add_users_to_group(UserModel.objects.filter(id__in=user_ids), group)
+        return Response(
+            {"added": added, "skipped": len(user_ids) - added},
+            status=status.HTTP_200_OK,
+        )
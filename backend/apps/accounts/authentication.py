@@ -0,0 +1,60 @@
+from base.cache import bump_version, get_versions
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+UserModel = get_user_model()
+# Fields of the user which are never cached, they are loaded from the database on access.
+UNCACHED_FIELDS = ("password",)
+
+
+def _version_key(user_id) -> str:
+    return f"auth-user-version:{user_id}"
+
+
+def invalidate_cached_user(user_id):
+    """
+    Drop the cached user by moving to a new version of the entry. A request that loaded
+    the user before the change stores it under the old version, so it is never served.
+    """
+    bump_version(_version_key(user_id))
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWT authentication which takes the user of a token from the shared cache instead of
+    loading it from the database on every request. Entries are keyed by the user id and
+    the version of the entry, and live for settings.AUTH_USER_CACHE_TIMEOUT seconds.
+    The version is bumped whenever the user, its groups or permissions change (see
+    signals), so a deactivated user or the one with changed password, groups or
+    permissions is loaded again. The password hash is never cached, it is deferred on
+    cached users.
+    """
+
+    def get_user(self, validated_token):
+        """Return the user of the token from the cache, load it on a miss."""
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        version_key = _version_key(user_id)
+        version = get_versions([version_key]).get(version_key)
+        key = f"auth-user:{user_id}:{version}"
+        values = cache.get(key)
+        if values is not None:
+            return UserModel.from_db(DEFAULT_DB_ALIAS, list(values), list(values.values()))
+
+        user = super().get_user(validated_token)
+        values = {
+            field.attname: getattr(user, field.attname)
+            for field in UserModel._meta.concrete_fields
+            if field.name not in UNCACHED_FIELDS
+        }
+        cache.set(key, values, settings.AUTH_USER_CACHE_TIMEOUT)
+        return user
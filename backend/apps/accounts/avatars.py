@@ -0,0 +1,76 @@
+from django.conf import settings
+from django.db import connection
+from versatileimagefield.utils import build_versatileimagefield_url_set, get_rendition_key_set
+
+from .models import Profile
+
+
+def renditions_are_current(profile: Profile) -> bool:
+    """Return True if stored renditions were created from the current avatar."""
+    return bool(profile.avatar_image) and (
+        profile.avatar_renditions.get("source") == profile.avatar_image.name
+    )
+
+
+def avatar_files(profile: Profile, name: str = None) -> list[str]:
+    """
+    Return storage names of the profile avatar (or of the avatar `name` the profile
+    used to have) and of all its sizes from settings.AVATAR_RENDITION_KEY_SET.
+    """
+    field = Profile._meta.get_field("avatar_image")
+    image = field.attr_class(profile, field, name) if name else profile.avatar_image
+    if not image:
+        return []
+
+    image.create_on_demand = False
+    names = [image.name]
+    for _, size_key in get_rendition_key_set(settings.AVATAR_RENDITION_KEY_SET):
+        if size_key != "url":
+            sizer, size = size_key.split("__")
+            names.append(getattr(image, sizer)[size].name)
+    return names
+
+
+def warm_avatar(profile_id: int) -> bool:
+    """
+    Create all sizes of the profile avatar listed in settings.AVATAR_RENDITION_KEY_SET
+    and store their urls. Return False if the profile has no avatar or it has been
+    replaced in the meantime, so the urls of a newer upload are never overwritten.
+    """
+    profile = Profile.objects.filter(id=profile_id).only("id", "avatar_image").first()
+    if profile is None or not profile.avatar_image:
+        return False
+
+    image = profile.avatar_image
+    image.create_on_demand = True
+    urls = build_versatileimagefield_url_set(
+        image, get_rendition_key_set(settings.AVATAR_RENDITION_KEY_SET)
+    )
+    updated = Profile.objects.filter(id=profile_id, avatar_image=image.name).update(
+        avatar_renditions={"source": image.name, **urls}
+    )
+    return bool(updated)
+
+
+def warm_avatar_in_thread(profile_id: int) -> bool:
+    """Run warm_avatar() in a worker thread, which has its own database connection."""
+    try:
+        return warm_avatar(profile_id)
+    finally:
+        connection.close()
+
+
+def avatar_urls(profile: Profile, request=None) -> dict:
+    """
+    Return urls of the avatar sizes without touching the image itself. Until the
+    renditions are created, only the url of the uploaded image is returned.
+    """
+    if not profile.avatar_image:
+        return None
+    if renditions_are_current(profile):
+        urls = {key: url for key, url in profile.avatar_renditions.items() if key != "source"}
+    else:
+        urls = {"full_size": profile.avatar_image.url}
+    if request is not None:
+        urls = {key: request.build_absolute_uri(url) for key, url in urls.items()}
+    return urls
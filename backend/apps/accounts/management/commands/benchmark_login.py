@@ -0,0 +1,119 @@
+import json
+import statistics
+from threading import Thread
+from time import perf_counter
+from uuid import uuid4
+
+import requests
+from apps.accounts.api.v1.views import UserLoginAPIView
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.core.servers.basehttp import ThreadedWSGIServer, WSGIRequestHandler
+from django.core.wsgi import get_wsgi_application
+from django.test import override_settings
+from django.urls import include, path, reverse
+from rest_framework import status
+from rest_framework.response import Response
+
+UserModel = get_user_model()
+
+
+class BaselineLoginAPIView(UserLoginAPIView):
+    """
+    The previous login view: it looked up the user without checking the password and
+    made an HTTP request to token_obtain_pair, which checked it and issued the tokens.
+    """
+
+    def post(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        user = UserModel.objects.filter(email=serializer.data.get("email")).first()
+        if not user or not user.is_active:
+            return Response(status=status.HTTP_403_FORBIDDEN)
+        response = requests.post(
+            url=request.build_absolute_uri(reverse("token_obtain_pair")), data=request.data
+        )
+        return Response(response.json(), status=response.status_code)
+
+
+# The project URLs and the baseline login view, served while the benchmark runs.
+urlpatterns = [
+    path("benchmark/baseline-login/", BaselineLoginAPIView.as_view(), name="baseline_login"),
+    path("", include(settings.ROOT_URLCONF)),
+]
+
+
+class QuietRequestHandler(WSGIRequestHandler):
+    """Request handler which doesn't log every request."""
+
+    def log_message(self, *args):
+        pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare latency of the login endpoint, which issues tokens in-process, with the "
+        "previous login view, which made a second HTTP request to token_obtain_pair. "
+        "Both check the password once. Requests are sent to a server started in this "
+        "process, a temporary user is created for the benchmark and deleted afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=50)
+
+    def handle(self, *args, **options):
+        server = ThreadedWSGIServer(
+            ("127.0.0.1", 0), QuietRequestHandler, allow_reuse_address=False
+        )
+        server.set_app(get_wsgi_application())
+        Thread(target=server.serve_forever, daemon=True).start()
+        base_url = f"http://127.0.0.1:{server.server_port}"
+
+        credentials = {"email": f"benchmark-{uuid4().hex}@example.com", "password": uuid4().hex}
+        user = UserModel.objects.create_user(**credentials)
+        user.is_active = True
+        user.save(update_fields=["is_active"])
+        try:
+            with override_settings(ROOT_URLCONF=__name__), requests.Session() as session:
+                login_url = base_url + reverse("login")
+                baseline_url = base_url + reverse("baseline_login")
+
+                def login():
+                    session.post(login_url, data=credentials).raise_for_status()
+
+                def baseline_login():
+                    session.post(baseline_url, data=credentials).raise_for_status()
+
+                login()  # warm up
+                baseline_login()
+                report = {
+                    "benchmark": "login",
+                    "requests": options["requests"],
+                    "in_process": self.measure(login, options["requests"]),
+                    "http_round_trip": self.measure(baseline_login, options["requests"]),
+                }
+        finally:
+            user.delete()
+            server.shutdown()
+            server.server_close()
+
+        report["speedup"] = round(
+            report["http_round_trip"]["mean_ms"] / report["in_process"]["mean_ms"], 2
+        )
+        self.stdout.write(json.dumps(report))
+
+    @staticmethod
+    def measure(login, count: int) -> dict:
+        """Return latency statistics of `count` logins in milliseconds."""
+        timings = []
+        for _ in range(count):
+            started_at = perf_counter()
+            login()
+            timings.append((perf_counter() - started_at) * 1000)
+        timings.sort()
+        return {
+            "mean_ms": round(statistics.mean(timings), 3),
+            "median_ms": round(statistics.median(timings), 3),
+            "p95_ms": round(timings[int(len(timings) * 0.95) - 1], 3),
+        }
@@ -0,0 +1,49 @@
+import os
+
+from apps.accounts.services import provision_users, read_user_rows
+from apps.accounts.tasks import provision_users as provision_users_task
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = (
+        "Create users with profiles from a CSV file with the email and password columns, "
+        "and optionally is_active, is_staff and profile fields. Passwords are hashed in "
+        "a process pool and users are inserted in chunks. With --background the file is "
+        "read, hashed and inserted by a Celery task (so it has to be readable by the "
+        "workers), whose progress is reported in its PROGRESS state."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="CSV file with a header row")
+        parser.add_argument("--background", action="store_true", help="run as a Celery task")
+        parser.add_argument("--chunk-size", type=int, help="overrides USER_PROVISION_CHUNK_SIZE")
+        parser.add_argument("--processes", type=int, help="overrides USER_PROVISION_PROCESSES")
+
+    def handle(self, *args, **options):
+        try:
+            rows = read_user_rows(options["path"])
+        except OSError as err:
+            raise CommandError(err)
+
+        if options["background"]:
+            result = provision_users_task.delay(
+                path=os.path.abspath(options["path"]),
+                chunk_size=options["chunk_size"],
+                processes=options["processes"],
+            )
+            self.stdout.write(f"Provisioning {len(rows)} users in task {result.id}.")
+            return
+
+        def report_progress(stats: dict):
+            self.stdout.write(
+                "{processed}/{total} rows processed, {created} users created, "
+                "{skipped} skipped.".format(**stats, total=len(rows))
+            )
+
+        provision_users(
+            rows,
+            chunk_size=options["chunk_size"],
+            processes=options["processes"],
+            on_progress=report_progress,
+        )
@@ -0,0 +1,18 @@
+from apps.accounts.tasks import verification_email_stats
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = (
+        "Show numbers of verification emails published to the broker and suppressed "
+        "because one was already pending for the user, counted by all processes."
+    )
+
+    def handle(self, *args, **options):
+        stats = verification_email_stats()
+        total = stats["published"] + stats["suppressed"]
+        self.stdout.write(
+            "{published} published, {suppressed} suppressed ({ratio:.1%} of attempts).".format(
+                ratio=stats["suppressed"] / total if total else 0.0, **stats
+            )
+        )
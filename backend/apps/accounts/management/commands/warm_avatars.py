@@ -0,0 +1,41 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from apps.accounts.avatars import warm_avatar_in_thread
+from apps.accounts.models import Profile
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = (
+        "Create sizes of existing avatars listed in AVATAR_RENDITION_KEY_SET and store "
+        "their urls. Avatars are processed by a pool of threads, only the ones without "
+        "renditions of the current image are processed unless --all is given."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=4, help="number of threads")
+        parser.add_argument("--all", action="store_true", help="recreate existing renditions")
+
+    def handle(self, *args, **options):
+        profiles = (
+            Profile.objects.exclude(avatar_image="")
+            .exclude(avatar_image__isnull=True)
+            .values_list("id", "avatar_image", "avatar_renditions")
+        )
+        profile_ids = [
+            profile_id
+            for profile_id, image, renditions in profiles.iterator()
+            if options["all"] or renditions.get("source") != image
+        ]
+
+        warmed = failed = 0
+        with ThreadPoolExecutor(max_workers=max(options["workers"], 1)) as executor:
+            futures = [executor.submit(warm_avatar_in_thread, pk) for pk in profile_ids]
+            for future in futures:
+                try:
+                    warmed += bool(future.result())
+                except Exception as err:  # a broken image shouldn't stop the backfill
+                    failed += 1
+                    self.stderr.write(f"Failed to create renditions: {err}")
+
+        self.stdout.write(f"{warmed} of {len(profile_ids)} avatars warmed, {failed} failed.")
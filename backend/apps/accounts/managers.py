@@ -1,13 +1,64 @@
-from django.contrib.auth.models import BaseUserManager
+from django.contrib.auth.models import BaseUserManager, Group, Permission
+from django.db.models import Prefetch, QuerySet
 from django.utils.translation import gettext_lazy as _
 
 
-class UserManager(BaseUserManager):
+class UserQuerySet(QuerySet):
+    """
+    This class represents a custom User queryset.
+
+    Methods
+    -------
+    with_access(self, permissions=True):
+        prefetches groups and permissions of the users
+
+    """
+
+    def with_access(self, permissions: bool = True):
+        """Prefetch groups (and permissions) cached by User.group_names and
+        User.permission_codenames, so they take a constant number of queries
+        for any number of users.
+
+        Attributes
+        ----------
+        permissions : bool
+            whether to prefetch permissions of the users and their groups
+
+        """
+        if not permissions:
+            return self.prefetch_related(
+                Prefetch("groups", queryset=Group.objects.only("name"), to_attr="prefetched_groups")
+            )
+
+        permission_queryset = Permission.objects.select_related("content_type")
+        return self.prefetch_related(
+            Prefetch(
+                "groups",
+                queryset=Group.objects.prefetch_related(
+                    Prefetch(
+                        "permissions",
+                        queryset=permission_queryset,
+                        to_attr="prefetched_permissions",
+                    )
+                ),
+                to_attr="prefetched_groups",
+            ),
+            Prefetch(
+                "user_permissions",
+                queryset=permission_queryset,
+                to_attr="prefetched_permissions",
+            ),
+        )
+
+
+class UserManager(BaseUserManager.from_queryset(UserQuerySet)):
     """
     This class represents a custom User manager.
 
     Methods
     -------
+    with_access(self, permissions=True):
+        prefetches groups and permissions of the users
     create_user(self, email, password, **kwargs):
         creates a new user
     create_superuser(self, email, password, **kwargs):
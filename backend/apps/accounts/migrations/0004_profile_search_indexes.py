@@ -0,0 +1,40 @@
+from django.db import migrations
+
+# Trigram indexes serve `icontains` and `istartswith` lookups of the user search, which
+# PostgreSQL runs as UPPER("column"::text) LIKE UPPER(...). Other databases don't need them.
+SEARCH_INDEXES = (
+    ("accounts_profile_first_name_trgm", "accounts_profile", "first_name"),
+    ("accounts_profile_last_name_trgm", "accounts_profile", "last_name"),
+    ("accounts_user_email_trgm", "accounts_user", "email"),
+)
+
+
+def create_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    for name, table, column in SEARCH_INDEXES:
+        schema_editor.execute(
+            f'CREATE INDEX CONCURRENTLY IF NOT EXISTS "{name}" ON "{table}" '
+            f'USING gin (UPPER("{column}"::text) gin_trgm_ops)'
+        )
+
+
+def drop_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for name, _, _ in SEARCH_INDEXES:
+        schema_editor.execute(f'DROP INDEX CONCURRENTLY IF EXISTS "{name}"')
+
+
+class Migration(migrations.Migration):
+    # Indexes are built concurrently, which can't be done in a transaction.
+    atomic = False
+
+    dependencies = [
+        ("accounts", "0003_alter_profile_phone_number"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_indexes, drop_search_indexes),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 4.1 on 2026-10-18 18:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0004_profile_search_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="profile",
+            name="avatar_renditions",
+            field=models.JSONField(
+                blank=True, default=dict, editable=False, verbose_name="Avatar renditions"
+            ),
+        ),
+    ]
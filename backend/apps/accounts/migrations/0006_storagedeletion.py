@@ -0,0 +1,29 @@
+# Generated by Django 4.1 on 2026-10-18 18:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0005_profile_avatar_renditions"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="StorageDeletion",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                ("path", models.CharField(max_length=255, verbose_name="Path")),
+                (
+                    "created_at",
+                    models.DateTimeField(auto_now_add=True, verbose_name="Date created"),
+                ),
+            ],
+        ),
+    ]
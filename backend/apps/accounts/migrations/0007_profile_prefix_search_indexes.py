@@ -0,0 +1,40 @@
+from django.db import migrations
+
+# Pattern indexes serve `istartswith` lookups of the user search, which PostgreSQL runs
+# as UPPER("column"::text) LIKE UPPER('term%'). Terms too short for the trigram indexes
+# of migration 0004 are matched this way. Other databases don't need them.
+PREFIX_INDEXES = (
+    ("accounts_profile_first_name_prefix", "accounts_profile", "first_name"),
+    ("accounts_profile_last_name_prefix", "accounts_profile", "last_name"),
+    ("accounts_user_email_prefix", "accounts_user", "email"),
+)
+
+
+def create_prefix_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for name, table, column in PREFIX_INDEXES:
+        schema_editor.execute(
+            f'CREATE INDEX CONCURRENTLY IF NOT EXISTS "{name}" ON "{table}" '
+            f'(UPPER("{column}"::text) text_pattern_ops)'
+        )
+
+
+def drop_prefix_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for name, _, _ in PREFIX_INDEXES:
+        schema_editor.execute(f'DROP INDEX CONCURRENTLY IF EXISTS "{name}"')
+
+
+class Migration(migrations.Migration):
+    # Indexes are built concurrently, which can't be done in a transaction.
+    atomic = False
+
+    dependencies = [
+        ("accounts", "0006_storagedeletion"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_prefix_indexes, drop_prefix_indexes),
+    ]
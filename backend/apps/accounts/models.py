@@ -4,6 +4,7 @@ from base.models import GenderChoices
 from django.contrib.auth.models import AbstractBaseUser, PermissionsMixin
 from django.core.validators import MaxValueValidator, RegexValidator
 from django.db import models
+from django.utils.functional import cached_property
 from django.utils.timezone import now
 from django.utils.translation import gettext_lazy as _
 from phonenumber_field.modelfields import PhoneNumberField
@@ -24,6 +25,16 @@ class TelegramUsernameValidator(RegexValidator):
     )
 
 
+# Attributes holding prefetched groups and permissions, and the cache of ModelBackend.
+ACCESS_CACHE_ATTRIBUTES = (
+    "prefetched_groups",
+    "prefetched_permissions",
+    "_perm_cache",
+    "_user_perm_cache",
+    "_group_perm_cache",
+)
+
+
 class User(PermissionsMixin, AbstractBaseUser):
     """
     This class defines a custom User model.
@@ -37,10 +48,17 @@ class User(PermissionsMixin, AbstractBaseUser):
     is_staff : bool
         determines whether user has admin rights
 
+    group_names : tuple
+        names of the user groups, cached on the instance
+    permission_codenames : frozenset
+        "<app_label>.<codename>" of all the user permissions, cached on the instance
+
     Methods
     ----------
     has_group(name: str)
         returns True if user is in group
+    clear_access_cache()
+        drops groups and permissions cached on the instance
 
     """
 
@@ -73,13 +91,56 @@ class User(PermissionsMixin, AbstractBaseUser):
         """Has access to the admin site?"""
         return self.is_staff
 
+    @cached_property
+    def group_names(self) -> tuple:
+        """
+        Names of the user groups. They are loaded once per instance, and users of a
+        queryset with `with_access()` take them from the prefetched groups.
+        """
+        groups = getattr(self, "prefetched_groups", None)
+        if groups is None:
+            return tuple(self.groups.values_list("name", flat=True))
+        return tuple(group.name for group in groups)
+
+    @cached_property
+    def permission_codenames(self) -> frozenset:
+        """
+        Permissions of the user and its groups, like `get_all_permissions()` returns.
+        They are loaded once per instance, and users of a queryset with `with_access()`
+        take them from the prefetched permissions. The permission cache of ModelBackend
+        is filled as well, so `has_perm()` doesn't query them again.
+        """
+        groups = getattr(self, "prefetched_groups", None)
+        user_permissions = getattr(self, "prefetched_permissions", None)
+        if not self.is_active:
+            return frozenset()
+        if self.is_superuser or groups is None or user_permissions is None:
+            return frozenset(self.get_all_permissions())
+        if not all(hasattr(group, "prefetched_permissions") for group in groups):
+            return frozenset(self.get_all_permissions())
+
+        def codenames(permissions) -> set[str]:
+            return {f"{perm.content_type.app_label}.{perm.codename}" for perm in permissions}
+
+        self._user_perm_cache = codenames(user_permissions)
+        self._group_perm_cache = codenames(
+            perm for group in groups for perm in group.prefetched_permissions
+        )
+        self._perm_cache = self._user_perm_cache | self._group_perm_cache
+        return frozenset(self._perm_cache)
+
+    def clear_access_cache(self):
+        """Drop groups and permissions cached on the instance."""
+        for name in (*ACCESS_CACHE_ATTRIBUTES, "group_names", "permission_codenames"):
+            self.__dict__.pop(name, None)
+
     def has_group(self, name: str) -> bool:
         """Return True if user is in group"""
-        return self.groups.filter(name__in=name).exists()
+        return name in self.group_names
 
     def user_groups(self) -> str:
         """Return list of user groups"""
-        return ", ".join([group.name for group in self.groups.all()])
+        return ", ".join(self.group_names)
 
 
 class Profile(models.Model):
@@ -104,6 +165,8 @@ class Profile(models.Model):
         a phone number of the user
     avatar_image :
         a profile image
+    avatar_renditions :
+        urls of the avatar sizes, created by a Celery task after upload
     linkedin_url :
         url to user's LinkedIn profile
     telegram_username :
@@ -154,6 +217,12 @@ class Profile(models.Model):
         blank=True,
         upload_to="profile_images/",
     )
+    avatar_renditions = models.JSONField(
+        _("Avatar renditions"),
+        default=dict,
+        blank=True,
+        editable=False,
+    )
     linkedin_url = models.URLField(
         _("LinkedIn profile"),
         null=True,
@@ -207,3 +276,26 @@ class Profile(models.Model):
 
     def __str__(self) -> str:
         return self.full_name
+
+
+class StorageDeletion(models.Model):
+    """
+    An outbox of files to be deleted from the default storage. Files are recorded in
+    the transaction that drops the last reference to them and deleted in batches by
+    a Celery task (see apps.accounts.storage), so deleting rows never waits for the
+    storage.
+
+    Attributes
+    ----------
+    path :
+        a name of the file in the default storage
+    created_at :
+        a date the deletion was recorded
+    """
+
+    path = models.CharField(_("Path"), max_length=255)
+    created_at = models.DateTimeField(_("Date created"), auto_now_add=True)
+
+    def __str__(self) -> str:
+        """Return readable representation of the model."""
+        return self.path
@@ -0,0 +1,76 @@
+from django.db import connections
+from django.db.models import Case, IntegerField, Q, QuerySet, Value, When
+from rest_framework.filters import BaseFilterBackend
+
+# Fields of the User model matched by the search and their ranks, lower is better.
+NAME_FIELDS = ("user_profile__first_name", "user_profile__last_name")
+EMAIL_FIELD = "email"
+# Words of the search term beyond MAX_SEARCH_WORDS are ignored.
+MAX_SEARCH_WORDS = 4
+# Trigram indexes serve only terms of at least TRIGRAM_MIN_LENGTH characters.
+TRIGRAM_MIN_LENGTH = 3
+
+
+def name_lookup(queryset: QuerySet, word: str) -> str:
+    """
+    Return the lookup used to match names with the word. PostgreSQL matches any part
+    of a name, which is served by trigram indexes on UPPER(name) (see migration 0004).
+    Shorter words, e.g. the first keystrokes of autocomplete, and other databases
+    (SQLite in DEBUG mode) match the beginning of a name only, which is served by
+    pattern indexes on UPPER(name) (see migration 0007).
+    """
+    if connections[queryset.db].vendor == "postgresql" and len(word) >= TRIGRAM_MIN_LENGTH:
+        return "icontains"
+    return "istartswith"
+
+
+def search_users(queryset: QuerySet, term: str) -> QuerySet:
+    """
+    Filter users whose first name, last name or email matches every word of the term,
+    and annotate them with `search_rank`: 0 if a name starts with the first word,
+    1 if the email does, 2 otherwise.
+    """
+    words = term.split()[:MAX_SEARCH_WORDS]
+    if not words:
+        return queryset
+
+    for word in words:
+        lookup = name_lookup(queryset, word)
+        condition = Q(**{f"{EMAIL_FIELD}__istartswith": word})
+        for field in NAME_FIELDS:
+            condition |= Q(**{f"{field}__{lookup}": word})
+        queryset = queryset.filter(condition)
+
+    name_prefix = Q()
+    for field in NAME_FIELDS:
+        name_prefix |= Q(**{f"{field}__istartswith": words[0]})
+    return queryset.annotate(
+        search_rank=Case(
+            When(name_prefix, then=Value(0)),
+            When(**{f"{EMAIL_FIELD}__istartswith": words[0]}, then=Value(1)),
+            default=Value(2),
+            output_field=IntegerField(),
+        )
+    )
+
+
+class UserSearchFilter(BaseFilterBackend):
+    """
+    Filter backend which searches users with `search_users()` by the `search` query
+    parameter. Unless the `ordering` parameter is given, the best matches go first,
+    and the view ordering only breaks ties. It has to follow OrderingFilter in the
+    `filter_backends` of a view.
+    """
+
+    search_param = "search"
+    ordering_param = "ordering"
+
+    def filter_queryset(self, request, queryset, view):
+        term = request.query_params.get(self.search_param, "")
+        if not term.split():
+            return queryset
+
+        queryset = search_users(queryset, term)
+        if request.query_params.get(self.ordering_param):
+            return queryset
+        return queryset.order_by("search_rank", *queryset.query.order_by)
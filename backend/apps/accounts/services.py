@@ -0,0 +1,210 @@
+import csv
+import multiprocessing
+import os
+from contextlib import contextmanager
+from functools import partial
+from itertools import islice
+from multiprocessing.pool import Pool, ThreadPool
+from typing import Callable, Iterable, Iterator
+
+from apps.accounts.models import Profile
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import get_hasher, make_password
+from django.contrib.auth.models import Group
+from django.db import transaction
+from django.db.models import QuerySet
+from django.db.models.signals import m2m_changed
+
+UserModel = get_user_model()
+
+MEMBERSHIP_BATCH_SIZE = 1000
+# Fields of provisioned users and their profiles taken from the rows.
+USER_FIELDS = ("is_active", "is_staff")
+PROFILE_FIELDS = (
+    "first_name",
+    "last_name",
+    "date_of_birth",
+    "gender",
+    "address",
+    "phone_number",
+    "linkedin_url",
+    "telegram_username",
+    "additional_info",
+)
+
+
+def add_users_to_group(users: QuerySet, group: Group) -> int:
+    """
+    Add users to the group in bulk and return the number of added memberships.
+
+    Users who aren't members yet are found with one query and their memberships are
+    inserted with bulk_create in batches of MEMBERSHIP_BATCH_SIZE, so it takes a few
+    queries for any number of users. Memberships created concurrently are ignored.
+    `m2m_changed` is sent like `group.user_set.add()` does, so receivers (e.g. the
+    cache of authenticated users) see the change.
+    """
+    Membership = UserModel.groups.through
+    missing_ids = list(
+        users.exclude(groups=group).prefetch_related(None).values_list("id", flat=True)
+    )
+    if not missing_ids:
+        return 0
+
+    signal_kwargs = {
+        "sender": Membership,
+        "instance": group,
+        "reverse": True,
+        "model": UserModel,
+        "pk_set": set(missing_ids),
+        "using": users.db,
+    }
+    with transaction.atomic(using=users.db):
+        m2m_changed.send(action="pre_add", **signal_kwargs)
+        Membership.objects.using(users.db).bulk_create(
+            (Membership(user_id=user_id, group_id=group.id) for user_id in missing_ids),
+            batch_size=MEMBERSHIP_BATCH_SIZE,
+            ignore_conflicts=True,
+        )
+        m2m_changed.send(action="post_add", **signal_kwargs)
+    return len(missing_ids)
+
+
+def read_user_rows(path: str) -> list[dict]:
+    """
+    Read rows for provision_users() from a CSV file with a header row, converting
+    the boolean USER_FIELDS. Raise OSError if the file can't be read.
+    """
+    with open(path, newline="", encoding="utf-8") as file:
+        rows = list(csv.DictReader(file))
+    for row in rows:
+        for field in USER_FIELDS:
+            if row.get(field):
+                row[field] = row[field].strip().lower() in ("1", "true", "yes")
+    return rows
+
+
+def password_pool(processes: int) -> Pool:
+    """
+    Return a pool of `processes` workers for hashing passwords. Workers are spawned
+    rather than forked, so they don't inherit locks held by other threads of this
+    process, which could leave them deadlocked. Daemonic processes (e.g. Celery prefork
+    workers) can't have children, so they hash in a pool of threads instead. PBKDF2
+    releases the GIL while hashing, so threads hash in parallel as well.
+    """
+    if multiprocessing.current_process().daemon:
+        return ThreadPool(processes)
+    return multiprocessing.get_context("spawn").Pool(processes)
+
+
+def hash_passwords(passwords: list, pool: Pool = None, processes: int = 1) -> list[str]:
+    """
+    Hash passwords with the default hasher, spread across the `processes` processes of
+    the pool if given. The hasher is resolved here and sent to the workers, so they hash
+    with the same settings as this process.
+    """
+    if pool is None or len(passwords) < 2:
+        return [make_password(password) for password in passwords]
+    chunksize = max(len(passwords) // (processes * 4), 1)
+    return pool.map(partial(make_password, hasher=get_hasher()), passwords, chunksize=chunksize)
+
+
+def provision_users(
+    rows: Iterable[dict],
+    chunk_size: int = None,
+    processes: int = None,
+    on_progress: Callable[[dict], None] = None,
+) -> dict:
+    """
+    Create users with profiles from rows with the email, password, USER_FIELDS and
+    PROFILE_FIELDS, and return numbers of processed, created and skipped rows.
+
+    Password hashing is deliberately slow, so passwords are hashed in a pool of
+    `processes` (default is settings.USER_PROVISION_PROCESSES or the number of CPUs)
+    and each chunk of `chunk_size` rows (default is settings.USER_PROVISION_CHUNK_SIZE)
+    is inserted with two bulk_create queries in one transaction. Rows without an email
+    or with an email that is already taken are skipped, missing and empty fields get
+    their defaults (a row without a password gets an unusable one). `on_progress`
+    receives the numbers after every chunk, i.e. after its passwords are hashed and
+    its users inserted.
+    """
+    chunk_size = chunk_size or settings.USER_PROVISION_CHUNK_SIZE
+    processes = processes or settings.USER_PROVISION_PROCESSES or os.cpu_count()
+    stats = {"processed": 0, "created": 0, "skipped": 0}
+    seen_emails = set()
+
+    with _password_pool(processes) as pool:
+        rows = iter(rows)
+        while chunk := list(islice(rows, chunk_size)):
+            created = _provision_chunk(chunk, seen_emails, pool, processes)
+            stats["processed"] += len(chunk)
+            stats["created"] += created
+            stats["skipped"] += len(chunk) - created
+            if on_progress is not None:
+                on_progress(dict(stats))
+    return stats
+
+
+@contextmanager
+def _password_pool(processes: int) -> Iterator[Pool]:
+    """
+    Yield a password_pool() of `processes`, or None for a single process. The pool is
+    closed and waited for when the block succeeds, and terminated if it fails.
+    """
+    pool = password_pool(processes) if processes > 1 else None
+    try:
+        yield pool
+    except BaseException:
+        if pool is not None:
+            pool.terminate()
+            pool.join()
+        raise
+    if pool is not None:
+        pool.close()
+        pool.join()
+
+
+def _provision_chunk(
+    rows: list[dict],
+    seen_emails: set,
+    pool: Pool = None,
+    processes: int = 1,
+) -> int:
+    """Create users and profiles for a chunk of rows. Return the number of created users."""
+    new_rows = {}
+    for row in rows:
+        email = UserModel.objects.normalize_email(row.get("email") or "")
+        if email and email not in seen_emails:
+            seen_emails.add(email)
+            new_rows[email] = row
+    for email in UserModel.objects.filter(email__in=new_rows).values_list("email", flat=True):
+        del new_rows[email]
+    if not new_rows:
+        return 0
+
+    passwords = hash_passwords(
+        [row.get("password") or None for row in new_rows.values()], pool, processes
+    )
+    users = [
+        UserModel(
+            email=email,
+            password=password,
+            **_present_fields(row, USER_FIELDS),
+        )
+        for (email, row), password in zip(new_rows.items(), passwords)
+    ]
+    with transaction.atomic():
+        UserModel.objects.bulk_create(users)
+        Profile.objects.bulk_create(
+            Profile(
+                user=user,
+                **_present_fields(row, PROFILE_FIELDS),
+            )
+            for user, row in zip(users, new_rows.values())
+        )
+    return len(users)
+
+
+def _present_fields(row: dict, fields: tuple) -> dict:
+    """Return fields of the row which are neither missing nor empty."""
+    return {field: row[field] for field in fields if row.get(field) not in (None, "")}
@@ -1,12 +1,17 @@
-from apps.accounts.tasks import send_email_to_user
-from django.db.models.signals import pre_delete
+from apps.accounts.authentication import invalidate_cached_user
+from apps.accounts.avatars import avatar_files, renditions_are_current
+from apps.accounts.storage import schedule_deletion
+from apps.accounts.tasks import send_email_to_user, warm_avatar_renditions
+from django.contrib.auth.models import Group
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
 from django.dispatch import receiver
 from django.template.loader import render_to_string
 from django.urls import reverse
 from django.utils.html import strip_tags
 from django_rest_passwordreset.signals import reset_password_token_created
 
-from .models import Profile
+from .models import Profile, User
 
 
 @receiver(pre_delete, sender=Profile)
@@ -14,9 +19,25 @@ def delete_profile_image(sender, instance, **kwargs):
     """
     Must delete profile images from storage here but not in model's `delete()` method because
     when deleting objects from admin panel, django uses `bulk_delete()` on a queryset
-    and doesn't call `delete()` method for each instance.
+    and doesn't call `delete()` method for each instance. The image and its sizes are
+    only recorded here and deleted from storage later in batches.
     """
-    instance.avatar_image.delete()
+    schedule_deletion(avatar_files(instance))
+
+
+@receiver(post_save, sender=Profile)
+def queue_avatar_renditions(sender, instance, **kwargs):
+    """
+    Create sizes of a new avatar in the background once the upload is committed.
+    The replaced (or removed) avatar and its sizes are scheduled for deletion.
+    """
+    source = instance.avatar_renditions.get("source")
+    if source and source != instance.avatar_image.name:
+        schedule_deletion(avatar_files(instance, name=source))
+        Profile.objects.filter(id=instance.id).update(avatar_renditions={})
+        instance.avatar_renditions = {}
+    if instance.avatar_image and not renditions_are_current(instance):
+        transaction.on_commit(lambda: warm_avatar_renditions.delay(profile_id=instance.id))
 
 
 @receiver(reset_password_token_created)
@@ -38,3 +59,47 @@ def password_reset_token_created(sender, instance, reset_password_token, *args,
     send_email_to_user.delay(
         mail_subject, plain_message, [reset_password_token.user.email], html_message
     )
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_user(sender, instance, **kwargs):
+    """Drop the cached user on any change, e.g. deactivation or a new password."""
+    invalidate_cached_user(instance.id)
+
+
+def invalidate_related_users(instance, action, reverse, pk_set):
+    """
+    Drop cached users whose groups or permissions have changed. `instance` is the user,
+    or the group or permission if the relation was changed from its side.
+    """
+    if not reverse:
+        if action.startswith("post_"):
+            instance.clear_access_cache()
+            invalidate_cached_user(instance.id)
+    elif action == "pre_clear":
+        # Users of the group or permission are unknown after it is cleared.
+        instance._cleared_user_ids = list(instance.user_set.values_list("id", flat=True))
+    elif action in ("post_add", "post_remove", "post_clear"):
+        user_ids = pk_set if action != "post_clear" else instance.__dict__.pop("_cleared_user_ids")
+        for user_id in user_ids:
+            invalidate_cached_user(user_id)
+
+
+@receiver(m2m_changed, sender=User.groups.through)
+def invalidate_user_groups(sender, instance, action, reverse, pk_set, **kwargs):
+    """Drop cached users whose groups have changed."""
+    invalidate_related_users(instance, action, reverse, pk_set)
+
+
+@receiver(m2m_changed, sender=User.user_permissions.through)
+def invalidate_user_permissions(sender, instance, action, reverse, pk_set, **kwargs):
+    """Drop cached users whose permissions have changed."""
+    invalidate_related_users(instance, action, reverse, pk_set)
+
+
+@receiver(pre_delete, sender=Group)
+def invalidate_group_users(sender, instance, **kwargs):
+    """Drop cached users of a deleted group."""
+    for user_id in instance.user_set.values_list("id", flat=True):
+        invalidate_cached_user(user_id)
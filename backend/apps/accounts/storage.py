@@ -0,0 +1,65 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.storage import Storage, default_storage
+from django.db import transaction
+
+from .models import StorageDeletion
+
+# Objects deleted by a single S3 request, the maximum of the DeleteObjects API.
+S3_DELETE_BATCH_SIZE = 1000
+PURGE_QUEUED_KEY = "storage-purge-queued"
+
+
+def schedule_deletion(paths: list[str]):
+    """
+    Record files to be deleted from the default storage. The records are part of the
+    current transaction, the purge task is queued once it is committed.
+    """
+    paths = [path for path in paths if path]
+    if not paths:
+        return
+    StorageDeletion.objects.bulk_create(StorageDeletion(path=path) for path in paths)
+    transaction.on_commit(queue_purge)
+
+
+def queue_purge():
+    """Queue purge_storage unless it has already been queued and hasn't started yet."""
+    from .tasks import purge_storage
+
+    if cache.add(PURGE_QUEUED_KEY, 1, timeout=settings.STORAGE_PURGE_DELAY * 10):
+        purge_storage.apply_async(countdown=settings.STORAGE_PURGE_DELAY)
+
+
+def delete_files(paths: list[str], storage: Storage = None):
+    """
+    Delete files from the storage. S3 objects are deleted with one request per
+    S3_DELETE_BATCH_SIZE objects, other storages delete files one by one.
+    """
+    storage = storage or default_storage
+    if not hasattr(storage, "bucket"):  # not S3Boto3Storage
+        for path in paths:
+            storage.delete(path)
+        return
+
+    objects = [{"Key": storage._normalize_name(storage._clean_name(path))} for path in paths]
+    while objects:
+        batch, objects = objects[:S3_DELETE_BATCH_SIZE], objects[S3_DELETE_BATCH_SIZE:]
+        storage.bucket.delete_objects(Delete={"Objects": batch, "Quiet": True})
+
+
+def purge(batch_size: int = None) -> int:
+    """
+    Delete all recorded files from the default storage in batches of `batch_size`
+    (default is settings.STORAGE_PURGE_BATCH_SIZE). Return the number of deleted files.
+    Deleting a file twice is harmless, so records are removed after their files.
+    """
+    batch_size = batch_size or settings.STORAGE_PURGE_BATCH_SIZE
+    cache.delete(PURGE_QUEUED_KEY)  # deletions recorded from now on need another run
+    records = StorageDeletion.objects.order_by("id").values_list("id", "path")
+    purged = 0
+    while batch := list(records[:batch_size]):
+        ids, paths = zip(*batch)
+        delete_files(sorted(set(paths)))
+        StorageDeletion.objects.filter(id__in=ids).delete()
+        purged += len(ids)
+    return purged
@@ -1,22 +1,72 @@
 import smtplib
 
+from apps.accounts.avatars import warm_avatar
+from apps.accounts.services import provision_users as provision_users_in_bulk, read_user_rows
+from apps.accounts.storage import purge
+from apps.emails.ratelimit import get_rate_limiter
+from base.cache import increment
 from config.celery import app
 from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.contrib.auth.tokens import default_token_generator
+from django.core.cache import cache
 from django.core.mail import send_mail
 from django.template.loader import render_to_string
 from django.utils.html import strip_tags
 
 UserModel = get_user_model()
 
+# Counters of queue_verification_email() calls, see verification_email_stats() and the
+# verification_email_stats command.
+VERIFICATION_EMAIL_COUNTERS = ("published", "suppressed")
+
+
+def _verification_key(user_id) -> str:
+    return f"verification-email:{user_id}"
+
+
+def queue_verification_email(user) -> bool:
+    """
+    Queue send_verification_email for the user unless it has already been queued within
+    the last settings.VERIFICATION_EMAIL_WINDOW seconds. Return True if the task was
+    published, False if the attempt was coalesced with the pending one.
+
+    The activation token of the pending email is kept in the shared cache for the
+    window, so all processes see it and the task (including its retries) sends it.
+    """
+    key = _verification_key(user.id)
+    token = default_token_generator.make_token(user)
+    if not cache.add(key, token, timeout=settings.VERIFICATION_EMAIL_WINDOW):
+        increment("verification-email-stats:suppressed")
+        return False
+
+    try:
+        send_verification_email.delay(user_id=user.id)
+    except Exception:
+        cache.delete(key)  # let the next attempt publish it
+        raise
+    increment("verification-email-stats:published")
+    return True
+
+
+def verification_email_stats() -> dict:
+    """Return numbers of published and suppressed verification emails of all processes."""
+    keys = {f"verification-email-stats:{name}": name for name in VERIFICATION_EMAIL_COUNTERS}
+    values = cache.get_many(keys)
+    return {name: values.get(key, 0) for key, name in keys.items()}
+
 
 @app.task(bind=True, default_retry_delay=1 * 60)
 def send_verification_email(self, user_id: int) -> None:
-    """Celery task to send account activation link to user's email address."""
+    """
+    Celery task to send account activation link to user's email address. The link
+    carries the token stored by queue_verification_email() if it is still pending.
+    """
 
     user = UserModel.objects.get(id=user_id)
-    confirmation_token = default_token_generator.make_token(user)
+    confirmation_token = cache.get(_verification_key(user_id))
+    if confirmation_token is None:
+        confirmation_token = default_token_generator.make_token(user)
 
     email_template_name = "accounts/email/confirm_email.html"
     email_context = {
@@ -28,6 +78,7 @@ def send_verification_email(self, user_id: int) -> None:
     plain_message = strip_tags(html_message)
 
     try:
+        get_rate_limiter(settings.DEFAULT_FROM_EMAIL).acquire()
         send_mail(
             subject=mail_subject,
             message=plain_message,
@@ -45,6 +96,7 @@ def send_email_to_user(
     self, mail_subject: str, plain_message: str, send_to: list[str], html_message: str
 ) -> None:
     try:
+        get_rate_limiter(settings.DEFAULT_FROM_EMAIL).acquire()
         send_mail(
             subject=mail_subject,
             message=plain_message,
@@ -55,3 +107,37 @@ def send_email_to_user(
         )
     except smtplib.SMTPException as ex:
         self.retry(exc=ex)
+
+
+@app.task(bind=True, time_limit=60 * 60)
+def provision_users(self, path: str, chunk_size: int = None, processes: int = None) -> dict:
+    """
+    Celery task to create users with profiles in bulk (see services.provision_users)
+    from the CSV file at `path`, which has to be readable by the workers. The file is
+    read here, so passwords never reach the broker or the result backend. Numbers of
+    processed, created and skipped rows are reported as the PROGRESS state of the task
+    after every chunk, whose passwords are hashed by `processes` workers.
+    """
+    rows = read_user_rows(path)
+    total = len(rows)
+
+    def report_progress(stats: dict):
+        if not self.request.is_eager:
+            self.update_state(state="PROGRESS", meta={**stats, "total": total})
+
+    stats = provision_users_in_bulk(
+        rows, chunk_size=chunk_size, processes=processes, on_progress=report_progress
+    )
+    return {**stats, "total": total}
+
+
+@app.task
+def warm_avatar_renditions(profile_id: int) -> bool:
+    """Celery task to create all sizes of an uploaded avatar and store their urls."""
+    return warm_avatar(profile_id)
+
+
+@app.task
+def purge_storage() -> int:
+    """Celery task to delete files recorded in the StorageDeletion outbox in batches."""
+    return purge()
@@ -0,0 +1,108 @@
+import os
+import shutil
+import tempfile
+from io import BytesIO, StringIO
+
+from apps.accounts.api.v1.serializers import ProfileSerializer
+from apps.accounts.factories import ProfileFactory
+from apps.accounts.models import Profile
+from config.celery import app
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, TransactionTestCase, override_settings
+from PIL import Image
+
+
+def image_file(name: str = "avatar.png") -> SimpleUploadedFile:
+    buffer = BytesIO()
+    Image.new("RGB", (400, 300), "red").save(buffer, format="PNG")
+    return SimpleUploadedFile(name, buffer.getvalue(), content_type="image/png")
+
+
+class MediaRootMixin:
+    """Store uploaded files in a temporary directory."""
+
+    def setUp(self) -> None:
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        media_settings = override_settings(MEDIA_ROOT=self.media_root)
+        media_settings.enable()
+        self.addCleanup(media_settings.disable)
+        app.conf.task_always_eager = True
+        self.addCleanup(setattr, app.conf, "task_always_eager", False)
+
+    def sized_files(self) -> list:
+        sized_root = os.path.join(self.media_root, "__sized__", "profile_images")
+        return sorted(os.listdir(sized_root)) if os.path.isdir(sized_root) else []
+
+
+class AvatarRenditionsTestCase(MediaRootMixin, TestCase):
+    """Class for testing avatar renditions created after upload."""
+
+    def test_renditions_created_on_upload(self):
+        """An uploaded avatar should get all its sizes once the upload is committed."""
+        with self.captureOnCommitCallbacks(execute=True):
+            profile = ProfileFactory(avatar_image=image_file())
+
+        profile.refresh_from_db()
+        renditions = profile.avatar_renditions
+        self.assertEqual(renditions["source"], profile.avatar_image.name)
+        self.assertEqual(renditions["full_size"], profile.avatar_image.url)
+        self.assertIn("crop-c0-5__0-5-256x256", renditions["medium"])
+        self.assertEqual(len(self.sized_files()), 2)
+
+    def test_serializer_returns_stored_urls(self):
+        """Serialized avatars should come from the stored urls."""
+        profile = ProfileFactory(avatar_image=image_file())
+        self.assertEqual(
+            ProfileSerializer(profile).data["avatar_image"],
+            {"full_size": profile.avatar_image.url},
+        )
+
+        profile.avatar_renditions = {
+            "source": profile.avatar_image.name,
+            "full_size": "/media/full.png",
+            "thumbnail": "/media/thumbnail.png",
+        }
+        data = ProfileSerializer(profile).data["avatar_image"]
+
+        self.assertEqual(
+            data, {"full_size": "/media/full.png", "thumbnail": "/media/thumbnail.png"}
+        )
+        self.assertEqual(self.sized_files(), [])
+
+    def test_removed_avatar(self):
+        """Renditions of a removed avatar should be dropped."""
+        with self.captureOnCommitCallbacks(execute=True):
+            profile = ProfileFactory(avatar_image=image_file())
+        profile.refresh_from_db()
+
+        profile.avatar_image = None
+        profile.save()
+
+        self.assertEqual(Profile.objects.get(id=profile.id).avatar_renditions, {})
+        self.assertIsNone(ProfileSerializer(profile).data["avatar_image"])
+
+
+class WarmAvatarsCommandTestCase(MediaRootMixin, TransactionTestCase):
+    """Class for testing the backfill of avatar renditions."""
+
+    def test_backfill(self):
+        """Only avatars without current renditions should be processed."""
+        profiles = ProfileFactory.create_batch(3, avatar_image=image_file())
+        Profile.objects.update(avatar_renditions={})
+        ProfileFactory(avatar_image=None)
+
+        out = StringIO()
+        call_command("warm_avatars", workers=2, stdout=out)
+        self.assertIn("3 of 3 avatars warmed, 0 failed.", out.getvalue())
+        self.assertTrue(
+            all(
+                profile.avatar_renditions
+                for profile in Profile.objects.filter(id__in=[p.id for p in profiles])
+            )
+        )
+
+        out = StringIO()
+        call_command("warm_avatars", stdout=out)
+        self.assertIn("0 of 0 avatars warmed", out.getvalue())
@@ -0,0 +1,124 @@
+from apps.accounts.admin import UserAdmin, put_to_recruiters
+from apps.accounts.factories import UserFactory
+from apps.accounts.services import add_users_to_group
+from django.contrib.admin.sites import AdminSite
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group, Permission
+from django.contrib.messages.storage.fallback import FallbackStorage
+from django.core.cache import cache
+from django.test import RequestFactory, TestCase
+from rest_framework import status
+from rest_framework.reverse import reverse
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import AccessToken
+
+UserModel = get_user_model()
+
+
+class AddUsersToGroupTestCase(TestCase):
+    """Class for testing bulk group membership."""
+
+    def setUp(self) -> None:
+        self.group = Group.objects.get(name="Recruiter")
+        self.users = UserFactory.create_batch(5)
+        self.users[0].groups.add(self.group)
+
+    def test_missing_memberships_added(self):
+        """Only users who aren't in the group yet should be added, in constant queries."""
+        with self.assertNumQueries(4):  # missing ids, savepoint, insert, release
+            added = add_users_to_group(UserModel.objects.all(), self.group)
+
+        self.assertEqual(added, 4)
+        self.assertEqual(self.group.user_set.count(), 5)
+        self.assertTrue(all(user.has_group("Recruiter") for user in self.users))
+
+    def test_nothing_to_add(self):
+        """Nothing should be written if all users are in the group already."""
+        with self.assertNumQueries(1):
+            added = add_users_to_group(UserModel.objects.filter(id=self.users[0].id), self.group)
+        self.assertEqual(added, 0)
+
+    def test_admin_action(self):
+        """The admin action should add the selected users and report the counts."""
+        request = RequestFactory().post("/")
+        request.user = UserFactory(is_staff=True, is_superuser=True)
+        request.session = {}
+        request._messages = FallbackStorage(request)
+
+        put_to_recruiters(UserAdmin(UserModel, AdminSite()), request, UserModel.objects.all())
+
+        self.assertEqual(self.group.user_set.count(), 6)
+        self.assertEqual(
+            [str(message) for message in request._messages],
+            ["5 user(s) added to Recruiter, 1 already there."],
+        )
+
+
+class GroupMembersAPITestCase(APITestCase):
+    """Class for testing bulk group membership api endpoint."""
+
+    def setUp(self) -> None:
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.group = Group.objects.get(name="Reviewer")
+        self.users = UserFactory.create_batch(3)
+        self.url = reverse("group_members", kwargs={"pk": self.group.id})
+
+    def staff(self, can_change_groups: bool = True):
+        """Return a staff user who may be allowed to change groups."""
+        user = UserFactory(is_staff=True)
+        if can_change_groups:
+            user.user_permissions.add(Permission.objects.get(codename="change_group"))
+        return user
+
+    def test_staff_adds_members(self):
+        """Staff should be able to add users to a group, unknown ids are skipped."""
+        self.client.force_authenticate(user=self.staff())
+        user_ids = [user.id for user in self.users] + [10**6]
+
+        response = self.client.post(self.url, {"user_ids": user_ids}, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, {"added": 3, "skipped": 1})
+        self.assertEqual(self.group.user_set.count(), 3)
+
+    def test_not_staff_forbidden(self):
+        """Regular users shouldn't be able to change group membership."""
+        self.client.force_authenticate(user=self.users[0])
+
+        response = self.client.post(self.url, {"user_ids": [self.users[0].id]}, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertFalse(self.group.user_set.exists())
+
+    def test_staff_without_permission_forbidden(self):
+        """Staff should have the permission to change groups."""
+        self.client.force_authenticate(user=self.staff(can_change_groups=False))
+
+        response = self.client.post(self.url, {"user_ids": [self.users[0].id]}, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_empty_ids_rejected(self):
+        """At least one user id should be given."""
+        self.client.force_authenticate(user=self.staff())
+
+        response = self.client.post(self.url, {"user_ids": []}, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_cached_user_invalidated(self):
+        """Authenticated users cached before the change should see the new group."""
+        staff = self.staff()
+        user = self.users[0]
+        detail_url = reverse("user_detail", kwargs={"pk": user.id})
+        credentials = {"HTTP_AUTHORIZATION": f"JWT {AccessToken.for_user(user)}"}
+        self.client.get(detail_url, **credentials)  # cache the user
+
+        self.client.force_authenticate(user=staff)
+        self.client.post(self.url, {"user_ids": [user.id]}, format="json")
+        self.client.force_authenticate(user=None)
+
+        with self.assertNumQueries(3):  # cache miss: authenticated user, requested user, profile
+            response = self.client.get(detail_url, **credentials)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
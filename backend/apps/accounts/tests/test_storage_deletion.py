@@ -0,0 +1,86 @@
+import os
+from unittest.mock import patch
+
+from apps.accounts.factories import ProfileFactory
+from apps.accounts.models import Profile, StorageDeletion
+from apps.accounts.storage import delete_files, purge
+from apps.accounts.tests.test_avatars import MediaRootMixin, image_file
+from django.test import TestCase
+
+
+class FakeBucket:
+    """S3 bucket which records DeleteObjects requests."""
+
+    def __init__(self):
+        self.requests = []
+
+    def delete_objects(self, Delete):
+        self.requests.append([obj["Key"] for obj in Delete["Objects"]])
+
+
+class FakeS3Storage:
+    """Storage with the S3Boto3Storage interface used for deletion."""
+
+    def __init__(self):
+        self.bucket = FakeBucket()
+
+    def _clean_name(self, name):
+        return name
+
+    def _normalize_name(self, name):
+        return f"media/{name}"
+
+
+class StorageDeletionTestCase(MediaRootMixin, TestCase):
+    """Class for testing deferred deletion of profile images."""
+
+    def create_profile(self) -> Profile:
+        with self.captureOnCommitCallbacks(execute=True):
+            profile = ProfileFactory(avatar_image=image_file())
+        profile.refresh_from_db()
+        return profile
+
+    def exists(self, path: str) -> bool:
+        return os.path.exists(os.path.join(self.media_root, path))
+
+    def test_bulk_delete_deferred(self):
+        """Deleting profiles should only record their files, which are purged later."""
+        profiles = [self.create_profile() for _ in range(2)]
+        paths = [path for profile in profiles for path in profile.avatar_renditions.values()]
+
+        with patch("apps.accounts.tasks.purge_storage.apply_async") as mock_purge:
+            with self.captureOnCommitCallbacks(execute=True):
+                Profile.objects.all().delete()
+
+        self.assertEqual(mock_purge.call_count, 1)
+        self.assertEqual(StorageDeletion.objects.count(), 6)  # images with two sizes each
+        self.assertTrue(all(self.exists(path.removeprefix("/media/")) for path in paths))
+
+        self.assertEqual(purge(batch_size=4), 6)
+
+        self.assertFalse(StorageDeletion.objects.exists())
+        self.assertFalse(any(self.exists(path.removeprefix("/media/")) for path in paths))
+
+    def test_replaced_avatar_deleted(self):
+        """A replaced avatar and its sizes should be deleted."""
+        profile = self.create_profile()
+        old_name = profile.avatar_image.name
+
+        with self.captureOnCommitCallbacks(execute=True):
+            profile.avatar_image = image_file("new.png")
+            profile.save()
+        purge()
+
+        profile.refresh_from_db()
+        self.assertFalse(self.exists(old_name))
+        self.assertTrue(self.exists(profile.avatar_image.name))
+        self.assertEqual(profile.avatar_renditions["source"], profile.avatar_image.name)
+
+    def test_s3_batches(self):
+        """S3 objects should be deleted with one request per thousand objects."""
+        storage = FakeS3Storage()
+
+        delete_files([f"img/{i}.png" for i in range(2500)], storage=storage)
+
+        self.assertEqual([len(keys) for keys in storage.bucket.requests], [1000, 1000, 500])
+        self.assertEqual(storage.bucket.requests[0][0], "media/img/0.png")
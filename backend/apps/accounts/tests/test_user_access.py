@@ -0,0 +1,105 @@
+from apps.accounts.factories import ProfileFactory, UserFactory
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group, Permission
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+UserModel = get_user_model()
+
+
+class UserAccessCacheTestCase(TestCase):
+    """Class for testing groups and permissions cached on the user instance."""
+
+    def setUp(self) -> None:
+        self.group = Group.objects.get(name="Recruiter")
+        self.group.permissions.add(Permission.objects.get(codename="view_group"))
+        self.user = UserFactory()
+        self.user.groups.add(self.group)
+        self.user.user_permissions.add(Permission.objects.get(codename="change_group"))
+
+    def test_groups_loaded_once(self):
+        """Groups should be loaded once per instance."""
+        user = UserModel.objects.get(id=self.user.id)
+        with self.assertNumQueries(1):
+            self.assertTrue(user.has_group("Recruiter"))
+            self.assertFalse(user.has_group("Reviewer"))
+            self.assertEqual(user.user_groups(), "Recruiter")
+
+    def test_prefetched_access(self):
+        """Users of a queryset with_access() shouldn't query groups or permissions."""
+        users = list(UserModel.objects.with_access())
+
+        with self.assertNumQueries(0):
+            user = next(user for user in users if user.id == self.user.id)
+            self.assertEqual(user.group_names, ("Recruiter",))
+            self.assertEqual(user.permission_codenames, {"auth.view_group", "auth.change_group"})
+            self.assertTrue(user.has_perms(["auth.view_group", "auth.change_group"]))
+            self.assertFalse(user.has_perm("auth.delete_group"))
+
+    def test_prefetched_permissions_match_backend(self):
+        """Prefetched permissions should be the same as the ones of the auth backend."""
+        user = UserModel.objects.with_access().get(id=self.user.id)
+        self.assertEqual(
+            user.permission_codenames,
+            UserModel.objects.get(id=self.user.id).get_all_permissions(),
+        )
+
+    def test_cache_dropped_on_change(self):
+        """Cached groups and permissions should be dropped once they are changed."""
+        user = UserModel.objects.with_access().get(id=self.user.id)
+        user.group_names, user.permission_codenames  # noqa: B018
+
+        user.groups.add(Group.objects.get(name="Reviewer"))
+        user.user_permissions.clear()
+
+        self.assertTrue(user.has_group("Reviewer"))
+        self.assertEqual(user.permission_codenames, {"auth.view_group"})
+
+
+class UserListQueriesTestCase(APITestCase):
+    """Class for testing that user list pages take a constant number of queries."""
+
+    def setUp(self) -> None:
+        self.admin = UserModel.objects.create_superuser("admin@ex.com", "1234567890")
+        self.groups = list(Group.objects.all())
+
+    def create_users(self, number: int):
+        """Create users with profiles and groups."""
+        for profile in ProfileFactory.create_batch(number):
+            profile.user.groups.set(self.groups)
+
+    def count_queries(self, url: str) -> int:
+        """Request the page and return the number of executed queries."""
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return len(context.captured_queries)
+
+    def test_admin_changelist(self):
+        """The admin user list shouldn't query groups of every user."""
+        self.client.force_login(self.admin)
+        url = reverse("admin:accounts_user_changelist")
+
+        self.create_users(2)
+        queries = self.count_queries(url)
+        self.create_users(5)
+
+        self.assertEqual(self.count_queries(url), queries)
+
+    def test_api_list(self):
+        """The API user list shouldn't query profiles or groups of every user."""
+        self.client.force_authenticate(user=self.admin)
+        url = reverse("user_list")
+
+        self.create_users(2)
+        queries = self.count_queries(url)
+        self.create_users(5)
+
+        response = self.client.get(url)
+        self.assertEqual(self.count_queries(url), queries)
+        user = next(user for user in response.data["results"] if user["id"] != self.admin.id)
+        self.assertEqual(sorted(user["groups"]), sorted(group.name for group in self.groups))
@@ -0,0 +1,105 @@
+from apps.accounts.authentication import CachedJWTAuthentication
+from apps.accounts.factories import ProfileFactory
+from django.contrib.auth.models import Group, Permission
+from django.core.cache import cache
+from rest_framework import status
+from rest_framework.reverse import reverse
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import AccessToken
+
+
+class CachedJWTAuthenticationTestCase(APITestCase):
+    """Class for testing authentication with cached users."""
+
+    def setUp(self) -> None:
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.user = ProfileFactory().user
+        self.url = reverse("user_detail", kwargs={"pk": self.user.id})
+        self.client.credentials(HTTP_AUTHORIZATION=f"JWT {AccessToken.for_user(self.user)}")
+
+    def test_user_cached(self):
+        """The user shouldn't be loaded from the database on every request."""
+        with self.assertNumQueries(3):  # authenticated user, requested user and profile
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        with self.assertNumQueries(2):  # requested user and profile
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_deactivated_user_rejected(self):
+        """A deactivated user shouldn't be authenticated from the cache."""
+        self.client.get(self.url)
+        self.user.is_active = False
+        self.user.save()
+
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_evicted_version_not_reused(self):
+        """A user cached before an evicted version was bumped shouldn't be served again."""
+        version_key = f"auth-user-version:{self.user.id}"
+        cache.delete(version_key)
+        self.user.save()  # the first version after the eviction
+        self.client.get(self.url)
+        cache.delete(version_key)  # evicted again
+        self.user.is_active = False
+        self.user.save()
+
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_password_change_invalidates(self):
+        """The cached user should be loaded again after the password change."""
+        self.client.get(self.url)
+        self.user.set_password("new_password")
+        self.user.save()
+
+        with self.assertNumQueries(3):
+            self.client.get(self.url)
+
+    def test_group_change_invalidates(self):
+        """The cached user should be loaded again after its groups change."""
+        group = Group.objects.create(name="Recruiters")
+        for change in (
+            lambda: self.user.groups.add(group),
+            lambda: group.user_set.remove(self.user),
+            lambda: group.user_set.add(self.user),
+            lambda: group.user_set.clear(),
+        ):
+            self.client.get(self.url)
+            change()
+            with self.assertNumQueries(3):
+                self.client.get(self.url)
+
+    def test_permission_change_invalidates(self):
+        """The cached user should be loaded again after its permissions change."""
+        permission = Permission.objects.get(codename="view_group")
+        for change in (
+            lambda: self.user.user_permissions.add(permission),
+            lambda: permission.user_set.remove(self.user),
+            lambda: permission.user_set.add(self.user),
+            lambda: permission.user_set.clear(),
+        ):
+            self.client.get(self.url)
+            change()
+            with self.assertNumQueries(3):
+                self.client.get(self.url)
+
+    def test_password_not_cached(self):
+        """The password hash shouldn't be cached, but loaded when it is needed."""
+        self.user.set_password("password")
+        self.user.save()
+        token = AccessToken.for_user(self.user)
+        authentication = CachedJWTAuthentication()
+        authentication.get_user(token)
+
+        user = authentication.get_user(token)
+
+        self.assertEqual(user.get_deferred_fields(), {"password"})
+        self.assertEqual((user.id, user.email), (self.user.id, self.user.email))
+        with self.assertNumQueries(1):
+            self.assertTrue(user.check_password("password"))
@@ -25,7 +25,7 @@ class UserListTestCase(APITestCase):
         """Ensure authorized user can get a user list."""
 
         self.client.force_authenticate(user=self.user)
-        response = self.client.get(self.user_list_url)
+        response = self.client.get(self.user_list_url, {"count": "true"})
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data.get("count"), 5)
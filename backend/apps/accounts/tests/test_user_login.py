@@ -1,10 +1,10 @@
 from unittest.mock import patch
 
-import requests_mock
 from django.contrib.auth import get_user_model
 from rest_framework import status
 from rest_framework.reverse import reverse
 from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
 
 UserModel = get_user_model()
 
@@ -23,7 +23,7 @@ class UserLoginTestCase(APITestCase):
         for i in range(1, 3):
             user_credentials = {"email": f"testuser{i}@ex.com", "password": "random_string"}
             users_credentials.append(user_credentials)
-            user = UserModel.objects.create(**user_credentials)
+            user = UserModel.objects.create_user(**user_credentials)
             users.append(user)
 
         self.user1, self.user2 = users
@@ -34,20 +34,27 @@ class UserLoginTestCase(APITestCase):
 
         self.login_url = reverse("login")
 
-    @requests_mock.Mocker()
-    def test_user_login(self, mock):
+    def test_user_login(self):
         """Ensure user can obtain JWT token by providing existing credentials."""
 
-        url = reverse("token_obtain_pair")
-        data = {"access": "random_access_token", "refresh": "random_refresh_token"}
-        mock.post(url, json=data, status_code=200)
-
-        response = self.client.post(self.login_url, self.user2_credentials, format="json")
+        with self.assertNumQueries(1):
+            response = self.client.post(self.login_url, self.user2_credentials, format="json")
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(
-            response.json(), {"access": "random_access_token", "refresh": "random_refresh_token"}
-        )
+        self.assertEqual(set(response.json()), {"access", "refresh"})
+        self.assertEqual(AccessToken(response.json()["access"])["user_id"], self.user2.id)
+        self.assertEqual(RefreshToken(response.json()["refresh"])["user_id"], self.user2.id)
+
+    def test_user_login_wrong_password(self):
+        """Ensure wrong password is rejected like by the token_obtain_pair endpoint."""
+
+        credentials = {"email": self.user2.email, "password": "wrong_password"}
+
+        response = self.client.post(self.login_url, credentials, format="json")
+        token_response = self.client.post(reverse("token_obtain_pair"), credentials, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(response.json(), token_response.json())
 
     @patch("apps.accounts.tasks.send_verification_email.delay")
     def test_user_login_fail(self, mock_sent_email):
@@ -0,0 +1,156 @@
+import tempfile
+from io import StringIO
+from multiprocessing.pool import ThreadPool
+from unittest import mock
+
+from apps.accounts.factories import UserFactory
+from apps.accounts.models import Profile
+from apps.accounts.services import hash_passwords, password_pool, provision_users
+from apps.accounts.tasks import provision_users as provision_users_task
+from config.celery import app
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import check_password
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+UserModel = get_user_model()
+
+
+class FakePool:
+    """Pool which runs the tasks in this process and records how it was shut down."""
+
+    def __init__(self, processes: int):
+        self.processes = processes
+        self.calls = []
+
+    def map(self, func, iterable, chunksize=None):
+        return [func(item) for item in iterable]
+
+    def close(self):
+        self.calls.append("close")
+
+    def terminate(self):
+        self.calls.append("terminate")
+
+    def join(self):
+        self.calls.append("join")
+
+
+@override_settings(PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"])
+class ProvisionUsersTestCase(TestCase):
+    """Class for testing bulk user provisioning."""
+
+    def setUp(self) -> None:
+        self.existing = UserFactory(email="taken@ex.com")
+        self.rows = [
+            {"email": "one@ex.com", "password": "secret-1", "first_name": "One", "last_name": "A"},
+            {"email": "two@ex.com", "password": "secret-2", "first_name": "Two", "last_name": "B"},
+            {"email": "one@ex.com", "password": "duplicate", "first_name": "One"},
+            {"email": "taken@ex.com", "password": "secret-3", "first_name": "Taken"},
+            {"email": "", "password": "secret-4", "first_name": "Nobody"},
+            {"email": "staff@ex.com", "is_staff": True, "is_active": True, "phone_number": ""},
+        ]
+
+    def test_users_provisioned(self):
+        """New users should get hashed passwords and profiles, the rest is skipped."""
+        progress = []
+
+        with mock.patch("apps.accounts.services.password_pool", FakePool):
+            stats = provision_users(
+                self.rows, chunk_size=4, processes=2, on_progress=progress.append
+            )
+
+        self.assertEqual(stats, {"processed": 6, "created": 3, "skipped": 3})
+        self.assertEqual([step["processed"] for step in progress], [4, 6])
+        one = UserModel.objects.get(email="one@ex.com")
+        self.assertTrue(one.check_password("secret-1"))
+        self.assertFalse(one.is_active)
+        self.assertEqual(one.user_profile.first_name, "One")
+        staff = UserModel.objects.get(email="staff@ex.com")
+        self.assertFalse(staff.has_usable_password())
+        self.assertTrue(staff.is_staff and staff.is_active)
+        self.assertIsNone(staff.user_profile.phone_number)
+        self.assertEqual(Profile.objects.count(), 3)
+
+    def test_chunk_queries(self):
+        """Every chunk should take a constant number of queries."""
+        rows = [{"email": f"user{i}@ex.com", "password": "secret"} for i in range(10)]
+        with self.assertNumQueries(5):  # existing emails, savepoint, users, profiles, release
+            provision_users(rows, chunk_size=10, processes=1)
+
+    def test_hash_passwords_in_pool(self):
+        """Passwords hashed in the pool should be checked as usual."""
+        hashes = hash_passwords(["a", "b", "c"], FakePool(2), processes=2)
+
+        self.assertTrue(all(check_password(p, h) for p, h in zip(["a", "b", "c"], hashes)))
+
+    def test_pool_shutdown(self):
+        """The pool should be closed after success and terminated after a failure."""
+        pools = []
+
+        def make_pool(processes):
+            pools.append(FakePool(processes))
+            return pools[-1]
+
+        with mock.patch("apps.accounts.services.password_pool", make_pool):
+            provision_users(self.rows[:2], processes=2)
+            with mock.patch("apps.accounts.services._provision_chunk", side_effect=ValueError):
+                with self.assertRaises(ValueError):
+                    provision_users(self.rows[:2], processes=2)
+
+        self.assertEqual([pool.calls for pool in pools], [["close", "join"], ["terminate", "join"]])
+
+    def test_thread_pool_in_daemon(self):
+        """Daemonic processes (Celery workers) can't have children, so they hash in threads."""
+        with mock.patch("multiprocessing.current_process") as current_process:
+            current_process.return_value.daemon = True
+            pool = password_pool(2)
+        self.addCleanup(pool.join)
+        self.addCleanup(pool.close)
+
+        self.assertIsInstance(pool, ThreadPool)
+
+    def test_task(self):
+        """The task should read the file, hash the passwords and return the numbers."""
+        app.conf.task_always_eager = True
+        self.addCleanup(setattr, app.conf, "task_always_eager", False)
+
+        with tempfile.NamedTemporaryFile("w", suffix=".csv") as file:
+            file.write("email,password\none@ex.com,secret-1\ntwo@ex.com,secret-2\n")
+            file.flush()
+            result = provision_users_task.delay(path=file.name, chunk_size=1, processes=1)
+
+        self.assertEqual(result.get(), {"processed": 2, "created": 2, "skipped": 0, "total": 2})
+        self.assertTrue(UserModel.objects.get(email="one@ex.com").check_password("secret-1"))
+
+    def test_command(self):
+        """The command should provision users from a CSV file and report the progress."""
+        with tempfile.NamedTemporaryFile("w", suffix=".csv") as file:
+            file.write("email,password,is_active,first_name,last_name\n")
+            file.write("csv@ex.com,secret,true,Csv,User\n")
+            file.flush()
+            out = StringIO()
+            call_command("provision_users", file.name, processes=1, stdout=out)
+
+        self.assertIn("1/1 rows processed, 1 users created", out.getvalue())
+        self.assertTrue(UserModel.objects.get(email="csv@ex.com").is_active)
+
+    @mock.patch("apps.accounts.tasks.provision_users.delay")
+    def test_command_in_background(self, delay):
+        """Only the path and the options should be handed to the task, not the passwords."""
+        with tempfile.NamedTemporaryFile("w", suffix=".csv") as file:
+            file.write("email,password\ncsv@ex.com,secret\n")
+            file.flush()
+            out = StringIO()
+            call_command(
+                "provision_users",
+                file.name,
+                background=True,
+                chunk_size=10,
+                processes=2,
+                stdout=out,
+            )
+
+        delay.assert_called_once_with(path=file.name, chunk_size=10, processes=2)
+        self.assertIn("Provisioning 1 users in task", out.getvalue())
+        self.assertFalse(UserModel.objects.filter(email="csv@ex.com").exists())
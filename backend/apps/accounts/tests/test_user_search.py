@@ -0,0 +1,118 @@
+from unittest import mock
+
+from apps.accounts.factories import ProfileFactory, UserFactory
+from apps.accounts.search import name_lookup, search_users
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from rest_framework import status
+from rest_framework.reverse import reverse
+from rest_framework.test import APITestCase
+
+UserModel = get_user_model()
+
+
+def create_profile(first_name: str, last_name: str, email: str):
+    return ProfileFactory(first_name=first_name, last_name=last_name, user=UserFactory(email=email))
+
+
+class SearchUsersTestCase(TestCase):
+    """Class for testing the user search."""
+
+    def setUp(self) -> None:
+        self.john = create_profile("John", "Smith", "js@ex.com").user
+        self.jane = create_profile("Jane", "Johnson", "jane@ex.com").user
+        self.mike = create_profile("Mike", "Brown", "john.doe@ex.com").user
+
+    def search(self, term: str) -> list:
+        return list(search_users(UserModel.objects.all(), term).order_by("search_rank", "id"))
+
+    def test_ranked(self):
+        """Users whose names start with the term should go before email matches."""
+        self.assertEqual(self.search("joh"), [self.john, self.jane, self.mike])
+
+    def test_every_word_matched(self):
+        """Every word of the term should match some field."""
+        self.assertEqual(self.search("jo sm"), [self.john])
+        self.assertEqual(self.search("john brown"), [self.mike])
+
+    def test_empty_term(self):
+        """An empty term shouldn't filter anything."""
+        self.assertEqual(search_users(UserModel.objects.all(), "  ").count(), 3)
+
+    def test_short_words_match_prefix(self):
+        """Words too short for trigram indexes should match the beginning of names."""
+        users = UserModel.objects.all()
+        with mock.patch("apps.accounts.search.connections") as connections:
+            connections.__getitem__.return_value.vendor = "postgresql"
+
+            self.assertEqual(name_lookup(users, "jo"), "istartswith")
+            self.assertEqual(name_lookup(users, "joh"), "icontains")
+        self.assertEqual(name_lookup(users, "joh"), "istartswith")
+
+
+class UserSearchAPITestCase(APITestCase):
+    """Class for testing user search and autocomplete api endpoints."""
+
+    def setUp(self) -> None:
+        self.user = create_profile("Ann", "Zimmer", "boss@ex.com").user
+        self.anna = create_profile("Anna", "Adams", "anna@ex.com").user
+        self.other = create_profile("Bob", "Annan", "bob@ex.com").user
+        self.client.force_authenticate(user=self.user)
+
+    def test_list_search_ranked(self):
+        """The user list should put the best matches first unless ordering is given."""
+        url = reverse("user_list")
+
+        response = self.client.get(url, {"search": "ann"})
+        self.assertEqual(
+            [user["id"] for user in response.data["results"]],
+            [self.user.id, self.anna.id, self.other.id],
+        )
+
+        response = self.client.get(url, {"search": "ann", "ordering": "last_name"})
+        self.assertEqual(
+            [user["id"] for user in response.data["results"]],
+            [self.anna.id, self.other.id, self.user.id],
+        )
+
+    def test_list_filter_by_name(self):
+        """The name filters should match the beginning of names."""
+        response = self.client.get(reverse("user_list"), {"last_name": "ada"})
+        self.assertEqual([user["id"] for user in response.data["results"]], [self.anna.id])
+
+    def test_autocomplete(self):
+        """Autocomplete should return a few fields of the best matches in one query."""
+        url = reverse("user_autocomplete")
+
+        with self.assertNumQueries(1):
+            response = self.client.get(url, {"q": "an", "limit": 2})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response.data,
+            [
+                {
+                    "id": self.anna.id,
+                    "email": "anna@ex.com",
+                    "first_name": "Anna",
+                    "last_name": "Adams",
+                },
+                {
+                    "id": self.other.id,
+                    "email": "bob@ex.com",
+                    "first_name": "Bob",
+                    "last_name": "Annan",
+                },
+            ],
+        )
+
+    def test_autocomplete_empty_term(self):
+        """Autocomplete shouldn't return anything for an empty term."""
+        response = self.client.get(reverse("user_autocomplete"), {"q": " "})
+        self.assertEqual(response.data, [])
+
+    def test_autocomplete_unauthorized(self):
+        """Autocomplete should be available to authenticated users only."""
+        self.client.force_authenticate(user=None)
+        response = self.client.get(reverse("user_autocomplete"), {"q": "an"})
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
@@ -0,0 +1,68 @@
+from io import StringIO
+from unittest.mock import patch
+
+from apps.accounts.factories import UserFactory
+from apps.accounts.tasks import queue_verification_email, verification_email_stats
+from config.celery import app
+from django.contrib.auth.tokens import default_token_generator
+from django.core import mail
+from django.core.management import call_command
+from kombu.exceptions import OperationalError
+from rest_framework import status
+from rest_framework.reverse import reverse
+from rest_framework.test import APITestCase
+
+
+class VerificationEmailTestCase(APITestCase):
+    """Class for testing coalesced dispatch of verification emails."""
+
+    def setUp(self) -> None:
+        self.user = UserFactory(is_active=False)
+        self.credentials = {"email": self.user.email, "password": "1234567890"}
+        self.login_url = reverse("login")
+
+    @patch("apps.accounts.tasks.send_verification_email.delay")
+    def test_repeated_login_coalesced(self, mock_sent_email):
+        """Only the first login attempt within the window should queue an email."""
+        responses = [
+            self.client.post(self.login_url, self.credentials, format="json") for _ in range(3)
+        ]
+
+        self.assertEqual(mock_sent_email.call_count, 1)
+        self.assertEqual([r.status_code for r in responses], [status.HTTP_403_FORBIDDEN] * 3)
+        self.assertEqual([r.data["email_suppressed"] for r in responses], [False, True, True])
+        self.assertIn("already been sent", responses[1].data["message"])
+        self.assertEqual(verification_email_stats(), {"published": 1, "suppressed": 2})
+        out = StringIO()
+        call_command("verification_email_stats", stdout=out)
+        self.assertEqual(out.getvalue(), "1 published, 2 suppressed (66.7% of attempts).\n")
+
+    @patch("apps.accounts.tasks.send_verification_email.delay")
+    def test_window_expired(self, mock_sent_email):
+        """Another email should be queued once the window has passed."""
+        with self.settings(VERIFICATION_EMAIL_WINDOW=-1):  # expires immediately
+            self.assertTrue(queue_verification_email(self.user))
+            self.assertTrue(queue_verification_email(self.user))
+
+        self.assertEqual(mock_sent_email.call_count, 2)
+
+    @patch("apps.accounts.tasks.send_verification_email.delay", side_effect=OperationalError)
+    def test_publish_failed(self, mock_sent_email):
+        """A failed publish shouldn't suppress the next attempt."""
+        for _ in range(2):
+            with self.assertRaises(OperationalError):
+                queue_verification_email(self.user)
+
+        self.assertEqual(mock_sent_email.call_count, 2)
+        self.assertEqual(verification_email_stats(), {"published": 0, "suppressed": 0})
+
+    def test_pending_token_sent(self):
+        """The email should carry the token stored when it was queued."""
+        app.conf.task_always_eager = True
+        self.addCleanup(setattr, app.conf, "task_always_eager", False)
+
+        with patch.object(default_token_generator, "make_token", return_value="pending-token"):
+            queue_verification_email(self.user)
+
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertIn(f"/{self.user.id}/pending-token/", mail.outbox[0].body)
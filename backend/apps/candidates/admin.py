@@ -53,3 +53,7 @@ class CandidateAdmin(ImportExportMixin, admin.ModelAdmin):
         "level_of_english",
         "vacancy",
     )
+
+    def get_queryset(self, request):
+        """Ages in the list are computed by the database."""
+        return super().get_queryset(request).with_age()
@@ -1,12 +1,27 @@
 from apps.candidates.models import Candidate
+from apps.candidates.search import rank_candidates, search_candidates
 from django_filters import rest_framework as filters
 
 
 class CandidateFilter(filters.FilterSet):
     """This is a filter settings for the Candidate model."""
 
-    fullname = filters.CharFilter(lookup_expr="icontains")
+    fullname = filters.CharFilter(method="filter_fullname")
+    min_age = filters.NumberFilter(method="filter_min_age", min_value=0)
+    max_age = filters.NumberFilter(method="filter_max_age", min_value=0)
 
     class Meta:
         model = Candidate
         fields = ("created_at",)
+
+    def filter_fullname(self, queryset, name, value):
+        """Search candidates by name and surname in any order, the best matches go first."""
+        return rank_candidates(search_candidates(queryset, value))
+
+    def filter_min_age(self, queryset, name, value):
+        """Filter candidates at least `value` years old by their date of birth."""
+        return queryset.age_between(min_age=int(value))
+
+    def filter_max_age(self, queryset, name, value):
+        """Filter candidates at most `value` years old by their date of birth."""
+        return queryset.age_between(max_age=int(value))
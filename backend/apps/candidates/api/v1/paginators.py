@@ -1,8 +1,8 @@
-from rest_framework.pagination import PageNumberPagination
+from base.pagination import KeysetPagination
 
 
-class CustomCandidatePagination(PageNumberPagination):
+class CustomCandidatePagination(KeysetPagination):
     """This is a custom paginator for Candidates."""
 
     page_size = 25
-    page_size_query_param = "page_size"
+    max_page_size = 100
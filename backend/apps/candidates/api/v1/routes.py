@@ -1,4 +1,5 @@
 from apps.candidates.api.v1.views import (
+    ImportCandidatesAPIView,
     ListCreateCandidateAPIView,
     RetrieveUpdateDestroyCandidateView,
 )
@@ -10,5 +11,6 @@ router.register(r"", ListCreateCandidateAPIView, basename="candidates")
 
 urlpatterns = [
     path("", include(router.urls)),
+    path("import/", ImportCandidatesAPIView.as_view(), name="candidates-import"),
     path(r"<int:pk>/", RetrieveUpdateDestroyCandidateView.as_view(), name="candidate-rud-view"),
 ]
@@ -8,6 +8,9 @@ class CandidateListSerializer(serializers.ModelSerializer):
     vacancies_count = serializers.IntegerField(
         read_only=True,
     )
+    age = serializers.IntegerField(
+        read_only=True,
+    )
 
     class Meta:
         model = Candidate
@@ -16,6 +19,7 @@ class CandidateListSerializer(serializers.ModelSerializer):
             "name",
             "surname",
             "date_of_birth",
+            "age",
             "gender",
             "phone_number",
             "email",
@@ -32,6 +36,10 @@ class CandidateListSerializer(serializers.ModelSerializer):
 class CandidateRUDSerializer(serializers.ModelSerializer):
     """This is a serializer class for the Event model."""
 
+    age = serializers.IntegerField(
+        read_only=True,
+    )
+
     class Meta:
         model = Candidate
         fields = (
@@ -39,6 +47,7 @@ class CandidateRUDSerializer(serializers.ModelSerializer):
             "name",
             "surname",
             "date_of_birth",
+            "age",
             "gender",
             "phone_number",
             "email",
@@ -1,9 +1,18 @@
+import codecs
+import csv
+import json
+from tempfile import SpooledTemporaryFile
+
 from apps.candidates.api.v1.filters import CandidateFilter
 from apps.candidates.api.v1.paginators import CustomCandidatePagination
 from apps.candidates.api.v1.serializers import CandidateListSerializer, CandidateRUDSerializer
+from apps.candidates.importing import import_candidates, read_csv, read_jsonl
 from apps.candidates.models import Candidate
+from base.export import StreamingExportMixin
 from django.db.models import Count
+from django.http import StreamingHttpResponse
 from django_filters import rest_framework as filters
+from rest_framework.exceptions import ParseError, UnsupportedMediaType
 from rest_framework.generics import GenericAPIView
 from rest_framework.mixins import (
     CreateModelMixin,
@@ -13,10 +22,16 @@ from rest_framework.mixins import (
     UpdateModelMixin,
 )
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.views import APIView
 from rest_framework.viewsets import GenericViewSet
 
+# Import reports are kept in memory up to this size, bigger ones are spooled to disk.
+IMPORT_REPORT_MEMORY_SIZE = 1024 * 1024
+
 
-class ListCreateCandidateAPIView(ListModelMixin, CreateModelMixin, GenericViewSet):
+class ListCreateCandidateAPIView(
+    StreamingExportMixin, ListModelMixin, CreateModelMixin, GenericViewSet
+):
     """
     LIST / CREATE view for the Candidate model.
 
@@ -28,6 +43,9 @@ class ListCreateCandidateAPIView(ListModelMixin, CreateModelMixin, GenericViewSe
     post:
     Create a new Candidate instance.
 
+    get export/:
+    Stream filtered Candidates as a CSV or JSON Lines file.
+
     """
 
     serializer_class = CandidateListSerializer
@@ -35,10 +53,30 @@ class ListCreateCandidateAPIView(ListModelMixin, CreateModelMixin, GenericViewSe
     permission_classes = (IsAuthenticated,)
     filter_backends = (filters.DjangoFilterBackend,)
     filterset_class = CandidateFilter
+    export_name = "candidates"
+    export_fields = {
+        field: field
+        for field in (
+            "id",
+            "name",
+            "surname",
+            "date_of_birth",
+            "age",
+            "gender",
+            "phone_number",
+            "email",
+            "level_of_english",
+            "notes",
+            "additional_contacts",
+            "vacancies_count",
+            "created_at",
+            "updated_at",
+        )
+    }
 
     def get_queryset(self):
         return (
-            Candidate.objects.all()
+            Candidate.objects.with_age()
             .order_by("-surname", "-name")
             .annotate(
                 vacancies_count=Count("vacancy"),
@@ -72,7 +110,7 @@ class RetrieveUpdateDestroyCandidateView(
 
     serializer_class = CandidateRUDSerializer
     permission_classes = (IsAuthenticated,)
-    queryset = Candidate.objects.all()
+    queryset = Candidate.objects.with_age()
 
     def get(self, request, *args, **kwargs):
         """GET method of the API."""
@@ -89,3 +127,60 @@ class RetrieveUpdateDestroyCandidateView(
     def delete(self, request, *args, **kwargs):
         """DELETE method of the API."""
         return self.destroy(request, *args, **kwargs)
+
+
+class ImportCandidatesAPIView(APIView):
+    """
+    IMPORT view for the Candidate model.
+
+    API
+    -----------
+    post:
+    Create or update Candidates from a CSV (text/csv, with a header row) or JSON Lines
+    (application/x-ndjson) request body, which is read as it arrives. Candidates with
+    a phone number which is already taken are updated, or skipped with
+    `?on_duplicate=skip`. The response is a JSON Lines report: numbers of processed,
+    created, updated, skipped and failed rows, then errors of every invalid row.
+
+    """
+
+    permission_classes = (IsAuthenticated,)
+    readers = {
+        "text/csv": read_csv,
+        "application/x-ndjson": read_jsonl,
+        "application/jsonl": read_jsonl,
+    }
+
+    def post(self, request, *args, **kwargs):
+        """POST method of the API."""
+        media_type = request.content_type.split(";")[0].strip().lower()
+        if media_type not in self.readers:
+            raise UnsupportedMediaType(media_type)
+
+        report = SpooledTemporaryFile(max_size=IMPORT_REPORT_MEMORY_SIZE, mode="w+")
+
+        def write_error(number: int, errors: dict):
+            report.write(json.dumps({"row": number, "errors": errors}) + "\n")
+
+        lines = codecs.iterdecode(request.stream or (), "utf-8-sig")
+        try:
+            stats = import_candidates(
+                self.readers[media_type](lines),
+                update_existing=request.query_params.get("on_duplicate") != "skip",
+                on_error=write_error,
+            )
+        except (UnicodeDecodeError, csv.Error) as err:
+            report.close()
+            raise ParseError(f"The request body couldn't be read: {err}")
+
+        return StreamingHttpResponse(
+            self.stream_report(stats, report), content_type="application/x-ndjson"
+        )
+
+    @staticmethod
+    def stream_report(stats: dict, report):
+        """Yield the report lines and close the report file."""
+        with report:
+            yield json.dumps(stats) + "\n"
+            report.seek(0)
+            yield from report
@@ -0,0 +1,178 @@
+import csv
+import json
+from collections import defaultdict
+from itertools import islice
+from typing import Callable, Iterable, Iterator
+
+from apps.candidates.models import Candidate
+from apps.candidates.search import normalize_name
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from phonenumber_field.phonenumber import to_python
+
+# Columns read from the imported rows, other columns are ignored.
+IMPORT_FIELDS = (
+    "name",
+    "surname",
+    "phone_number",
+    "email",
+    "date_of_birth",
+    "gender",
+    "level_of_english",
+    "notes",
+    "additional_contacts",
+)
+REQUIRED_FIELDS = ("name", "surname", "phone_number")
+# Fields which are always updated when an existing candidate is imported again.
+DERIVED_FIELDS = ("search_name", "updated_at")
+NON_FIELD_ERRORS = "non_field_errors"
+
+
+def read_csv(lines: Iterable[str]) -> Iterator[tuple[int, dict]]:
+    """Yield numbered rows of CSV lines with a header, one at a time."""
+    for number, row in enumerate(csv.DictReader(lines), start=1):
+        yield number, row
+
+
+def read_jsonl(lines: Iterable[str]) -> Iterator[tuple[int, dict]]:
+    """Yield numbered JSON objects of non-empty lines, None stands for a malformed line."""
+    number = 0
+    for line in lines:
+        if not line.strip():
+            continue
+        number += 1
+        try:
+            row = json.loads(line)
+        except ValueError:
+            row = None
+        yield number, row if isinstance(row, dict) else None
+
+
+def normalize_phone_numbers(values: Iterable) -> dict[str, str]:
+    """
+    Parse every distinct phone number once and map it to its E.164 form, the way
+    Candidate.phone_number stores it. Invalid numbers are left out.
+    """
+    numbers = {}
+    for value in set(values):
+        number = to_python(value)
+        if number and number.is_valid():
+            numbers[value] = number.as_e164
+    return numbers
+
+
+def clean_row(row: dict, phone_numbers: dict) -> tuple[dict, dict]:
+    """
+    Return values of the import fields present in the row, validated by the model
+    fields, and errors of the invalid ones. Empty values are replaced by defaults.
+    """
+    values, errors = {}, {}
+    for name in IMPORT_FIELDS:
+        if name not in row:
+            if name in REQUIRED_FIELDS:
+                errors[name] = ["This field is required."]
+            continue
+        raw = row[name]
+        field = Candidate._meta.get_field(name)
+        if raw is None or str(raw).strip() == "":
+            if name in REQUIRED_FIELDS:
+                errors[name] = ["This field may not be blank."]
+            else:
+                values[name] = field.get_default()
+        elif name == "phone_number":
+            if str(raw) in phone_numbers:
+                values[name] = phone_numbers[str(raw)]
+            else:
+                errors[name] = ["Enter a valid phone number."]
+        else:
+            try:
+                values[name] = field.clean(str(raw).strip(), None)
+            except ValidationError as err:
+                errors[name] = err.messages
+    return values, errors
+
+
+def import_candidates(
+    rows: Iterable[tuple[int, dict]],
+    update_existing: bool = True,
+    chunk_size: int = None,
+    on_error: Callable[[int, dict], None] = None,
+) -> dict:
+    """
+    Create candidates from numbered rows with IMPORT_FIELDS, and return numbers of
+    processed, created, updated, skipped and failed rows.
+
+    Rows are consumed in chunks of `chunk_size` (default is
+    settings.CANDIDATE_IMPORT_CHUNK_SIZE), so memory usage doesn't grow with the number
+    of rows. Phone numbers of a chunk are normalised together, candidates who already
+    exist are found with one query, and the chunk is saved with one bulk_create per
+    set of present columns in its own transaction. Candidates whose phone number is
+    already taken are updated with the present columns, or skipped if not
+    `update_existing`. Invalid rows are passed to `on_error(number, errors)`.
+    """
+    chunk_size = chunk_size or settings.CANDIDATE_IMPORT_CHUNK_SIZE
+    stats = {"processed": 0, "created": 0, "updated": 0, "skipped": 0, "failed": 0}
+    rows = iter(rows)
+    while chunk := list(islice(rows, chunk_size)):
+        _import_chunk(chunk, update_existing, stats, on_error)
+        stats["processed"] += len(chunk)
+    return stats
+
+
+def _import_chunk(rows: list, update_existing: bool, stats: dict, on_error: Callable):
+    """Save a chunk of rows and add its outcomes to the stats."""
+    phone_numbers = normalize_phone_numbers(
+        str(row["phone_number"])
+        for _, row in rows
+        if row is not None and row.get("phone_number") is not None
+    )
+    cleaned = []
+    for number, row in rows:
+        if row is None:
+            values, errors = {}, {NON_FIELD_ERRORS: ["Expected a JSON object."]}
+        else:
+            values, errors = clean_row(row, phone_numbers)
+        if errors:
+            stats["failed"] += 1
+            if on_error is not None:
+                on_error(number, errors)
+        else:
+            cleaned.append(values)
+
+    existing = set(
+        Candidate.objects.filter(phone_number__in={values["phone_number"] for values in cleaned})
+        .order_by()
+        .values_list("phone_number", flat=True)
+    )
+    # Candidates by phone number, a later row of the same candidate overrides an earlier one.
+    candidates = {}
+    for values in cleaned:
+        phone_number = values["phone_number"]
+        if phone_number in existing or phone_number in candidates:
+            if not update_existing:
+                stats["skipped"] += 1
+                continue
+            stats["updated"] += 1
+        else:
+            stats["created"] += 1
+        candidates[phone_number] = values
+
+    groups = defaultdict(list)
+    for values in candidates.values():
+        candidate = Candidate(**values)
+        candidate.search_name = normalize_name(candidate.name, candidate.surname)
+        groups[tuple(values)].append(candidate)
+
+    with transaction.atomic():
+        for fields, group in groups.items():
+            if update_existing:
+                Candidate.objects.bulk_create(
+                    group,
+                    update_conflicts=True,
+                    unique_fields=("phone_number",),
+                    update_fields=[field for field in fields if field != "phone_number"]
+                    + list(DERIVED_FIELDS),
+                )
+            else:
+                Candidate.objects.bulk_create(group, ignore_conflicts=True)
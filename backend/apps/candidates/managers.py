@@ -0,0 +1,52 @@
+from datetime import date
+
+from django.db.models import Case, IntegerField, Q, QuerySet, Value, When
+from django.db.models.functions import ExtractYear
+
+
+def years_before(day: date, years: int) -> date:
+    """Return the same day `years` years earlier, Feb 29 becomes Feb 28."""
+    try:
+        return day.replace(year=day.year - years)
+    except ValueError:
+        return day.replace(year=day.year - years, day=28)
+
+
+class CandidateQuerySet(QuerySet):
+    """
+    This class represents a custom Candidate queryset.
+
+    Methods
+    -------
+    with_age(self):
+        annotates candidates with their age
+    age_between(self, min_age=None, max_age=None):
+        filters candidates by age
+
+    """
+
+    def with_age(self):
+        """Annotate candidates with their age in full years, computed by the database.
+        It is NULL for candidates without a date of birth."""
+        today = date.today()
+        birthday_ahead = Q(date_of_birth__month__gt=today.month) | Q(
+            date_of_birth__month=today.month, date_of_birth__day__gt=today.day
+        )
+        return self.annotate(
+            age=Value(today.year)
+            - ExtractYear("date_of_birth")
+            - Case(
+                When(birthday_ahead, then=Value(1)), default=Value(0), output_field=IntegerField()
+            )
+        )
+
+    def age_between(self, min_age: int = None, max_age: int = None):
+        """Filter candidates who are at least `min_age` and at most `max_age` years old.
+        Ages are turned into a range of birth dates, so the date_of_birth index is used."""
+        today = date.today()
+        queryset = self
+        if min_age is not None:
+            queryset = queryset.filter(date_of_birth__lte=years_before(today, min_age))
+        if max_age is not None:
+            queryset = queryset.filter(date_of_birth__gt=years_before(today, max_age + 1))
+        return queryset
@@ -0,0 +1,51 @@
+# Generated by Django 4.1 on 2026-10-18 18:19
+
+import re
+import unicodedata
+
+from django.db import migrations, models
+
+BATCH_SIZE = 1000
+NON_WORD_CHARACTERS = re.compile(r"[\W_]+")
+
+
+def normalize_name(*parts):
+    """A frozen copy of apps.candidates.search.normalize_name at the time of this migration."""
+    text = unicodedata.normalize("NFKD", " ".join(part or "" for part in parts))
+    text = "".join(char for char in text if not unicodedata.combining(char))
+    text = NON_WORD_CHARACTERS.sub(" ", text.replace("'", "").replace("’", ""))
+    return " ".join(text.casefold().split())
+
+
+def fill_search_names(apps, schema_editor):
+    Candidate = apps.get_model("candidates", "Candidate")
+    batch = []
+    for candidate in Candidate.objects.only("name", "surname").iterator(chunk_size=BATCH_SIZE):
+        candidate.search_name = normalize_name(candidate.name, candidate.surname)
+        batch.append(candidate)
+        if len(batch) == BATCH_SIZE:
+            Candidate.objects.bulk_update(batch, ["search_name"])
+            batch = []
+    Candidate.objects.bulk_update(batch, ["search_name"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("candidates", "0002_candidate_vacancy"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="candidate",
+            name="search_name",
+            field=models.CharField(
+                db_index=True,
+                default="",
+                editable=False,
+                max_length=101,
+                verbose_name="Search name",
+            ),
+        ),
+        migrations.RunPython(fill_search_names, migrations.RunPython.noop),
+    ]
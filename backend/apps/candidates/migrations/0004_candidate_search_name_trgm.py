@@ -0,0 +1,35 @@
+from django.db import migrations
+
+# The trigram index serves the name search (see apps.candidates.search): `LIKE '% word%'`
+# lookups for words in the middle of a name and `<%` word similarity for typos. Prefix
+# lookups of the first word use the B-tree index of the field. Other databases don't need it.
+INDEX_NAME = "candidates_candidate_search_name_trgm"
+
+
+def create_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    schema_editor.execute(
+        f'CREATE INDEX CONCURRENTLY IF NOT EXISTS "{INDEX_NAME}" ON "candidates_candidate" '
+        f'USING gin ("search_name" gin_trgm_ops)'
+    )
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute(f'DROP INDEX CONCURRENTLY IF EXISTS "{INDEX_NAME}"')
+
+
+class Migration(migrations.Migration):
+    # The index is built concurrently, which can't be done in a transaction.
+    atomic = False
+
+    dependencies = [
+        ("candidates", "0003_candidate_search_name"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 4.1 on 2026-10-18 18:27
+
+import datetime
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("candidates", "0004_candidate_search_name_trgm"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="candidate",
+            name="date_of_birth",
+            field=models.DateField(
+                blank=True,
+                db_index=True,
+                null=True,
+                validators=[
+                    django.core.validators.MaxValueValidator(limit_value=datetime.date.today)
+                ],
+                verbose_name="Birth date",
+            ),
+        ),
+    ]
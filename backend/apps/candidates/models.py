@@ -1,5 +1,7 @@
 from datetime import date
 
+from apps.candidates.managers import CandidateQuerySet
+from apps.candidates.search import normalize_name
 from base.models import EnglishLevelChoices, GenderChoices
 from django.core.validators import MaxValueValidator
 from django.db import models
@@ -33,6 +35,8 @@ class Candidate(models.Model):
         additional info about the candidate
     additional_contacts : str
         additional contact info of the candidate
+    search_name : str
+        normalized "name surname" used by the name search, kept up to date by save()
     age : int
         age of the candidate
     updated_at : date
@@ -62,6 +66,7 @@ class Candidate(models.Model):
         validators=[MaxValueValidator(limit_value=date.today)],
         blank=True,
         null=True,
+        db_index=True,
     )
     gender = models.CharField(
         verbose_name=_("Gender"),
@@ -99,6 +104,13 @@ class Candidate(models.Model):
         null=True,
         help_text="Here you can store additional contacts, like Skype.",
     )
+    search_name = models.CharField(
+        _("Search name"),
+        max_length=101,
+        db_index=True,
+        editable=False,
+        default="",
+    )
     updated_at = models.DateTimeField(
         _("Last update"),
         auto_now=True,
@@ -116,9 +128,13 @@ class Candidate(models.Model):
         blank=True,
     )
 
+    objects = CandidateQuerySet.as_manager()
+
     @property
     def age(self) -> int:
-        """Return age of the candidate"""
+        """Return age of the candidate, annotated by CandidateQuerySet.with_age() if possible."""
+        if "_age" in self.__dict__:
+            return self._age or 0
         if not self.date_of_birth:
             return 0
 
@@ -126,6 +142,11 @@ class Candidate(models.Model):
         month_day = (self.date_of_birth.month, self.date_of_birth.day)
         return today.year - self.date_of_birth.year - ((today.month, today.day) < month_day)
 
+    @age.setter
+    def age(self, value: int):
+        """Keep the age annotated by the database."""
+        self._age = value
+
     @property
     def full_name(self) -> str:
         """Return full name of the Candidate."""
@@ -135,6 +156,15 @@ class Candidate(models.Model):
     def applications_for_vacancies(self) -> str:
         return "; ".join([f"{i.title}" for i in self.vacancy.all()])
 
+    def save(self, *args, **kwargs):
+        """Save the Candidate with its search name matching the name and surname."""
+        self.search_name = normalize_name(self.name, self.surname)
+        self.__dict__.pop("_age", None)  # the date of birth may have changed
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and {"name", "surname"} & set(update_fields):
+            kwargs["update_fields"] = {*update_fields, "search_name"}
+        super().save(*args, **kwargs)
+
     def __str__(self) -> str:
         """Return full name of the Candidate."""
         return self.full_name
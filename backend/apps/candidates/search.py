@@ -0,0 +1,94 @@
+import re
+import unicodedata
+
+from django.db import connections
+from django.db.models import (
+    BooleanField,
+    Case,
+    F,
+    FloatField,
+    Func,
+    IntegerField,
+    Q,
+    QuerySet,
+    Value,
+    When,
+)
+
+# Words of the search term beyond MAX_SEARCH_WORDS are ignored.
+MAX_SEARCH_WORDS = 4
+NON_WORD_CHARACTERS = re.compile(r"[\W_]+")
+
+
+def normalize_name(*parts: str) -> str:
+    """
+    Return the name parts joined into a lowercase string of words without accents
+    and punctuation, e.g. ("Zoë", "O'Brien-Smith") -> "zoe obrien smith".
+    """
+    text = unicodedata.normalize("NFKD", " ".join(part or "" for part in parts))
+    text = "".join(char for char in text if not unicodedata.combining(char))
+    text = NON_WORD_CHARACTERS.sub(" ", text.replace("'", "").replace("’", ""))
+    return " ".join(text.casefold().split())
+
+
+class WordSimilar(Func):
+    """pg_trgm `term <% column`: some word of the column is similar to the term."""
+
+    arg_joiner = " <%% "
+    template = "(%(expressions)s)"
+    output_field = BooleanField()
+
+
+class WordSimilarity(Func):
+    """pg_trgm word_similarity(term, column), from 0 to 1."""
+
+    function = "word_similarity"
+    output_field = FloatField()
+
+
+def search_candidates(queryset: QuerySet, term: str) -> QuerySet:
+    """
+    Filter candidates whose `search_name` ("name surname", see normalize_name())
+    has a word starting with every word of the term, in any order, and annotate
+    them with `search_rank`: 0 if the term is the whole name in either order,
+    1 if the name starts with the first word, 2 otherwise.
+
+    On PostgreSQL candidates with a word similar to the term are matched as well,
+    so typos are tolerated, and matches with the same rank are ordered by
+    `search_similarity`. Both lookups are served by the trigram index on
+    `search_name` (see migration 0004). Other databases match prefixes only.
+    """
+    words = normalize_name(term).split()[:MAX_SEARCH_WORDS]
+    if not words:
+        return queryset
+
+    condition = Q()
+    for word in words:
+        condition &= Q(search_name__startswith=word) | Q(search_name__contains=f" {word}")
+
+    normalized = " ".join(words)
+    postgres = connections[queryset.db].vendor == "postgresql"
+    if postgres:
+        condition |= Q(WordSimilar(Value(normalized), F("search_name")))
+
+    queryset = queryset.filter(condition).annotate(
+        search_rank=Case(
+            When(search_name__in={normalized, " ".join(reversed(words))}, then=Value(0)),
+            When(search_name__startswith=words[0], then=Value(1)),
+            default=Value(2),
+            output_field=IntegerField(),
+        )
+    )
+    if postgres:
+        queryset = queryset.annotate(
+            search_similarity=WordSimilarity(Value(normalized), F("search_name"))
+        )
+    return queryset
+
+
+def rank_candidates(queryset: QuerySet) -> QuerySet:
+    """Put the best matches of search_candidates() first, the ordering only breaks ties."""
+    ordering = ["search_rank"]
+    if "search_similarity" in queryset.query.annotations:
+        ordering.append("-search_similarity")
+    return queryset.order_by(*ordering, *queryset.query.order_by)
@@ -0,0 +1,76 @@
+from datetime import date, timedelta
+
+from apps.accounts.factories import ProfileFactory
+from apps.candidates.factories import CandidateFactory
+from apps.candidates.managers import years_before
+from apps.candidates.models import Candidate
+from django.test import TestCase
+from rest_framework.reverse import reverse
+from rest_framework.test import APIClient
+
+
+class TestCandidateAge(TestCase):
+    """This class tests ages of Candidates computed by the database."""
+
+    def setUp(self) -> None:
+        today = date.today()
+        self.birthday_today = CandidateFactory(date_of_birth=years_before(today, 30))
+        self.birthday_tomorrow = CandidateFactory(
+            date_of_birth=years_before(today + timedelta(days=1), 30)
+        )
+        self.leap_day = CandidateFactory(date_of_birth=date(2000, 2, 29))
+        self.unknown = CandidateFactory(date_of_birth=None)
+        self.client = APIClient()
+        self.client.force_authenticate(user=ProfileFactory().user)
+
+    def test_annotated_age_matches_property(self):
+        """The database should compute the same ages as Python does."""
+        candidates = Candidate.objects.with_age()
+
+        for candidate in candidates:
+            computed = Candidate.objects.get(id=candidate.id).age
+            self.assertEqual(candidate.age, computed)
+        self.assertEqual(candidates.get(id=self.birthday_today.id).age, 30)
+        self.assertEqual(candidates.get(id=self.birthday_tomorrow.id).age, 29)
+        self.assertEqual(candidates.get(id=self.unknown.id).age, 0)
+
+    def test_age_between(self):
+        """Age bounds should be inclusive and skip unknown birth dates."""
+        ids = set(Candidate.objects.age_between(30, 30).values_list("id", flat=True))
+        self.assertEqual(ids, {self.birthday_today.id})
+
+        ids = set(Candidate.objects.age_between(max_age=29).values_list("id", flat=True))
+        self.assertIn(self.birthday_tomorrow.id, ids)
+        self.assertNotIn(self.unknown.id, ids)
+
+    def test_years_before_leap_day(self):
+        """Leap days should fall back to Feb 28."""
+        self.assertEqual(years_before(date(2024, 2, 29), 18), date(2006, 2, 28))
+
+    def test_list_filters_and_age(self):
+        """The list should filter by age range and return the annotated age."""
+        response = self.client.get(
+            reverse("candidates:candidates-list"), {"min_age": 29, "max_age": 29}
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [(c["id"], c["age"]) for c in response.data["results"]],
+            [(self.birthday_tomorrow.id, 29)],
+        )
+
+    def test_invalid_age(self):
+        """Negative ages should be rejected."""
+        response = self.client.get(reverse("candidates:candidates-list"), {"min_age": -1})
+
+        self.assertEqual(response.status_code, 400)
+
+    def test_age_after_update(self):
+        """An update should return the age of the new date of birth."""
+        response = self.client.patch(
+            reverse("candidates:candidate-rud-view", kwargs={"pk": self.birthday_today.id}),
+            {"date_of_birth": years_before(date.today(), 40).isoformat()},
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["age"], 40)
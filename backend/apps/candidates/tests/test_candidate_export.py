@@ -0,0 +1,68 @@
+import csv
+import gzip
+import io
+import json
+
+from apps.accounts.factories import ProfileFactory
+from apps.candidates.factories import CandidateFactory
+from base.export import buffered, gzipped
+from django.test import TestCase
+from rest_framework.reverse import reverse
+from rest_framework.test import APIClient
+
+
+class TestCandidateExport(TestCase):
+    """This class tests the streaming export of Candidates."""
+
+    def setUp(self) -> None:
+        self.ivan = CandidateFactory(name="Ivan", surname="Petrenko", phone_number="+380660000001")
+        self.olena = CandidateFactory(name="Olena", surname="Koval", phone_number="+380660000002")
+        self.url = reverse("candidates:candidates-export")
+        self.client = APIClient()
+        self.client.force_authenticate(user=ProfileFactory().user)
+
+    def export(self, **params) -> tuple:
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        return response, b"".join(response.streaming_content)
+
+    def test_export_csv(self):
+        """All candidates should be exported with all columns in the list ordering."""
+        response, content = self.export()
+
+        rows = list(csv.DictReader(io.StringIO(content.decode())))
+        self.assertEqual(response["Content-Disposition"], 'attachment; filename="candidates.csv"')
+        self.assertEqual([row["surname"] for row in rows], ["Petrenko", "Koval"])
+        self.assertEqual(rows[0]["phone_number"], "+380660000001")
+        self.assertIn("age", rows[0])
+
+    def test_export_selected_columns_jsonl(self):
+        """Only the selected columns should be exported, filters of the list apply."""
+        _, content = self.export(fields="id,name", file_format="jsonl", fullname="olena")
+
+        self.assertEqual(
+            [json.loads(line) for line in content.splitlines()],
+            [{"id": self.olena.id, "name": "Olena"}],
+        )
+
+    def test_export_gzip(self):
+        """Compressed exports should be valid gzip files."""
+        response, content = self.export(fields="name", compression="gzip")
+
+        self.assertEqual(response["Content-Type"], "application/gzip")
+        self.assertEqual(gzip.decompress(content).decode().split(), ["name", "Ivan", "Olena"])
+
+    def test_export_invalid_parameters(self):
+        """Unknown columns, formats and compressions should be rejected."""
+        for params in ({"fields": "password"}, {"file_format": "xlsx"}, {"compression": "br"}):
+            response = self.client.get(self.url, params)
+            self.assertEqual(response.status_code, 400)
+
+    def test_stream_pieces(self):
+        """Lines should be joined into pieces and the first piece compressed right away."""
+        pieces = list(buffered((f"{i}\n" for i in range(10)), size=8))
+
+        self.assertEqual(pieces, [b"0\n1\n2\n3\n", b"4\n5\n6\n7\n", b"8\n9\n"])
+        first, *_ = gzipped(iter(pieces))
+        self.assertEqual(gzip.GzipFile(fileobj=io.BytesIO(first)).read(8), pieces[0])
@@ -0,0 +1,107 @@
+import json
+from urllib.parse import urlencode
+
+from apps.accounts.factories import ProfileFactory
+from apps.candidates.factories import CandidateFactory
+from apps.candidates.importing import import_candidates, read_csv
+from apps.candidates.models import Candidate
+from django.test import TestCase
+from rest_framework.reverse import reverse
+from rest_framework.test import APIClient
+
+CSV_BODY = (
+    "name,surname,phone_number,email,date_of_birth,gender\n"
+    "Ivan,Petrenko,+380 66 000 0001,ivan@ex.com,1990-05-01,M\n"
+    "Olena,Koval,+380660000002,,,\n"
+    "Petro,,+380660000003,petro@ex.com,,\n"
+    "Taras,Shevchenko,not a phone,,1990-13-01,X\n"
+)
+
+
+class TestCandidateImport(TestCase):
+    """This class tests the bulk import of Candidates."""
+
+    def setUp(self) -> None:
+        self.url = reverse("candidates:candidates-import")
+        self.client = APIClient()
+        self.client.force_authenticate(user=ProfileFactory().user)
+
+    def post(self, body: str, content_type: str = "text/csv", **params) -> list[dict]:
+        response = self.client.generic(
+            "POST",
+            f"{self.url}?{urlencode(params)}",
+            body.encode(),
+            content_type,
+        )
+        self.assertEqual(response.status_code, 200)
+        return [json.loads(line) for line in b"".join(response.streaming_content).splitlines()]
+
+    def test_import_csv(self):
+        """Valid rows should be created, invalid ones reported with their errors."""
+        stats, *errors = self.post(CSV_BODY)
+
+        self.assertEqual(
+            stats, {"processed": 4, "created": 2, "updated": 0, "skipped": 0, "failed": 2}
+        )
+        self.assertEqual([error["row"] for error in errors], [3, 4])
+        self.assertEqual(set(errors[0]["errors"]), {"surname"})
+        self.assertEqual(set(errors[1]["errors"]), {"phone_number", "date_of_birth", "gender"})
+        ivan = Candidate.objects.get(phone_number="+380660000001")
+        self.assertEqual((ivan.search_name, ivan.gender), ("ivan petrenko", "M"))
+        self.assertEqual(Candidate.objects.get(surname="Koval").gender, "O")
+
+    def test_import_updates_existing(self):
+        """Candidates with a taken phone number should be updated with the given columns."""
+        existing = CandidateFactory(phone_number="+380660000001", notes="Keep me")
+
+        stats, *errors = self.post(
+            '{"name": "Ivan", "surname": "Franko", "phone_number": "+380660000001"}\n'
+            "\n"
+            "not json\n",
+            content_type="application/x-ndjson",
+        )
+
+        existing.refresh_from_db()
+        self.assertEqual((stats["updated"], stats["failed"]), (1, 1))
+        self.assertEqual(
+            errors, [{"row": 2, "errors": {"non_field_errors": ["Expected a JSON object."]}}]
+        )
+        self.assertEqual((existing.surname, existing.search_name), ("Franko", "ivan franko"))
+        self.assertEqual(existing.notes, "Keep me")
+
+    def test_import_skips_existing(self):
+        """With on_duplicate=skip existing candidates should stay untouched."""
+        existing = CandidateFactory(phone_number="+380660000001")
+
+        stats, *_ = self.post(CSV_BODY, on_duplicate="skip")
+
+        self.assertEqual((stats["created"], stats["skipped"]), (1, 1))
+        self.assertEqual(Candidate.objects.get(id=existing.id).surname, existing.surname)
+
+    def test_import_in_chunks(self):
+        """Every chunk should take a constant number of queries."""
+        rows = (
+            (n, {"name": "Name", "surname": f"S{n}", "phone_number": f"+38066100{n:04d}"})
+            for n in range(1, 7)
+        )
+        # A lookup and an upsert in a transaction (a savepoint in tests) for every chunk.
+        with self.assertNumQueries(3 * 4):
+            stats = import_candidates(rows, chunk_size=2)
+
+        self.assertEqual(stats["created"], 6)
+        self.assertEqual(Candidate.objects.count(), 6)
+
+    def test_duplicates_within_chunk(self):
+        """A later row of the same candidate should override an earlier one."""
+        lines = ["name,surname,phone_number\n", "A,One,+380660000001\n", "B,Two,+380660000001\n"]
+
+        stats = import_candidates(read_csv(lines))
+
+        self.assertEqual((stats["created"], stats["updated"]), (1, 1))
+        self.assertEqual(Candidate.objects.get().name, "B")
+
+    def test_unsupported_media_type(self):
+        """Bodies other than CSV and JSON Lines should be rejected."""
+        response = self.client.post(self.url, {"name": "Ivan"}, format="json")
+
+        self.assertEqual(response.status_code, 415)
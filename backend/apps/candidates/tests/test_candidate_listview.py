@@ -24,7 +24,7 @@ class TestCandidatesListView(TestCase):
 
     def test_get_authorized(self):
         """Authorized user should be able to get Candidates."""
-        response = self.client.get(reverse("candidates:candidates-list"))
+        response = self.client.get(reverse("candidates:candidates-list"), {"count": "true"})
 
         self.assertEqual(response.data.get("count"), 5)
         self.assertEqual(response.status_code, 200)
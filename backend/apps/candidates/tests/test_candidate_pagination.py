@@ -0,0 +1,116 @@
+from datetime import date
+from urllib.parse import parse_qs, urlparse
+
+from apps.accounts.factories import ProfileFactory
+from apps.candidates.factories import CandidateFactory
+from apps.candidates.models import Candidate
+from base.pagination import KeysetPagination
+from django.db.models.functions import Lower
+from django.test import TestCase
+from rest_framework.request import Request
+from rest_framework.reverse import reverse
+from rest_framework.test import APIClient, APIRequestFactory
+
+
+class TestCandidatePagination(TestCase):
+    """This class tests keyset pagination of Candidates."""
+
+    def setUp(self) -> None:
+        for surname in ("Bondar", "Koval", "Koval", "Melnyk", "Shevchenko"):
+            CandidateFactory(name="Ivan", surname=surname)
+        self.url = reverse("candidates:candidates-list")
+        self.client = APIClient()
+        self.client.force_authenticate(user=ProfileFactory().user)
+
+    def collect(self, url: str, params: dict = None, link: str = "next") -> list[list[int]]:
+        """Follow the links and return ids of candidates on every page."""
+        pages = []
+        while url:
+            response = self.client.get(url, params)
+            self.assertEqual(response.status_code, 200)
+            pages.append([candidate["id"] for candidate in response.data["results"]])
+            url, params = response.data[link], None
+        return pages
+
+    def test_pages_follow_ordering(self):
+        """Pages should cover all candidates in the view ordering, ties broken by id."""
+        expected = list(
+            Candidate.objects.order_by("-surname", "-name", "-id").values_list("id", flat=True)
+        )
+
+        pages = self.collect(self.url, {"page_size": 2})
+
+        self.assertEqual([len(page) for page in pages], [2, 2, 1])
+        self.assertEqual(sum(pages, []), expected)
+
+    def test_previous_pages(self):
+        """Previous links should lead back through the same pages."""
+        forward = self.collect(self.url, {"page_size": 2})
+        last_page = self.client.get(self.url, {"page_size": 2}).data["next"]
+        last_page = self.client.get(last_page).data["next"]
+
+        backward = self.collect(last_page, link="previous")
+
+        self.assertEqual(backward, forward[::-1])
+
+    def test_new_rows_are_not_repeated(self):
+        """Rows added before the cursor position shouldn't shift the next page."""
+        first = self.client.get(self.url, {"page_size": 2}).data
+        CandidateFactory(name="Ivan", surname="Zinchenko")
+
+        second = self.client.get(first["next"]).data
+
+        self.assertEqual(len(second["results"]), 2)
+        self.assertFalse({c["id"] for c in first["results"]} & {c["id"] for c in second["results"]})
+
+    def test_page_size_capped(self):
+        """The page size asked by the client should be capped, the count is optional."""
+        request = Request(APIRequestFactory().get("/", {"page_size": 1000}))
+        response = self.client.get(self.url, {"page_size": 1000})
+
+        self.assertEqual(KeysetPagination().get_page_size(request), 100)
+        self.assertEqual(len(response.data["results"]), 5)
+        self.assertIsNone(response.data["next"])
+        self.assertNotIn("count", response.data)
+
+    def test_invalid_cursor(self):
+        """A malformed cursor should be rejected."""
+        response = self.client.get(self.url, {"cursor": "garbage"})
+
+        self.assertEqual(response.status_code, 404)
+
+    def test_nullable_ordering(self):
+        """Rows with NULL keys should come last and be paginated like any others."""
+        Candidate.objects.filter(surname="Koval").update(date_of_birth=date(1990, 1, 1))
+        Candidate.objects.exclude(surname="Koval").update(date_of_birth=None)
+        paginator = KeysetPagination()
+        paginator.page_size = paginator.max_page_size = 2
+
+        ids, cursor = [], None
+        while True:
+            request = Request(APIRequestFactory().get("/", {"cursor": cursor} if cursor else {}))
+            page = paginator.paginate_queryset(Candidate.objects.order_by("date_of_birth"), request)
+            ids.extend(candidate.id for candidate in page)
+            if not paginator.has_next:
+                break
+            cursor = parse_qs(urlparse(paginator.get_next_link()).query)["cursor"][0]
+
+        koval = set(Candidate.objects.filter(surname="Koval").values_list("id", flat=True))
+        self.assertEqual(len(ids), 5)
+        self.assertEqual(set(ids[:2]), koval)
+        self.assertEqual(ids[2:], sorted(set(ids) - koval))
+
+    def test_expression_ordering_falls_back_to_pk(self):
+        """Rows ordered by an expression should be paginated by the primary key."""
+        paginator = KeysetPagination()
+        paginator.page_size = paginator.max_page_size = 2
+        request = Request(APIRequestFactory().get("/"))
+
+        with self.assertLogs("base.pagination", "WARNING"):
+            page = paginator.paginate_queryset(
+                Candidate.objects.order_by(Lower("surname")), request
+            )
+
+        ids = list(Candidate.objects.order_by("pk").values_list("id", flat=True))
+        self.assertEqual([candidate.id for candidate in page], ids[:2])
+        self.assertTrue(paginator.has_next)
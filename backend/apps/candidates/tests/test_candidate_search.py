@@ -0,0 +1,61 @@
+from apps.accounts.factories import ProfileFactory
+from apps.candidates.factories import CandidateFactory
+from apps.candidates.models import Candidate
+from apps.candidates.search import normalize_name, search_candidates
+from django.test import TestCase
+from rest_framework.reverse import reverse
+from rest_framework.test import APIClient
+
+
+class TestCandidateSearch(TestCase):
+    """This class tests the name search of Candidates."""
+
+    def setUp(self) -> None:
+        self.ivan = CandidateFactory(name="Ivan", surname="Petrenko")
+        self.petro = CandidateFactory(name="Petro", surname="Ivanenko")
+        self.zoe = CandidateFactory(name="Zoë", surname="O'Brien-Smith")
+        CandidateFactory(name="Olena", surname="Shevchenko")
+        self.client = APIClient()
+        self.client.force_authenticate(user=ProfileFactory().user)
+
+    def search(self, term: str) -> list[Candidate]:
+        return list(search_candidates(Candidate.objects.all(), term).order_by("search_rank", "id"))
+
+    def test_normalize_name(self):
+        """Names should be lowercased and stripped of accents and punctuation."""
+        self.assertEqual(normalize_name("Zoë", "O'Brien-Smith"), "zoe obrien smith")
+        self.assertEqual(normalize_name("  Іван ", "ПЕТРЕНКО"), "іван петренко")
+        self.assertEqual(self.zoe.search_name, "zoe obrien smith")
+
+    def test_search_name_follows_updates(self):
+        """Saving a new name should update the search name, even with update_fields."""
+        self.ivan.surname = "Franko"
+        self.ivan.save(update_fields=["surname"])
+
+        self.ivan.refresh_from_db()
+        self.assertEqual(self.ivan.search_name, "ivan franko")
+
+    def test_search_any_order_and_prefixes(self):
+        """Words should match prefixes of the name and surname in any order."""
+        self.assertEqual(self.search("petrenko ivan"), [self.ivan])
+        self.assertEqual(self.search("iv pet"), [self.ivan, self.petro])
+        self.assertEqual(self.search("smith zoe"), [self.zoe])
+        self.assertEqual(self.search("renko"), [])
+
+    def test_search_ranking(self):
+        """Exact names should go first, then names starting with the first word."""
+        result = search_candidates(Candidate.objects.all(), "Ivan")
+        ranks = {candidate: candidate.search_rank for candidate in result}
+
+        self.assertEqual(ranks, {self.ivan: 1, self.petro: 2})
+        self.assertEqual(self.search("Ivanenko Petro")[0].search_rank, 0)
+
+    def test_fullname_filter(self):
+        """The fullname filter should return the best matches first."""
+        response = self.client.get(reverse("candidates:candidates-list"), {"fullname": "ivan"})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [candidate["id"] for candidate in response.data["results"]],
+            [self.ivan.id, self.petro.id],
+        )
@@ -1,14 +1,29 @@
-from apps.emails.tasks import send_emails
 from apps.emails.forms import HTMLTextField
-from apps.emails.models import EmailLetter, EmailTemplate
-from django.contrib import admin
+from apps.emails.models import EmailDelivery, EmailLetter, EmailTemplate
+from apps.emails.tasks import enqueue_letters
+from django.contrib import admin, messages
 from django.utils.translation import gettext_lazy as _
 
 
 @admin.action(description="Send emails")
 def send_emails_admin(self, request, queryset):
-    for email in queryset:
-        send_emails.delay(email_letter=email.id)
+    """Claim letters that haven't been sent yet or have failed and queue them, skip the rest."""
+    selected = queryset.count()
+    claimed = queryset.claim()
+    unpublished = enqueue_letters(list(claimed))
+    if unpublished:  # the broker is unavailable, let the next attempt claim them again
+        EmailLetter.objects.release({letter_id: claimed[letter_id] for letter_id in unpublished})
+        self.message_user(
+            request,
+            _("%(unpublished)d letter(s) couldn't be queued, try again.")
+            % {"unpublished": len(unpublished)},
+            messages.ERROR,
+        )
+    self.message_user(
+        request,
+        _("%(queued)d letter(s) queued, %(skipped)d skipped as already sent or in progress.")
+        % {"queued": len(claimed) - len(unpublished), "skipped": selected - len(claimed)},
+    )
 
 
 @admin.register(EmailTemplate)
@@ -32,11 +47,44 @@ class EmailLetterAdmin(admin.ModelAdmin):
     """This class defines EmailLetter representation at Admin site."""
 
     list_per_page = 25
-    list_display = ("name", "created_at", "status", "sent_time")
+    list_display = (
+        "name",
+        "created_at",
+        "status",
+        "sent_count",
+        "failed_count",
+        "pending_count",
+        "sent_time",
+    )
     search_fields = ("name", "template")
     actions = (send_emails_admin,)
     fieldsets = (
         (_("General info"), {"fields": ("name", "template")}),
         (_("Extra info"), {"fields": ("vacancy", "event")}),
         (_("Recipients"), {"fields": ("recipients",)}),
+        (_("Delivery"), {"fields": ("status", "delivery_stats")}),
     )
+    readonly_fields = ("status", "delivery_stats")
+
+    @admin.display(description=_("Delivery statistics"))
+    def delivery_stats(self, obj):
+        if obj.pk is None:
+            return "-"
+        stats = obj.delivery_stats()
+        return _(
+            "%(sent)s sent, %(failed)s failed, %(pending)s pending of %(total)s "
+            "(%(attempts)s attempts, last delivery: %(last_sent_at)s)"
+        ) % {key: value if value is not None else "-" for key, value in stats.items()}
+
+
+@admin.register(EmailDelivery)
+class EmailDeliveryAdmin(admin.ModelAdmin):
+    """This class defines EmailDelivery representation at Admin site."""
+
+    list_per_page = 50
+    list_display = ("letter", "candidate", "status", "attempts", "sent_at", "last_error")
+    list_filter = ("status", "letter")
+    list_select_related = ("letter", "candidate")
+    search_fields = ("candidate__email",)
+    raw_id_fields = ("letter", "candidate")
+    readonly_fields = ("status", "attempts", "last_error", "sent_at")
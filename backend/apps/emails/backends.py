@@ -0,0 +1,166 @@
+import asyncio
+import smtplib
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.mail import EmailMessage
+from django.core.mail.backends.base import BaseEmailBackend
+from django.core.mail.backends.smtp import EmailBackend as SMTPEmailBackend
+
+
+class AsyncSMTPEmailBackend(BaseEmailBackend):
+    """
+    Email backend which delivers messages over several SMTP sessions at once. An asyncio
+    loop feeds the messages from a shared queue to `concurrency` sessions, so a slow
+    server reply on one session doesn't hold up the others. Each session is a regular
+    SMTP backend run in its own thread, which keeps TLS, authentication and timeouts
+    exactly as configured for the synchronous backend (EMAIL_HOST, EMAIL_PORT etc.).
+
+    Sessions, their threads and the event loop stay open between calls of
+    `send_messages()` while the backend is open, so a letter sent in groups doesn't
+    reconnect for every group. The backend runs its own event loop, so it has to be
+    called from synchronous code; calling it from a running event loop raises
+    RuntimeError (wrap the call with asgiref's sync_to_async there). A session dropped by
+    the server is reopened and the interrupted message is sent again, a message that
+    was accepted is never resent.
+
+    Select it with settings.EMAIL_BULK_BACKEND or for a single letter with
+    `send_emails(letter_id, backend="apps.emails.backends.AsyncSMTPEmailBackend")`.
+
+    Attributes
+    --------------
+    concurrency : int
+        number of SMTP sessions, defaults to settings.EMAIL_ASYNC_CONCURRENCY
+    max_reconnects : int
+        how many times a dropped session is reopened for a single message
+
+    Methods
+    --------------
+    send_messages(email_messages: list)
+        sends messages, returns the number of delivered ones
+    deliver(email_messages: list)
+        sends messages, returns None for each delivered message and the error for
+        each failed one
+
+    """
+
+    def __init__(
+        self,
+        concurrency: int = None,
+        max_reconnects: int = 3,
+        fail_silently: bool = False,
+        **kwargs,
+    ):
+        super().__init__(fail_silently=fail_silently)
+        self.concurrency = max(concurrency or settings.EMAIL_ASYNC_CONCURRENCY, 1)
+        self.max_reconnects = max_reconnects
+        self.session_kwargs = kwargs
+        self._sessions = []
+        self._opened = False
+        self._loop = None
+        self._executor = None
+
+    def open(self):
+        """Keep sessions open until `close()`, they are connected on first use."""
+        self._opened = True
+
+    def close(self):
+        """Close all sessions, their threads and the event loop."""
+        self._opened = False
+        sessions, self._sessions = self._sessions, []
+        for session in sessions:
+            session.close()
+        self._shutdown()
+
+    def send_messages(self, email_messages: list[EmailMessage]) -> int:
+        """Send messages, raise the first error unless `fail_silently` is set."""
+        if not email_messages:
+            return 0
+        results = self.deliver(email_messages)
+        errors = [result for result in results if result is not None]
+        if errors and not self.fail_silently:
+            raise errors[0]
+        return len(results) - len(errors)
+
+    def deliver(self, email_messages: list[EmailMessage]) -> list:
+        """
+        Send messages concurrently. Return a list with None for every delivered message
+        and the exception for every message that couldn't be delivered.
+        """
+        email_messages = list(email_messages)
+        if not email_messages:
+            return []
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            pass
+        else:
+            raise RuntimeError(
+                "AsyncSMTPEmailBackend can't be used from a running event loop, "
+                "call it from a thread (e.g. with asgiref.sync.sync_to_async)."
+            )
+        if self._loop is None:
+            self._loop = asyncio.new_event_loop()
+            self._executor = ThreadPoolExecutor(self.concurrency, thread_name_prefix="smtp")
+        try:
+            return self._loop.run_until_complete(self._deliver(email_messages))
+        finally:
+            if not self._opened:
+                self._shutdown()
+
+    def _shutdown(self):
+        """Stop the threads of the sessions and close the event loop."""
+        if self._loop is not None:
+            self._executor.shutdown()
+            self._loop.close()
+            self._loop = self._executor = None
+
+    async def _deliver(self, email_messages: list[EmailMessage]) -> list:
+        queue = asyncio.Queue()
+        for item in enumerate(email_messages):
+            queue.put_nowait(item)
+        results = [None] * len(email_messages)
+
+        count = min(self.concurrency, len(email_messages))
+        sessions = [self._take_session() for _ in range(count)]
+        await asyncio.gather(*(self._run(session, queue, results) for session in sessions))
+        if self._opened:
+            self._sessions.extend(sessions)
+        else:
+            for session in sessions:
+                session.close()
+        return results
+
+    async def _run(self, session, queue: asyncio.Queue, results: list):
+        """Send messages from the queue over a single session until the queue is empty."""
+        loop = asyncio.get_running_loop()
+        while True:
+            try:
+                index, message = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            results[index] = await loop.run_in_executor(
+                self._executor, self._send, session, message
+            )
+
+    def _take_session(self) -> SMTPEmailBackend:
+        """Return an idle session or a new one."""
+        if self._sessions:
+            return self._sessions.pop()
+        return SMTPEmailBackend(fail_silently=False, **self.session_kwargs)
+
+    def _send(self, session: SMTPEmailBackend, message: EmailMessage):
+        """Send a message over the session, return None or the delivery error."""
+        reconnects = 0
+        while True:
+            try:
+                session.open()
+                session.send_messages([message])
+                return None
+            except smtplib.SMTPServerDisconnected as err:
+                session.close()
+                if reconnects >= self.max_reconnects:
+                    return err
+                reconnects += 1
+            except (smtplib.SMTPException, OSError) as err:
+                return err
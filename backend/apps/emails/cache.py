@@ -0,0 +1,95 @@
+from collections import OrderedDict
+from threading import Lock
+
+from django.conf import settings
+from django.template import Template
+
+
+class CompiledTemplateCache:
+    """
+    Process-wide LRU cache of compiled EmailTemplate subjects and bodies.
+
+    Compiling a template means parsing the whole CKEditor HTML, so doing it once
+    per recipient is wasteful. Entries are keyed by template id, field name and
+    `changed_at`, which means that an edited template is never served from a stale
+    entry, even in processes that haven't received the invalidation signal.
+
+    Attributes
+    --------------
+    maxsize : int
+        maximal number of compiled templates kept in memory
+    hits : int
+        number of lookups served from the cache
+    misses : int
+        number of lookups that required compiling a template
+
+    Methods
+    --------------
+    get(template: EmailTemplate, field: str)
+        returns compiled Template for the field ('body' or 'subject') of the template
+    invalidate(template_id: int)
+        drops all entries of the template
+    clear()
+        drops all entries and resets the counters
+    stats()
+        returns hits, misses and current size of the cache
+
+    """
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, template, field: str) -> Template:
+        """Return a compiled template for the field, compile it on a miss."""
+        if template.pk is None:
+            # Unsaved templates have no stable key, don't cache them.
+            return Template(getattr(template, field))
+
+        key = (template.pk, field, template.changed_at)
+        with self._lock:
+            compiled = self._entries.get(key)
+            if compiled is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return compiled
+            self.misses += 1
+
+        compiled = Template(getattr(template, field))
+        with self._lock:
+            self._entries[key] = compiled
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return compiled
+
+    def invalidate(self, template_id: int):
+        """Drop all cached entries of the template."""
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == template_id]:
+                del self._entries[key]
+
+    def clear(self):
+        """Drop all cached entries and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict:
+        """Return cache counters."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+        }
+
+
+compiled_templates = CompiledTemplateCache(maxsize=settings.EMAIL_TEMPLATE_CACHE_SIZE)
@@ -0,0 +1,223 @@
+import logging
+import smtplib
+from time import perf_counter
+
+from apps.emails.ratelimit import get_rate_limiter
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+
+logger = logging.getLogger(__name__)
+
+# Errors that concern a single message, the session itself is still usable after them.
+MESSAGE_ERRORS = (smtplib.SMTPRecipientsRefused, smtplib.SMTPDataError)
+
+
+class BatchEmailSender:
+    """
+    This class delivers email messages for a single letter. By default it keeps one
+    connection open for the whole letter instead of opening a new one (and running
+    a new TLS handshake) for every recipient.
+
+    Messages are queued with `send()` and flushed in groups of `batch_size`, the
+    rest is flushed on exit. If the server drops the session, the connection is
+    reopened and delivery continues from the first undelivered message, so nothing
+    that was already accepted by the server is sent twice.
+
+    A message rejected by the server (e.g. a refused recipient) doesn't stop the
+    delivery. Outcomes of each flushed group are passed to `on_flush(delivered,
+    failed)`, where `delivered` is a list of keys of delivered messages and `failed`
+    maps keys of rejected messages to error messages. Connection errors are raised,
+    but `on_flush` still receives the outcomes of the messages sent before them.
+
+    Every message takes a token from the rate limiter of its sender domain (see
+    apps.emails.ratelimit), so all workers together stay below the rate accepted by
+    the SMTP relay.
+
+    The connection comes from `backend` (default is settings.EMAIL_BULK_BACKEND). If
+    the backend can deliver a group concurrently and report per-message outcomes via
+    `deliver(messages)`, like AsyncSMTPEmailBackend does, whole groups are handed to it.
+
+    Usage
+    --------------
+    with BatchEmailSender(on_flush=save_outcomes) as sender:
+        for recipient in recipients:
+            sender.send(build_message(recipient), key=recipient.id)
+
+    Attributes
+    --------------
+    batch_size : int
+        number of messages sent per group
+    reuse_connection : bool
+        if False, every message opens its own connection (the per-recipient path)
+    backend : str
+        dotted path of the email backend, defaults to settings.EMAIL_BULK_BACKEND
+    max_reconnects : int
+        how many times a dropped session is reopened for a single message
+    on_flush : callable
+        receives outcomes of every flushed group
+    rate_limiter : TokenBucket
+        limiter used for all messages, by default it is chosen by the sender domain
+    sent : int
+        number of messages delivered so far
+    failed : int
+        number of messages rejected by the server so far
+    elapsed : float
+        seconds spent since the sender was opened
+    rate : float
+        delivered messages per second
+    throttled : float
+        seconds spent waiting for the rate limiter
+
+    """
+
+    def __init__(
+        self,
+        batch_size: int = None,
+        reuse_connection: bool = None,
+        connection=None,
+        backend: str = None,
+        max_reconnects: int = 3,
+        on_flush=None,
+        rate_limiter=None,
+    ):
+        self.batch_size = max(batch_size or settings.EMAIL_BATCH_SIZE, 1)
+        if reuse_connection is None:
+            reuse_connection = settings.EMAIL_BATCHED_DELIVERY
+        self.reuse_connection = reuse_connection
+        self.connection = connection
+        self.backend = backend or settings.EMAIL_BULK_BACKEND
+        self.max_reconnects = max_reconnects
+        self.on_flush = on_flush
+        self.rate_limiter = rate_limiter
+        self.sent = 0
+        self.failed = 0
+        self.throttled = 0.0
+        self._queue = []
+        self._started_at = None
+        self._finished_at = None
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        try:
+            if exc_type is None:
+                self.flush()
+        finally:
+            self.close()
+
+    @property
+    def elapsed(self) -> float:
+        """Seconds spent on delivery."""
+        if self._started_at is None:
+            return 0.0
+        return (self._finished_at or perf_counter()) - self._started_at
+
+    @property
+    def rate(self) -> float:
+        """Delivered messages per second."""
+        elapsed = self.elapsed
+        return self.sent / elapsed if elapsed else 0.0
+
+    def open(self):
+        """Start timing and open the shared connection."""
+        self._started_at = perf_counter()
+        self._finished_at = None
+        if self.reuse_connection:
+            if self.connection is None:
+                self.connection = get_connection(self.backend, fail_silently=False)
+            self.connection.open()
+
+    def close(self):
+        """Close the shared connection and log the throughput."""
+        if self.reuse_connection and self.connection is not None:
+            self.connection.close()
+        self._finished_at = perf_counter()
+        logger.info(
+            "Delivered %d messages (%d failed) in %.2fs (%.1f msg/s, %s, %.2fs throttled).",
+            self.sent,
+            self.failed,
+            self.elapsed,
+            self.rate,
+            "pooled connection" if self.reuse_connection else "connection per message",
+            self.throttled,
+        )
+
+    def send(self, message: EmailMessage, key=None):
+        """Queue a message, the queue is flushed once it reaches `batch_size`."""
+        self._queue.append((key, message))
+        if len(self._queue) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        """Deliver all queued messages and report their outcomes."""
+        group, self._queue = self._queue, []
+        delivered, failed = [], {}
+        try:
+            if self.reuse_connection and hasattr(self.connection, "deliver"):
+                self._deliver_group(group, delivered, failed)
+            else:
+                for key, message in group:
+                    try:
+                        self._deliver(message)
+                    except MESSAGE_ERRORS as err:
+                        self.failed += 1
+                        failed[key] = str(err)
+                    else:
+                        delivered.append(key)
+        finally:
+            if self.on_flush is not None and (delivered or failed):
+                self.on_flush(delivered, failed)
+
+    def _deliver(self, message: EmailMessage):
+        """
+        Deliver a single message. Messages go to the backend one by one, so if the
+        session is dropped midway through a group we know exactly which of them
+        were already accepted and resend none of those.
+        """
+        self._throttle(message)
+        if not self.reuse_connection:
+            get_connection(self.backend, fail_silently=False).send_messages([message])
+            self.sent += 1
+            return
+
+        reconnects = 0
+        while True:
+            try:
+                self.connection.send_messages([message])
+                self.sent += 1
+                return
+            except smtplib.SMTPServerDisconnected:
+                if reconnects >= self.max_reconnects:
+                    raise
+                reconnects += 1
+                logger.warning("SMTP session was dropped, reconnecting (%d).", reconnects)
+                self.connection.close()
+                self.connection.open()
+
+    def _deliver_group(self, group: list, delivered: list, failed: dict):
+        """
+        Hand the whole group to a backend that delivers messages concurrently. Outcomes
+        are collected per message, the first connection error is raised after that.
+        """
+        for _, message in group:
+            self._throttle(message)
+        results = self.connection.deliver([message for _, message in group])
+        error = None
+        for (key, _), result in zip(group, results):
+            if result is None:
+                self.sent += 1
+                delivered.append(key)
+            elif isinstance(result, MESSAGE_ERRORS):
+                self.failed += 1
+                failed[key] = str(result)
+            elif error is None:
+                error = result
+        if error is not None:
+            raise error
+
+    def _throttle(self, message: EmailMessage):
+        """Wait for the rate limiter of the message sender."""
+        rate_limiter = self.rate_limiter or get_rate_limiter(message.from_email)
+        self.throttled += rate_limiter.acquire()
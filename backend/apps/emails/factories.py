@@ -0,0 +1,36 @@
+import factory
+from apps.accounts.factories import ProfileFactory
+from apps.emails.models import EmailLetter, EmailTemplate
+
+
+class EmailTemplateFactory(factory.django.DjangoModelFactory):
+    """Factory for generating EmailTemplates."""
+
+    name = factory.Faker("word")
+    description = factory.Faker("sentence")
+    subject = "Hello, {{candidate_name}}!"
+    body = (
+        "<p>Dear {{candidate_fullname}},</p>"
+        "<p>We would like to invite you to an interview.</p>"
+        "<p>Best regards,<br/>Recruiter team</p>"
+    )
+    author = factory.SubFactory(ProfileFactory)
+
+    class Meta:
+        model = EmailTemplate
+
+
+class EmailLetterFactory(factory.django.DjangoModelFactory):
+    """Factory for generating EmailLetters."""
+
+    name = factory.Faker("catch_phrase")
+    template = factory.SubFactory(EmailTemplateFactory)
+
+    class Meta:
+        model = EmailLetter
+
+    @factory.post_generation
+    def recipients(self, create, extracted, **kwargs):
+        """Attach recipients passed as `EmailLetterFactory(recipients=[...])`."""
+        if create and extracted:
+            self.recipients.add(*extracted)
@@ -0,0 +1,248 @@
+import json
+import sys
+import threading
+from collections import defaultdict
+from datetime import datetime, timezone
+from functools import wraps
+from time import perf_counter
+
+import django
+import factory
+from apps.accounts.factories import ProfileFactory
+from apps.candidates.factories import CandidateFactory
+from apps.emails import models as email_models
+from apps.emails.backends import AsyncSMTPEmailBackend
+from apps.emails.factories import EmailLetterFactory, EmailTemplateFactory
+from apps.emails.rendering import RenderPlan
+from apps.emails.smtp_sink import SMTPSink
+from apps.emails.tasks import send_emails
+from config.celery import app
+from django.core.mail.backends.smtp import EmailBackend as SMTPEmailBackend
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import override_settings
+
+BACKENDS = {
+    "smtp": "django.core.mail.backends.smtp.EmailBackend",
+    "async": "apps.emails.backends.AsyncSMTPEmailBackend",
+}
+
+# Body of a typical letter as saved by CKEditor: inline styles, a table layout and entities.
+CKEDITOR_BODY = """
+<table align="center" border="0" cellpadding="0" cellspacing="0" style="width:600px">
+<tbody>
+<tr>
+<td style="background-color:#1f3a5f; padding:24px; text-align:center">
+<img alt="Recruiter" src="https://example.com/static/logo.png" style="height:40px; width:160px" />
+</td>
+</tr>
+<tr>
+<td style="font-family:Arial,Helvetica,sans-serif; font-size:14px; padding:24px">
+<p>Dear <strong>{{candidate_fullname}}</strong>,</p>
+<p>Thank you for your interest in our company&nbsp;&mdash; we have reviewed your profile
+and would be happy to discuss the next steps with you.</p>
+<h3 style="color:#1f3a5f">What&#39;s next?</h3>
+<ol>
+<li>A short call with our recruiter (about 30&nbsp;minutes).</li>
+<li>A technical interview with the team.</li>
+<li>A final meeting with the head of the department.</li>
+</ol>
+<p>{% if candidate_age > 17 %}Please reply to this letter with the time that suits you
+best, {{candidate_name}}.{% else %}Please ask your parents to contact us.{% endif %}</p>
+<blockquote>
+<p><em>&ldquo;We hire people, not resumes.&rdquo;</em></p>
+</blockquote>
+<p>Best regards,<br />
+Recruiter team</p>
+</td>
+</tr>
+<tr>
+<td style="color:#888888; font-size:11px; padding:12px; text-align:center">
+You received this letter because you applied for a position at our company.<br />
+&copy; Recruiter. All rights reserved.
+</td>
+</tr>
+</tbody>
+</table>
+"""
+
+
+class PhaseTimer:
+    """
+    Collects time spent in the phases of delivery. Functions are wrapped for the time
+    of the benchmark, and database time is measured by a connection execute wrapper.
+    Only the calling thread is measured, so work that a backend runs in its own threads
+    is not counted twice.
+    """
+
+    def __init__(self):
+        self.seconds = defaultdict(float)
+        self.calls = defaultdict(int)
+        self._patches = []
+        self._thread = threading.current_thread()
+
+    def wrap(self, owner, name: str, phase: str):
+        """Replace `owner.name` with a timed version."""
+        original = getattr(owner, name)
+
+        @wraps(original)
+        def timed(*args, **kwargs):
+            if threading.current_thread() is not self._thread:
+                return original(*args, **kwargs)
+            started_at = perf_counter()
+            try:
+                return original(*args, **kwargs)
+            finally:
+                self.add(phase, perf_counter() - started_at)
+
+        setattr(owner, name, timed)
+        self._patches.append((owner, name, original))
+
+    def restore(self):
+        """Restore all wrapped functions."""
+        while self._patches:
+            owner, name, original = self._patches.pop()
+            setattr(owner, name, original)
+
+    def add(self, phase: str, seconds: float):
+        self.seconds[phase] += seconds
+        self.calls[phase] += 1
+
+    def __call__(self, execute, sql, params, many, context):
+        """Execute wrapper which measures database time."""
+        if threading.current_thread() is not self._thread:
+            return execute(sql, params, many, context)
+        started_at = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.add("db", perf_counter() - started_at)
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure how fast send_emails delivers a letter to a local SMTP sink. Test data is "
+        "generated with the factories and rolled back afterwards. The report is printed as "
+        "JSON and can be appended to a JSON lines file to track results over time."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--recipients", type=int, default=1000)
+        parser.add_argument("--backend", choices=sorted(BACKENDS), default="smtp")
+        parser.add_argument("--concurrency", type=int, help="sessions of the async backend")
+        parser.add_argument("--chunk-size", type=int, help="overrides EMAIL_CHUNK_SIZE")
+        parser.add_argument("--batch-size", type=int, help="overrides EMAIL_BATCH_SIZE")
+        parser.add_argument(
+            "--per-recipient",
+            action="store_true",
+            help="open a connection for every recipient instead of reusing one",
+        )
+        parser.add_argument(
+            "--smtp-latency",
+            type=float,
+            default=0.0,
+            help="seconds the sink takes to accept a message",
+        )
+        parser.add_argument("--output", help="append the report to this JSON lines file")
+
+    def handle(self, *args, **options):
+        eager = app.conf.task_always_eager
+        app.conf.task_always_eager = True
+        try:
+            with SMTPSink(delay=options["smtp_latency"]) as sink, transaction.atomic():
+                report = self.run(sink, options)
+                transaction.set_rollback(True)
+        finally:
+            app.conf.task_always_eager = eager
+
+        line = json.dumps(report)
+        self.stdout.write(line)
+        if options["output"]:
+            with open(options["output"], "a") as output:
+                output.write(line + "\n")
+
+    def run(self, sink: SMTPSink, options: dict) -> dict:
+        """Generate the letter, deliver it to the sink and return the report."""
+        letter = self.generate_letter(options["recipients"])
+
+        test_settings = {
+            "EMAIL_HOST": sink.host,
+            "EMAIL_PORT": sink.port,
+            "EMAIL_USE_TLS": False,
+            "EMAIL_USE_SSL": False,
+            "EMAIL_HOST_USER": "",
+            "EMAIL_HOST_PASSWORD": "",
+            "EMAIL_RATE_LIMIT": 0,
+            "EMAIL_DOMAIN_RATE_LIMITS": {},
+        }
+        for option, setting in (
+            ("chunk_size", "EMAIL_CHUNK_SIZE"),
+            ("batch_size", "EMAIL_BATCH_SIZE"),
+            ("concurrency", "EMAIL_ASYNC_CONCURRENCY"),
+        ):
+            if options[option]:
+                test_settings[setting] = options[option]
+
+        timer = PhaseTimer()
+        timer.wrap(RenderPlan, "render", "render")
+        timer.wrap(email_models, "strip_tags", "strip_tags")
+        timer.wrap(SMTPEmailBackend, "send_messages", "smtp")
+        timer.wrap(AsyncSMTPEmailBackend, "deliver", "smtp")
+        try:
+            with override_settings(**test_settings), connection.execute_wrapper(timer):
+                started_at = perf_counter()
+                send_emails.apply(
+                    kwargs={
+                        "email_letter": letter.id,
+                        "batched": not options["per_recipient"],
+                        "backend": BACKENDS[options["backend"]],
+                    }
+                )
+                total = perf_counter() - started_at
+        finally:
+            timer.restore()
+
+        letter.refresh_from_db()
+        phases = {
+            phase: {
+                "seconds": round(timer.seconds[phase], 6),
+                "calls": timer.calls[phase],
+                "share": round(timer.seconds[phase] / total, 4) if total else 0.0,
+            }
+            for phase in ("render", "strip_tags", "db", "smtp")
+        }
+        other = total - sum(timer.seconds.values())
+        phases["other"] = {"seconds": round(other, 6), "share": round(other / total, 4)}
+        return {
+            "benchmark": "email_delivery",
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": sys.version.split()[0],
+            "django": django.get_version(),
+            "database": connection.vendor,
+            "backend": options["backend"],
+            "batched": not options["per_recipient"],
+            "recipients": options["recipients"],
+            "sent": letter.sent_count,
+            "failed": letter.failed_count,
+            "delivered_to_sink": len(sink.messages),
+            "smtp_sessions": sink.sessions,
+            "smtp_latency": options["smtp_latency"],
+            "total_seconds": round(total, 6),
+            "messages_per_second": round(letter.sent_count / total, 2) if total else 0.0,
+            "phases": phases,
+        }
+
+    @staticmethod
+    def generate_letter(recipients: int):
+        """Create a letter for `recipients` candidates with unique emails."""
+        template = EmailTemplateFactory(
+            subject="{{candidate_name}}, we'd like to invite you to an interview",
+            body=CKEDITOR_BODY,
+            author=ProfileFactory(),
+        )
+        candidates = CandidateFactory.create_batch(
+            recipients,
+            email=factory.Sequence(lambda n: f"candidate{n}@bench.example.com"),
+            phone_number=factory.Sequence(lambda n: f"+38067{n:07d}"),
+        )
+        return EmailLetterFactory(template=template, recipients=candidates)
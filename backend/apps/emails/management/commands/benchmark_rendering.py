@@ -0,0 +1,114 @@
+from datetime import date, datetime, timedelta
+from time import perf_counter
+
+from apps.candidates.models import Candidate
+from apps.emails.models import EmailTemplate
+from apps.events.models import Event
+from apps.vacancies.models import Currency, Vacancy
+from django.core.management.base import BaseCommand
+from django.utils.timezone import now
+
+SAMPLE_SUBJECT = "{{candidate_name}}, join us as {{vacancy_title}}!"
+SAMPLE_BODY = (
+    "<p>Dear {{candidate_fullname}},</p>"
+    "<p>We are glad to invite you to <b>{{event_title}}</b> ({{event_type}}), which starts "
+    "at {{event_st|date:'H:i, d M Y'}} and takes {{event_duration}}.</p>"
+    "<p>{{event_description|linebreaksbr}}</p>"
+    "<h3>{{vacancy_title|upper}}</h3>"
+    "<ul><li>Employment: {{vacancy_etype}}</li><li>Location: {{vacancy_location}}</li>"
+    "<li>English: {{vacancy_el}}</li><li>Experience: {{vacancy_me}}</li>"
+    "<li>From {{vacancy_sd}} to {{vacancy_ed|default:'not set'}}</li>"
+    "{% if vacancy_salmax %}<li>Salary: {{vacancy_salmin}} - {{vacancy_salmax}} "
+    "{{vacancy_salcur}}</li>{% endif %}</ul>"
+    "<p>{{vacancy_des|truncatewords:60}}</p>"
+    "{% if candidate_age > 17 %}<p>See you soon, {{candidate_name}}!</p>{% endif %}"
+    "<p>Best regards,<br/>Recruiter team</p>"
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare rendering of a letter for every recipient in full with the prepared "
+        "template, which renders the vacancy and event parts only once."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--recipients", type=int, default=2000)
+        parser.add_argument(
+            "--template",
+            type=int,
+            help="id of EmailTemplate to render, a built-in sample is used by default",
+        )
+
+    def handle(self, *args, **options):
+        if options["template"]:
+            template = EmailTemplate.objects.get(id=options["template"])
+        else:
+            # The sample is never saved, a fake id lets the compiled templates be cached.
+            template = EmailTemplate(
+                id=0, changed_at=now(), subject=SAMPLE_SUBJECT, body=SAMPLE_BODY
+            )
+        vacancy, event = self.sample_vacancy(), self.sample_event()
+        candidates = [
+            Candidate(name=f"Name{i}", surname=f"Surname{i}", date_of_birth=date(1990, 1, 1))
+            for i in range(options["recipients"])
+        ]
+        context = {"company": "Recruiter"}
+
+        started_at = perf_counter()
+        full = [
+            (
+                template.render_subject(context, candidate, vacancy, event),
+                template.render_body(context, candidate, vacancy, event),
+            )
+            for candidate in candidates
+        ]
+        full_time = perf_counter() - started_at
+
+        started_at = perf_counter()
+        prepared = template.prepare(context, vacancy, event)
+        partial = [
+            (prepared.render_subject(candidate), prepared.render_body(candidate))
+            for candidate in candidates
+        ]
+        prepared_time = perf_counter() - started_at
+
+        if full != partial:
+            self.stderr.write(self.style.ERROR("Prepared template rendered a different output."))
+        count = len(candidates)
+        for label, elapsed in (("full render", full_time), ("prepared", prepared_time)):
+            self.stdout.write(
+                f"{label:>12}: {elapsed:.3f}s, {elapsed / count * 1e6:.1f} us per recipient"
+            )
+        self.stdout.write(
+            f"body rendered {'partially' if prepared.body.is_partial else 'in full'}, "
+            f"speedup x{full_time / prepared_time:.2f}"
+        )
+
+    @staticmethod
+    def sample_vacancy() -> Vacancy:
+        """Build an unsaved Vacancy with all the fields used by templates."""
+        return Vacancy(
+            title="Python Developer",
+            type_of_employment="Full-time",
+            location="Remote",
+            english_level="Upper-Intermediate",
+            min_experience="2 years",
+            start_date=date.today(),
+            description="We are looking for a developer to join our team. " * 20,
+            salary_min=2000,
+            salary_max=3500,
+            salary_currency=Currency(currency_title="US Dollar", currency_code="USD"),
+        )
+
+    @staticmethod
+    def sample_event() -> Event:
+        """Build an unsaved Event with all the fields used by templates."""
+        start_time = datetime(2022, 10, 3, 10, 0)
+        return Event(
+            title="Technical interview",
+            description="Interview with the team lead.\nPlease prepare your questions.",
+            start_time=start_time,
+            end_time=start_time + timedelta(hours=1),
+            duration=timedelta(hours=1),
+        )
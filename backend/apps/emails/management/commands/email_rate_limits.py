@@ -0,0 +1,21 @@
+from apps.emails.ratelimit import rate_limiter_stats
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = (
+        "Show the rate limits of outgoing email per sender domain: the current number of "
+        "tokens in every bucket and the numbers of messages and waits of all workers."
+    )
+
+    def handle(self, *args, **options):
+        for stats in rate_limiter_stats():
+            if not stats["rate"]:
+                self.stdout.write(f"{stats['name'] or '-'}: unlimited")
+                continue
+            self.stdout.write(
+                "{name}: {rate:g}/s, {level:.1f}/{capacity} tokens, {acquired} sent, "
+                "{waits} waits, {total_wait:.1f}s waited ({average_wait:.3f}s on average)".format(
+                    **stats
+                )
+            )
@@ -0,0 +1,28 @@
+# Generated by Django 4.1 on 2026-10-18 16:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("emails", "0004_alter_emailletter_event_alter_emailletter_recipients_and_more"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="emailletter",
+            name="failed_count",
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name="Failed"),
+        ),
+        migrations.AddField(
+            model_name="emailletter",
+            name="pending_count",
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name="Pending"),
+        ),
+        migrations.AddField(
+            model_name="emailletter",
+            name="sent_count",
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name="Sent"),
+        ),
+    ]
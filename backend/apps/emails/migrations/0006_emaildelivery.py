@@ -0,0 +1,71 @@
+# Generated by Django 4.1 on 2026-10-18 16:55
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("candidates", "0002_candidate_vacancy"),
+        ("emails", "0005_emailletter_delivery_counters"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="EmailDelivery",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                (
+                    "status",
+                    models.IntegerField(
+                        choices=[(0, "Created"), (1, "In process"), (2, "Sent"), (3, "Failed")],
+                        default=0,
+                        verbose_name="Delivery Status",
+                    ),
+                ),
+                ("attempts", models.PositiveSmallIntegerField(default=0, verbose_name="Attempts")),
+                ("last_error", models.TextField(blank=True, verbose_name="Last error")),
+                ("sent_at", models.DateTimeField(blank=True, null=True, verbose_name="Sent at")),
+                (
+                    "candidate",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="email_deliveries",
+                        to="candidates.candidate",
+                        verbose_name="Recipient",
+                    ),
+                ),
+                (
+                    "letter",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="deliveries",
+                        to="emails.emailletter",
+                        verbose_name="Letter",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Email Delivery",
+                "verbose_name_plural": "Email Deliveries",
+            },
+        ),
+        migrations.AddIndex(
+            model_name="emaildelivery",
+            index=models.Index(
+                fields=["letter", "status", "candidate"], name="emails_emai_letter__ecb0de_idx"
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="emaildelivery",
+            constraint=models.UniqueConstraint(
+                fields=("letter", "candidate"), name="unique_letter_delivery"
+            ),
+        ),
+    ]
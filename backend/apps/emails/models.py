@@ -1,13 +1,26 @@
 from datetime import datetime
 
 from apps.candidates.models import Candidate
+from apps.emails.cache import compiled_templates
+from apps.emails.rendering import PreparedTemplate
 from apps.events.models import Event
 from apps.vacancies.models import Vacancy
 from base.models import EmailStatus
-from django.db import models
-from django.template import Context, Template
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives
+from django.db import models, transaction
+from django.db.models.functions import Coalesce, Lower, Trim
+from django.template import Context
+from django.utils.html import strip_tags
+from django.utils.timezone import now
 from django.utils.translation import gettext_lazy as _
 
+DELIVERY_BATCH_SIZE = 1000
+# Candidate fields needed to address and render a letter, other columns are never loaded.
+RECIPIENT_FIELDS = ("name", "surname", "email", "date_of_birth")
+# Letters in these statuses can be claimed for sending, failed ones are retried.
+CLAIMABLE_STATUSES = (EmailStatus.CREATED, EmailStatus.FAILED)
+
 
 class EmailTemplate(models.Model):
     """
@@ -43,6 +56,12 @@ class EmailTemplate(models.Model):
         and custom templates. Read docs on the 'body' attribule for info.
     render_subject(context: dict, candidate=None, vacancy=None)
         same as render_body, but used for rendering a subject
+    prepare(context: dict, vacancy=None, event=None)
+        binds the context shared by all recipients of a letter and returns
+        PreparedTemplate, which renders the subject and body for a candidate
+
+    Both methods take compiled templates from the process-wide cache (see
+    apps.emails.cache), so the template is parsed once and not for every recipient.
 
     """
 
@@ -98,6 +117,10 @@ class EmailTemplate(models.Model):
         on_delete=models.CASCADE,
     )
 
+    CANDIDATE_KEYWORDS = frozenset(
+        ("candidate_fullname", "candidate_name", "candidate_surname", "candidate_age")
+    )
+
     def __str__(self) -> str:
         """Return a readable name for the object."""
         return f"{self.name} [{self.subject}]"
@@ -116,7 +139,7 @@ class EmailTemplate(models.Model):
         """This method renders body for the message that can be
         later used as HTML attachment for EmailMultiAlternatives.
         """
-        return Template(self.body).render(
+        return compiled_templates.get(self, "body").render(
             Context(context | self._generate_keywords(candidate, vacancy, event))
         )
 
@@ -128,10 +151,21 @@ class EmailTemplate(models.Model):
         event: Event = None,
     ) -> str:
         """Renders subjects for the email."""
-        return Template(self.subject).render(
+        return compiled_templates.get(self, "subject").render(
             Context(context | self._generate_keywords(candidate, vacancy, event))
         )
 
+    def prepare(
+        self,
+        context: dict,
+        vacancy: Vacancy = None,
+        event: Event = None,
+    ) -> PreparedTemplate:
+        """Prepare the template for rendering a letter for many candidates. Parts
+        of the template that don't depend on a candidate are rendered only once.
+        """
+        return PreparedTemplate(self, context | self._static_keywords(vacancy, event))
+
     def _generate_keywords(
         self,
         candidate: Candidate = None,
@@ -142,16 +176,22 @@ class EmailTemplate(models.Model):
         object a dictionary for context substitution is formed. Read help message
         in 'body' field for more info.
         """
+        return self._static_keywords(vacancy, event) | self._candidate_keywords(candidate)
+
+    def _candidate_keywords(self, candidate: Candidate = None) -> dict:
+        """Forms keywords of the candidate, they are different for every recipient."""
+        if not candidate:
+            return {}
+        return {
+            "candidate_fullname": candidate.full_name,
+            "candidate_name": candidate.name,
+            "candidate_surname": candidate.surname,
+            "candidate_age": candidate.age,
+        }
+
+    def _static_keywords(self, vacancy: Vacancy = None, event: Event = None) -> dict:
+        """Forms keywords of the vacancy and event, they are shared by all recipients."""
         keywords = {}
-        if candidate:
-            keywords.update(
-                {
-                    "candidate_fullname": candidate.full_name,
-                    "candidate_name": candidate.name,
-                    "candidate_surname": candidate.surname,
-                    "candidate_age": candidate.age,
-                }
-            )
         if vacancy:
             keywords.update(
                 {
@@ -182,6 +222,36 @@ class EmailTemplate(models.Model):
         return keywords
 
 
+class EmailLetterQuerySet(models.QuerySet):
+    """This class provides claiming of letters for sending."""
+
+    def claim(self) -> dict[int, int]:
+        """
+        Mark letters that haven't been sent yet or have failed as 'In Progress' and return
+        their previous statuses by id, so a letter which couldn't be queued can be put
+        back as it was. Claimable rows are locked (rows locked by a concurrent claim are
+        skipped) and updated in one transaction, so every letter is claimed (and sent)
+        only once. It takes a SELECT and an UPDATE, as UPDATE ... RETURNING can't return
+        the statuses from before the update.
+        """
+        with transaction.atomic():
+            statuses = dict(
+                self.filter(status__in=CLAIMABLE_STATUSES)
+                .select_for_update(skip_locked=True)
+                .values_list("id", "status")
+            )
+            EmailLetter.objects.filter(id__in=statuses, status__in=CLAIMABLE_STATUSES).update(
+                status=EmailStatus.IN_PROCESS
+            )
+        return statuses
+
+    def release(self, statuses: dict[int, int]):
+        """Put claimed letters back to their previous statuses (as returned by claim())."""
+        for status in set(statuses.values()):
+            ids = [letter_id for letter_id, previous in statuses.items() if previous == status]
+            self.filter(id__in=ids, status=EmailStatus.IN_PROCESS).update(status=status)
+
+
 class EmailLetter(models.Model):
     """
     Recruiter should be able to generate an email letter from email template,
@@ -207,7 +277,31 @@ class EmailLetter(models.Model):
     vacancy : Vacancy
         vacancy for template data
     recipients : Candidate
-        recipints of the letter, will silently ignore candidates without email
+        recipints of the letter, will silently ignore candidates without email,
+        recipients with the same email get the letter only once
+    sent_count : int
+        number of recipients the letter was delivered to
+    failed_count : int
+        number of recipients the letter couldn't be delivered to
+    pending_count : int
+        number of recipients still waiting for the letter
+
+    Methods
+    --------------
+    prepare_template(context: dict)
+        binds the vacancy, event and context of the letter to its template
+    build_message(candidate: Candidate, context: dict, connection=None, prepared=None)
+        renders the letter for a candidate into a message that is ready to be sent
+    unique_recipient_ids()
+        returns ids of recipients to create delivery records for, one per email address
+    pending_deliveries(first_id: int, last_id: int)
+        returns pending delivery records with the recipients' fields needed for rendering
+    start_delivery()
+        creates delivery records for the recipients and marks the letter as 'In Progress'
+    refresh_delivery_counters()
+        recalculates delivery counters from the delivery records
+    delivery_stats()
+        returns delivery statistics of the letter
 
     """
 
@@ -259,11 +353,57 @@ class EmailLetter(models.Model):
         verbose_name=_("Recipients"),
         related_name="sent_letters",
     )
+    sent_count = models.PositiveIntegerField(
+        _("Sent"),
+        default=0,
+        editable=False,
+    )
+    failed_count = models.PositiveIntegerField(
+        _("Failed"),
+        default=0,
+        editable=False,
+    )
+    pending_count = models.PositiveIntegerField(
+        _("Pending"),
+        default=0,
+        editable=False,
+    )
+
+    objects = EmailLetterQuerySet.as_manager()
 
     @property
     def sent_time(self) -> str:
         return self.sent_at or "Not available"
 
+    def prepare_template(self, context: dict) -> PreparedTemplate:
+        """Bind the vacancy, event and context shared by all recipients to the template."""
+        return self.template.prepare(context=context, vacancy=self.vacancy, event=self.event)
+
+    def build_message(
+        self,
+        candidate: Candidate,
+        context: dict,
+        connection=None,
+        prepared: PreparedTemplate = None,
+    ) -> EmailMultiAlternatives:
+        """Render the letter for a candidate into a multipart (text + HTML) message.
+        Pass the result of `prepare_template()` as `prepared` when the letter is built
+        for many candidates, so the shared parts of the template are rendered once.
+        """
+        if prepared is None:
+            prepared = self.prepare_template(context)
+        subject = prepared.render_subject(candidate)
+        body = prepared.render_body(candidate)
+        message = EmailMultiAlternatives(
+            subject=subject,
+            body=strip_tags(body),
+            from_email=settings.DEFAULT_FROM_EMAIL,
+            to=(candidate.email,),
+            connection=connection,
+        )
+        message.attach_alternative(body, "text/html")
+        return message
+
     def mark_in_progress(self):
         """Mark as 'In Progress'."""
         self.status = EmailStatus.IN_PROCESS
@@ -274,7 +414,222 @@ class EmailLetter(models.Model):
         self.status = EmailStatus.SENT
         self.save(update_fields=["status"])
 
+    def mark_failed(self):
+        """Mark as 'Failed'."""
+        self.status = EmailStatus.FAILED
+        self.save(update_fields=["status"])
+
+    def unique_recipient_ids(self) -> models.QuerySet:
+        """
+        Return ids of recipients that should get a delivery record. Recipients without
+        email are skipped, and recipients sharing an address (compared case-insensitively,
+        ignoring surrounding spaces) get a single record, for the one with the lowest id.
+        Addresses that already have a record for this letter are skipped as well.
+        Everything is done by the database in a single query.
+        """
+        normalized_email = Lower(Trim("email"))
+        addresses_with_delivery = self.deliveries.annotate(
+            normalized_email=Lower(Trim("candidate__email"))
+        ).values("normalized_email")
+        return (
+            self.recipients.annotate(normalized_email=normalized_email)
+            .exclude(normalized_email="")
+            .exclude(normalized_email__in=addresses_with_delivery)
+            .order_by()
+            .values("normalized_email")
+            .annotate(first_id=models.Min("id"))
+            .values_list("first_id", flat=True)
+        )
+
+    def pending_deliveries(self, first_id: int, last_id: int) -> models.QuerySet:
+        """
+        Return pending delivery records of recipients with ids in [first_id, last_id],
+        ordered by recipient. Only the recipient fields needed to render and address
+        the letter are loaded.
+        """
+        return (
+            self.deliveries.filter(
+                status=EmailStatus.CREATED,
+                candidate_id__gte=first_id,
+                candidate_id__lte=last_id,
+            )
+            .select_related("candidate")
+            # "letter" isn't used, but the related manager sets it on every record and
+            # would load a deferred letter_id with a query per record.
+            .only(
+                "id", "letter", "candidate", *(f"candidate__{field}" for field in RECIPIENT_FIELDS)
+            )
+            .order_by("candidate_id")
+        )
+
+    def start_delivery(self):
+        """
+        Create delivery records for recipients that don't have one yet, requeue the
+        failed ones and mark the letter as 'In Progress'. Recipients who have already
+        received the letter are left untouched, so restarting a letter never sends
+        it to them again. Recipient ids are streamed from the database, so memory
+        usage doesn't depend on the number of recipients.
+        """
+        recipient_ids = self.unique_recipient_ids().iterator(chunk_size=DELIVERY_BATCH_SIZE)
+        deliveries = []
+        for candidate_id in recipient_ids:
+            deliveries.append(EmailDelivery(letter_id=self.id, candidate_id=candidate_id))
+            if len(deliveries) == DELIVERY_BATCH_SIZE:
+                EmailDelivery.objects.bulk_create(deliveries, ignore_conflicts=True)
+                deliveries = []
+        EmailDelivery.objects.bulk_create(deliveries, ignore_conflicts=True)
+        self.deliveries.filter(status=EmailStatus.FAILED).update(status=EmailStatus.CREATED)
+
+        self.mark_in_progress()
+        self.refresh_delivery_counters()
+
+    def refresh_delivery_counters(self):
+        """
+        Recalculate delivery counters from the delivery records with a single UPDATE.
+        It is safe to call it from several workers at once.
+        """
+
+        def count(status: int):
+            deliveries = (
+                EmailDelivery.objects.filter(letter=models.OuterRef("pk"), status=status)
+                .values("letter")
+                .annotate(count=models.Count("id"))
+                .values("count")
+            )
+            return Coalesce(models.Subquery(deliveries), 0)
+
+        EmailLetter.objects.filter(id=self.id).update(
+            sent_count=count(EmailStatus.SENT),
+            failed_count=count(EmailStatus.FAILED),
+            pending_count=count(EmailStatus.CREATED),
+        )
+        self.refresh_from_db(fields=["sent_count", "failed_count", "pending_count"])
+
+    def finish_delivery(self):
+        """
+        Set the status of the letter from its delivery counters and the date of sending.
+        The letter is 'Failed' only if it wasn't delivered to anyone, refused or failed
+        recipients of a delivered letter are recorded by their deliveries.
+        """
+        self.refresh_delivery_counters()
+        if self.failed_count and not self.sent_count:
+            self.mark_failed()
+        else:
+            self.mark_sent()
+        self.set_sent_datetime()
+
+    def delivery_stats(self) -> dict:
+        """Return delivery statistics of the letter, computed by one aggregate query."""
+        return self.deliveries.aggregate(
+            total=models.Count("id"),
+            sent=models.Count("id", filter=models.Q(status=EmailStatus.SENT)),
+            failed=models.Count("id", filter=models.Q(status=EmailStatus.FAILED)),
+            pending=models.Count("id", filter=models.Q(status=EmailStatus.CREATED)),
+            attempts=Coalesce(models.Sum("attempts"), 0),
+            last_sent_at=models.Max("sent_at"),
+        )
+
     def set_sent_datetime(self):
         """Set date and time of sending the email."""
         self.sent_at = datetime.now()
         self.save(update_fields=["sent_at"])
+
+
+class EmailDeliveryQuerySet(models.QuerySet):
+    """This class provides bulk status updates for delivery records."""
+
+    def mark_sent(self, ids: list[int]) -> int:
+        """Mark deliveries as sent with a single UPDATE."""
+        return self.filter(id__in=ids).update(
+            status=EmailStatus.SENT,
+            attempts=models.F("attempts") + 1,
+            last_error="",
+            sent_at=now(),
+        )
+
+    def mark_failed(self, errors: dict[int, str]) -> int:
+        """Mark deliveries as failed, `errors` maps ids of deliveries to error messages."""
+        deliveries = [
+            EmailDelivery(
+                id=delivery_id,
+                status=EmailStatus.FAILED,
+                attempts=models.F("attempts") + 1,
+                last_error=error,
+            )
+            for delivery_id, error in errors.items()
+        ]
+        return self.bulk_update(deliveries, ["status", "attempts", "last_error"])
+
+
+class EmailDelivery(models.Model):
+    """
+    This class represents delivery of an EmailLetter to a single recipient. The
+    records are created when the letter is sent, and make it possible to resume
+    an interrupted letter without sending it to anyone twice.
+
+    Attributes
+    --------------
+    letter : EmailLetter
+        the letter being delivered
+    candidate : Candidate
+        the recipient of the letter
+    status : int
+        delivery status: 'Created' (pending), 'Sent' or 'Failed'
+    attempts : int
+        number of delivery attempts
+    last_error : str
+        error of the last failed attempt
+    sent_at : datetime
+        time of when the letter was delivered
+
+    """
+
+    letter = models.ForeignKey(
+        to=EmailLetter,
+        related_name="deliveries",
+        verbose_name=_("Letter"),
+        on_delete=models.CASCADE,
+    )
+    candidate = models.ForeignKey(
+        to=Candidate,
+        related_name="email_deliveries",
+        verbose_name=_("Recipient"),
+        on_delete=models.CASCADE,
+    )
+    status = models.IntegerField(
+        _("Delivery Status"),
+        choices=EmailStatus.choices,
+        default=EmailStatus.CREATED,
+    )
+    attempts = models.PositiveSmallIntegerField(
+        _("Attempts"),
+        default=0,
+    )
+    last_error = models.TextField(
+        _("Last error"),
+        blank=True,
+    )
+    sent_at = models.DateTimeField(
+        _("Sent at"),
+        null=True,
+        blank=True,
+    )
+
+    objects = EmailDeliveryQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = _("Email Delivery")
+        verbose_name_plural = _("Email Deliveries")
+        constraints = (
+            models.UniqueConstraint(
+                fields=("letter", "candidate"),
+                name="unique_letter_delivery",
+            ),
+        )
+        indexes = (models.Index(fields=("letter", "status", "candidate")),)
+
+    def __str__(self) -> str:
+        return f"{self.letter} -> {self.candidate}"
+
+    def __repr__(self) -> str:
+        return f"<EmailDelivery (id={self.id}) letter={self.letter_id} to={self.candidate_id}>"
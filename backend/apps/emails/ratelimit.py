@@ -0,0 +1,193 @@
+import logging
+from abc import ABC, abstractmethod
+from threading import Lock
+from time import monotonic, sleep
+
+import redis
+from base.cache import increment
+from django.conf import settings
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+# Refills the bucket and takes tokens from it atomically. Time is taken from the Redis
+# server, so clocks of the workers don't have to be in sync. Returns the number of tokens
+# left and the number of seconds to wait before the requested tokens are available.
+TOKEN_BUCKET_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local requested = tonumber(ARGV[3])
+local time = redis.call("TIME")
+local now = tonumber(time[1]) + tonumber(time[2]) / 1000000
+local state = redis.call("HMGET", KEYS[1], "tokens", "updated_at")
+local tokens = tonumber(state[1]) or capacity
+local updated_at = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - updated_at) * rate)
+local wait = 0
+if tokens >= requested then
+    tokens = tokens - requested
+else
+    wait = (requested - tokens) / rate
+end
+redis.call("HSET", KEYS[1], "tokens", tostring(tokens), "updated_at", tostring(now))
+redis.call("EXPIRE", KEYS[1], math.ceil(capacity / rate) + 60)
+return {tostring(tokens), tostring(wait)}
+"""
+# Counters of acquire() calls of every bucket, shared by all processes.
+STATS_KEY = "email-rate-limit-stats:{}:{}"
+STATS_COUNTERS = ("acquired", "waits", "wait_ms")
+
+
+class TokenBucket(ABC):
+    """
+    Token bucket rate limiter. The bucket holds up to `capacity` tokens and is refilled
+    with `rate` tokens per second, sending a message takes one token. When the bucket
+    is empty, `acquire()` sleeps until enough tokens are refilled instead of polling.
+
+    Attributes
+    --------------
+    name : str
+        name of the bucket, usually the sender domain
+    rate : float
+        tokens refilled per second, 0 disables the limit
+    capacity : int
+        maximal number of tokens, i.e. the size of a burst
+
+    Methods
+    --------------
+    acquire(tokens: int = 1)
+        takes tokens from the bucket, waiting until they are available
+    level()
+        returns the current number of tokens in the bucket
+    stats()
+        returns the fill level of the bucket and wait times of all processes
+
+    """
+
+    def __init__(self, name: str, rate: float, capacity: int):
+        self.name = name
+        self.rate = rate
+        self.capacity = max(capacity, 1)
+
+    def acquire(self, tokens: int = 1) -> float:
+        """Take tokens from the bucket, sleep until they are available. Return the wait time."""
+        if not self.rate:
+            return 0.0
+
+        waited = 0.0
+        while True:
+            wait = self._take(tokens)
+            if not wait:
+                break
+            sleep(wait)
+            waited += wait
+
+        increment(STATS_KEY.format(self.name, "acquired"), tokens)
+        if waited:
+            increment(STATS_KEY.format(self.name, "waits"))
+            increment(STATS_KEY.format(self.name, "wait_ms"), round(waited * 1000))
+            logger.debug("Waited %.3fs for the '%s' rate limit.", waited, self.name)
+        return waited
+
+    def level(self) -> float:
+        """Return the current number of tokens in the bucket."""
+        if not self.rate:
+            return float(self.capacity)
+        return self._refill(0)[0]
+
+    def stats(self) -> dict:
+        """Return the fill level of the bucket and wait times of all processes."""
+        keys = {STATS_KEY.format(self.name, counter): counter for counter in STATS_COUNTERS}
+        counters = {counter: 0 for counter in STATS_COUNTERS}
+        for key, value in cache.get_many(keys).items():
+            counters[keys[key]] = value
+        total_wait = counters["wait_ms"] / 1000
+        return {
+            "name": self.name,
+            "rate": self.rate,
+            "capacity": self.capacity,
+            "level": self.level(),
+            "acquired": counters["acquired"],
+            "waits": counters["waits"],
+            "total_wait": total_wait,
+            "average_wait": total_wait / counters["waits"] if counters["waits"] else 0.0,
+        }
+
+    def _take(self, tokens: int) -> float:
+        """Take tokens if there are enough of them, otherwise return seconds to wait."""
+        return self._refill(tokens)[1]
+
+    @abstractmethod
+    def _refill(self, tokens: int) -> tuple[float, float]:
+        """Refill the bucket and take tokens from it. Return tokens left and the wait time."""
+
+
+class LocalTokenBucket(TokenBucket):
+    """Token bucket kept in memory, it limits the rate of a single process only."""
+
+    def __init__(self, name: str, rate: float, capacity: int):
+        super().__init__(name, rate, capacity)
+        self._tokens = float(self.capacity)
+        self._updated_at = monotonic()
+        self._lock = Lock()
+
+    def _refill(self, tokens: int) -> tuple[float, float]:
+        with self._lock:
+            now = monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+            self._updated_at = now
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return self._tokens, 0.0
+            return self._tokens, (tokens - self._tokens) / self.rate
+
+
+class RedisTokenBucket(TokenBucket):
+    """Token bucket kept in Redis, it limits the total rate of all workers."""
+
+    def __init__(self, name: str, rate: float, capacity: int, client: redis.Redis):
+        super().__init__(name, rate, capacity)
+        self.key = f"email-rate-limit:{name}"
+        self._script = client.register_script(TOKEN_BUCKET_SCRIPT)
+
+    def _refill(self, tokens: int) -> tuple[float, float]:
+        left, wait = self._script(keys=[self.key], args=[self.rate, self.capacity, tokens])
+        return float(left), float(wait)
+
+
+# Buckets by their domain, rate, capacity and Redis URL. A change of the settings leads
+# to a new bucket rather than reusing one made with the old settings.
+_buckets = {}
+_buckets_lock = Lock()
+
+
+def get_rate_limiter(from_email: str = None) -> TokenBucket:
+    """
+    Return the rate limiter of the sender domain (of DEFAULT_FROM_EMAIL by default).
+    The rate is taken from settings.EMAIL_DOMAIN_RATE_LIMITS, or settings.EMAIL_RATE_LIMIT
+    if the domain has no limit of its own. Buckets are kept in Redis if it is configured.
+    """
+    domain = (from_email or settings.DEFAULT_FROM_EMAIL or "").rpartition("@")[2].lower()
+    rate = settings.EMAIL_DOMAIN_RATE_LIMITS.get(domain, settings.EMAIL_RATE_LIMIT)
+    capacity = settings.EMAIL_RATE_LIMIT_BURST
+    redis_url = settings.EMAIL_RATE_LIMIT_REDIS_URL
+    key = (domain, rate, capacity, redis_url)
+    with _buckets_lock:
+        bucket = _buckets.get(key)
+        if bucket is None:
+            if redis_url:
+                bucket = RedisTokenBucket(domain, rate, capacity, redis.Redis.from_url(redis_url))
+            else:
+                bucket = LocalTokenBucket(domain, rate, capacity)
+            _buckets[key] = bucket
+        return bucket
+
+
+def rate_limiter_stats() -> list[dict]:
+    """
+    Return stats of the rate limiters of DEFAULT_FROM_EMAIL and of all the domains in
+    settings.EMAIL_DOMAIN_RATE_LIMITS.
+    """
+    domains = [settings.DEFAULT_FROM_EMAIL or "", *settings.EMAIL_DOMAIN_RATE_LIMITS]
+    domains = dict.fromkeys(domain.rpartition("@")[2].lower() for domain in domains)
+    return [get_rate_limiter(f"@{domain}").stats() for domain in domains]
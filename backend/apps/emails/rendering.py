@@ -0,0 +1,196 @@
+from apps.emails.cache import compiled_templates
+from django.template import Context, Template
+from django.template.base import FilterExpression, Node, NodeList, TextNode, Variable, VariableNode
+from django.template.defaulttags import (
+    AutoEscapeControlNode,
+    CommentNode,
+    CycleNode,
+    FilterNode,
+    FirstOfNode,
+    ForNode,
+    IfChangedNode,
+    IfNode,
+    LoadNode,
+    LoremNode,
+    NowNode,
+    SpacelessNode,
+    TemplateTagNode,
+    VerbatimNode,
+    WidthRatioNode,
+    WithNode,
+)
+from django.utils.safestring import SafeString
+
+# Nodes that only produce output and never change the context seen by their siblings.
+PURE_NODES = (
+    AutoEscapeControlNode,
+    CommentNode,
+    CycleNode,
+    FilterNode,
+    FirstOfNode,
+    ForNode,
+    IfChangedNode,
+    IfNode,
+    LoadNode,
+    LoremNode,
+    NowNode,
+    SpacelessNode,
+    TemplateTagNode,
+    TextNode,
+    VariableNode,
+    VerbatimNode,
+    WidthRatioNode,
+    WithNode,
+)
+# Attributes of the nodes above that make them store a value in the context.
+CONTEXT_SETTERS = ("asvar", "variable_name")
+# Attributes that hold parsing details and never affect rendering.
+SKIPPED_ATTRIBUTES = ("token", "origin")
+
+
+def referenced_names(obj) -> set[str]:
+    """Return names of all context variables the compiled template object refers to."""
+    names = set()
+    stack = [obj]
+    while stack:
+        obj = stack.pop()
+        if isinstance(obj, Variable):
+            if obj.lookups:
+                names.add(obj.lookups[0])
+        elif isinstance(obj, FilterExpression):
+            stack.append(obj.var)
+            stack.extend(arg for _, args in obj.filters for lookup, arg in args if lookup)
+        elif isinstance(obj, (list, tuple)):  # NodeList is a list as well
+            stack.extend(obj)
+        elif isinstance(obj, dict):
+            stack.extend(obj.values())
+        elif type(obj).__module__.startswith("django.template") and hasattr(obj, "__dict__"):
+            # Nodes and parsed conditions of {% if %} tags.
+            stack.extend(
+                value for name, value in vars(obj).items() if name not in SKIPPED_ATTRIBUTES
+            )
+    return names
+
+
+def is_plannable(nodelist: NodeList) -> bool:
+    """
+    Return True if every node of the template is known not to change the context
+    for the nodes that follow it, so that nodes can be rendered independently.
+    """
+    for node in nodelist.get_nodes_by_type(Node):
+        if not isinstance(node, PURE_NODES):
+            return False
+        if any(getattr(node, attribute, None) for attribute in CONTEXT_SETTERS):
+            return False
+    return True
+
+
+class RenderPlan:
+    """
+    This class renders a template for many recipients that share most of the context.
+
+    The template is partially evaluated once against the static context: every
+    top-level node that doesn't refer to any of the dynamic names is rendered right
+    away, and only the remaining nodes are rendered for each recipient. The result
+    is identical to rendering the whole template with the merged context.
+
+    Templates with tags that could change the context for other nodes (like
+    {% cycle ... as name %} or custom tags) are always rendered in full.
+
+    Attributes
+    --------------
+    template : Template
+        compiled template
+    static_context : dict
+        context shared by all recipients
+    dynamic_names : frozenset
+        names of the context variables that differ between recipients
+
+    Methods
+    --------------
+    render(dynamic_context: dict)
+        renders the template for a recipient
+
+    """
+
+    def __init__(self, template: Template, static_context: dict, dynamic_names: frozenset):
+        self.template = template
+        self.static_context = static_context
+        self.dynamic_names = dynamic_names
+        self.parts = self._prepare() if is_plannable(template.nodelist) else None
+
+    @property
+    def is_partial(self) -> bool:
+        """Return True if only the dynamic nodes are rendered per recipient."""
+        return self.parts is not None
+
+    def render(self, dynamic_context: dict) -> str:
+        """Render the template for a recipient."""
+        context = Context(self.static_context | dynamic_context)
+        if self.parts is None:
+            return self.template.render(context)
+
+        with context.render_context.push_state(self.template):
+            with context.bind_template(self.template):
+                return SafeString(
+                    "".join(
+                        part if isinstance(part, str) else part.render_annotated(context)
+                        for part in self.parts
+                    )
+                )
+
+    def _prepare(self) -> list:
+        """
+        Render static nodes against the static context. Return a list of rendered
+        strings and nodes which have to be rendered for every recipient, with
+        adjacent strings merged together.
+        """
+        parts = []
+        context = Context(self.static_context)
+        with context.render_context.push_state(self.template):
+            with context.bind_template(self.template):
+                for node in self.template.nodelist:
+                    if referenced_names(node) & self.dynamic_names:
+                        parts.append(node)
+                    elif parts and isinstance(parts[-1], str):
+                        parts[-1] += node.render_annotated(context)
+                    else:
+                        parts.append(node.render_annotated(context))
+        return parts
+
+
+class PreparedTemplate:
+    """
+    EmailTemplate prepared for delivery of a single letter. Vacancy, event and
+    custom context are bound once, so only the candidate keywords are substituted
+    for every recipient.
+
+    Methods
+    --------------
+    render_subject(candidate: Candidate)
+        renders the subject for a candidate
+    render_body(candidate: Candidate)
+        renders the body for a candidate
+
+    """
+
+    def __init__(self, template, static_context: dict):
+        self.template = template
+        self.subject = RenderPlan(
+            compiled_templates.get(template, "subject"),
+            static_context,
+            template.CANDIDATE_KEYWORDS,
+        )
+        self.body = RenderPlan(
+            compiled_templates.get(template, "body"),
+            static_context,
+            template.CANDIDATE_KEYWORDS,
+        )
+
+    def render_subject(self, candidate=None) -> str:
+        """Render the subject for a candidate."""
+        return self.subject.render(self.template._candidate_keywords(candidate))
+
+    def render_body(self, candidate=None) -> str:
+        """Render the body for a candidate."""
+        return self.body.render(self.template._candidate_keywords(candidate))
@@ -0,0 +1,11 @@
+from apps.emails.cache import compiled_templates
+from apps.emails.models import EmailTemplate
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+
+@receiver(post_save, sender=EmailTemplate)
+@receiver(post_delete, sender=EmailTemplate)
+def invalidate_compiled_template(sender, instance, **kwargs):
+    """Drop compiled versions of the template once it was edited or deleted."""
+    compiled_templates.invalidate(instance.pk)
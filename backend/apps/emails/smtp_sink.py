@@ -0,0 +1,170 @@
+import asyncio
+from threading import Event, Thread
+
+
+class SMTPSink:
+    """
+    In-process SMTP server which accepts messages and keeps them in memory instead of
+    delivering them. It speaks just enough SMTP for smtplib and is meant for tests and
+    benchmarks of the delivery code.
+
+    Usage
+    --------------
+    with SMTPSink() as sink:
+        backend = get_connection(host=sink.host, port=sink.port)
+        ...
+        assert len(sink.messages) == 1
+
+    Attributes
+    --------------
+    host : str
+        address the server listens on
+    port : int
+        port the server listens on, a free one is chosen by default
+    refuse : set
+        recipient addresses rejected with 550
+    delay : float
+        seconds the server takes to accept each message
+    messages_per_session : int
+        the server drops the session after that many messages, like relays do
+    messages : list
+        accepted messages as (mail_from, recipients, data) tuples
+    sessions : int
+        number of sessions opened so far
+    max_active_sessions : int
+        maximal number of sessions open at the same time
+
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        refuse=(),
+        delay: float = 0.0,
+        messages_per_session: int = None,
+    ):
+        self.host = host
+        self.port = port
+        self.refuse = {address.lower() for address in refuse}
+        self.delay = delay
+        self.messages_per_session = messages_per_session
+        self.messages = []
+        self.sessions = 0
+        self.max_active_sessions = 0
+        self._active_sessions = 0
+        self._loop = None
+        self._server = None
+        self._thread = None
+        self._started = Event()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    def start(self):
+        """Start the server in a background thread."""
+        self._thread = Thread(target=self._run, name="smtp-sink", daemon=True)
+        self._thread.start()
+        self._started.wait()
+
+    def stop(self):
+        """Stop the server."""
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._server.close)
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+            self._loop = None
+
+    def _run(self):
+        self._loop = asyncio.new_event_loop()
+        self._server = self._loop.run_until_complete(
+            asyncio.start_server(self._handle, self.host, self.port)
+        )
+        self.port = self._server.sockets[0].getsockname()[1]
+        self._started.set()
+        try:
+            self._loop.run_forever()
+        finally:
+            self._loop.close()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Handle a single SMTP session."""
+        self.sessions += 1
+        self._active_sessions += 1
+        self.max_active_sessions = max(self.max_active_sessions, self._active_sessions)
+
+        def reply(line: str):
+            writer.write(f"{line}\r\n".encode())
+
+        mail_from, recipients, accepted = None, [], 0
+        reply("220 sink ESMTP")
+        try:
+            while True:
+                await writer.drain()
+                line = await reader.readline()
+                if not line:
+                    break
+                command, _, argument = line.decode().rstrip("\r\n").partition(" ")
+                command = command.upper()
+                if command == "EHLO":
+                    reply("250-sink\r\n250 8BITMIME")
+                elif command in ("HELO", "NOOP"):
+                    reply("250 OK")
+                elif command == "MAIL":
+                    mail_from, recipients = self._address(argument), []
+                    reply("250 OK")
+                elif command == "RCPT":
+                    address = self._address(argument)
+                    if address.lower() in self.refuse:
+                        reply("550 No such user")
+                    else:
+                        recipients.append(address)
+                        reply("250 OK")
+                elif command == "DATA":
+                    if not recipients:
+                        reply("503 No valid recipients")
+                        continue
+                    reply("354 End data with <CR><LF>.<CR><LF>")
+                    await writer.drain()
+                    data = await self._read_data(reader)
+                    if self.delay:
+                        await asyncio.sleep(self.delay)
+                    self.messages.append((mail_from, recipients, data))
+                    mail_from, recipients = None, []
+                    accepted += 1
+                    reply("250 OK")
+                    if self.messages_per_session and accepted >= self.messages_per_session:
+                        break
+                elif command == "RSET":
+                    mail_from, recipients = None, []
+                    reply("250 OK")
+                elif command == "QUIT":
+                    reply("221 Bye")
+                    break
+                else:
+                    reply("502 Command not implemented")
+            await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            self._active_sessions -= 1
+            writer.close()
+
+    @staticmethod
+    def _address(argument: str) -> str:
+        """Return the address from 'FROM:<address>' or 'TO:<address>'."""
+        return argument.partition(":")[2].split(" ")[0].strip("<>")
+
+    @staticmethod
+    async def _read_data(reader: asyncio.StreamReader) -> bytes:
+        """Read the message up to the terminating dot, removing dot-stuffing."""
+        lines = []
+        while True:
+            line = await reader.readline()
+            if line in (b".\r\n", b""):
+                return b"".join(lines)
+            lines.append(line[1:] if line.startswith(b"..") else line)
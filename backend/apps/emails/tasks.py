@@ -1,47 +1,207 @@
-import smtplib
+import logging
+import math
 
-from apps.emails.models import EmailLetter
+from apps.emails.delivery import BatchEmailSender
+from apps.emails.models import DELIVERY_BATCH_SIZE, EmailDelivery, EmailLetter
+from apps.emails.ratelimit import get_rate_limiter
+from base.models import EmailStatus
+from celery import chord
 from config.celery import app
 from django.conf import settings
-from django.core.mail import send_mail
-from django.utils.html import strip_tags
+from django.db.models import F
+from kombu.exceptions import OperationalError
 
+logger = logging.getLogger(__name__)
 
-@app.task(bind=True, default_retry_delay=2 * 60)
-def send_emails(self, email_letter: int, context: dict = None):
-    """Celery task to send emails for Candidates."""
+
+def split_into_chunks(ids, chunk_size: int) -> list[tuple[int, int, int]]:
+    """
+    Split id-ordered recipients into chunks. Each chunk is described by its first
+    and last id (inclusive) and the number of recipients in it, so the broker
+    messages stay small no matter how big the chunks are.
+    """
+    chunks = []
+    first_id = last_id = None
+    count = 0
+    for recipient_id in ids:
+        if first_id is None:
+            first_id = recipient_id
+        last_id = recipient_id
+        count += 1
+        if count == chunk_size:
+            chunks.append((first_id, last_id, count))
+            first_id, count = None, 0
+    if count:
+        chunks.append((first_id, last_id, count))
+    return chunks
+
+
+def chunk_time_limit(recipients: int, rate: float) -> int:
+    """
+    Return the time limit of a chunk task of a letter with `recipients` pending
+    recipients, sent at `rate` messages per second (0 is unlimited). All chunks share
+    the rate limit, so a chunk may wait for the whole letter to be sent before it is
+    done. The limit covers that on top of settings.CELERY_TASK_TIME_LIMIT.
+    """
+    if not rate:
+        return settings.CELERY_TASK_TIME_LIMIT
+    return settings.CELERY_TASK_TIME_LIMIT + math.ceil(recipients / rate)
+
+
+def enqueue_letters(letter_ids: list[int]) -> list[int]:
+    """
+    Publish a send_emails task for every letter over one broker connection and return
+    ids of the letters which couldn't be published because the broker is unavailable.
+    Every letter is published on its own, so the returned letters are exactly the ones
+    which weren't queued.
+    """
+    published = set()
+    try:
+        with app.producer_or_acquire() as producer:
+            for letter_id in letter_ids:
+                try:
+                    send_emails.apply_async(kwargs={"email_letter": letter_id}, producer=producer)
+                except OperationalError:
+                    logger.exception("Letter %s couldn't be queued.", letter_id)
+                else:
+                    published.add(letter_id)
+    except OperationalError:  # the connection couldn't be acquired
+        logger.exception("Letters couldn't be queued.")
+    return [letter_id for letter_id in letter_ids if letter_id not in published]
+
+
+@app.task
+def send_emails(
+    email_letter: int,
+    context: dict = None,
+    batched: bool = None,
+    backend: str = None,
+):
+    """
+    Celery task to send emails for Candidates.
+
+    Every recipient gets a delivery record, and recipients who haven't received the
+    letter yet are split into id-ordered chunks of settings.EMAIL_CHUNK_SIZE. Every
+    chunk is delivered by its own subtask, so a large letter is spread across workers
+    and doesn't hit the task time limit. Chunks throttled by the rate limit of the
+    sender get a time limit long enough to send the whole letter. The letter is
+    finished once all the chunks have finished, or have failed (see
+    abort_email_letter). `backend` selects the email backend for this letter only
+    (default is settings.EMAIL_BULK_BACKEND).
+    """
     email = EmailLetter.objects.get(id=email_letter)
+    email.start_delivery()
+
+    recipient_ids = (
+        email.deliveries.filter(status=EmailStatus.CREATED)
+        .order_by("candidate_id")
+        .values_list("candidate_id", flat=True)
+        .iterator(chunk_size=DELIVERY_BATCH_SIZE)
+    )
+    chunks = split_into_chunks(recipient_ids, settings.EMAIL_CHUNK_SIZE)
+    if not chunks:
+        return finish_email_letter([], email_letter=email_letter)
+
+    time_limit = chunk_time_limit(
+        sum(count for _, _, count in chunks), get_rate_limiter(settings.DEFAULT_FROM_EMAIL).rate
+    )
+    chord(
+        send_email_chunk.s(
+            email_letter=email_letter,
+            first_id=first_id,
+            last_id=last_id,
+            context=context,
+            batched=batched,
+            backend=backend,
+        ).set(time_limit=time_limit)
+        for first_id, last_id, _ in chunks
+    )(
+        finish_email_letter.s(email_letter=email_letter).on_error(
+            abort_email_letter.s(email_letter=email_letter)
+        )
+    )
+
+
+@app.task(bind=True, default_retry_delay=2 * 60, max_retries=3)
+def send_email_chunk(
+    self,
+    email_letter: int,
+    first_id: int,
+    last_id: int,
+    context: dict = None,
+    batched: bool = None,
+    backend: str = None,
+) -> dict:
+    """
+    Celery task to deliver a letter to recipients with ids in [first_id, last_id].
+
+    Only recipients with pending deliveries are processed, so a retried chunk doesn't
+    send the letter to anyone twice. They are streamed from the database with only the
+    fields needed for rendering, so memory usage doesn't grow with the chunk size.
+    Outcomes are saved in bulk after every group of messages. With `batched` delivery
+    (default is settings.EMAIL_BATCHED_DELIVERY) all messages of the chunk share one
+    SMTP connection, otherwise each recipient gets its own. SMTP and socket errors are
+    retried. If the chunk still fails after all the retries, or fails with any other
+    error, its pending deliveries are marked as failed, so the letter can be finished
+    anyway. The template is prepared once per chunk, so only the
+    candidate keywords are rendered for every recipient.
+    """
+    email = EmailLetter.objects.select_related("template", "vacancy", "event").get(id=email_letter)
     if not context:
         context = {}
-    candidates = (candidate for candidate in email.recipients.all() if candidate.email)
-    template = email.template
-
-    email.mark_in_progress()
-
-    for candidate in candidates:
-        try:
-            subj = template.render_subject(
-                context=context,
-                candidate=candidate,
-                vacancy=email.vacancy,
-                event=email.event,
-            )
-            msg = template.render_body(
-                context=context,
-                candidate=candidate,
-                vacancy=email.vacancy,
-                event=email.event,
-            )
-            send_mail(
-                subject=subj,
-                html_message=msg,
-                message=strip_tags(msg),
-                from_email=settings.DEFAULT_FROM_EMAIL,
-                recipient_list=(candidate.email,),
-                fail_silently=False,
-            )
-        except smtplib.SMTPException as err:
-            self.retry(exc=err)
-
-    email.mark_sent()
-    email.set_sent_datetime()
+    deliveries = email.pending_deliveries(first_id, last_id)
+
+    def save_outcomes(delivered: list[int], failed: dict[int, str]):
+        EmailDelivery.objects.mark_sent(delivered)
+        EmailDelivery.objects.mark_failed(failed)
+        email.refresh_delivery_counters()
+
+    prepared = email.prepare_template(context)
+    sender = BatchEmailSender(reuse_connection=batched, backend=backend, on_flush=save_outcomes)
+    try:
+        with sender:
+            for delivery in deliveries.iterator(chunk_size=DELIVERY_BATCH_SIZE):
+                message = email.build_message(
+                    candidate=delivery.candidate,
+                    context=context,
+                    prepared=prepared,
+                )
+                sender.send(message, key=delivery.id)
+    except OSError as err:  # SMTP and socket errors
+        if self.request.retries < self.max_retries:
+            raise self.retry(exc=err)
+        fail_pending_deliveries(email, deliveries, err)
+    except Exception as err:
+        logger.exception("Chunk %s-%s of letter %s failed.", first_id, last_id, email_letter)
+        fail_pending_deliveries(email, deliveries, err)
+
+    return {"sent": sender.sent, "failed": sender.failed, "throttled": sender.throttled}
+
+
+def fail_pending_deliveries(email: EmailLetter, deliveries, err: BaseException):
+    """Mark the pending deliveries as failed with the error and update the letter counters."""
+    deliveries.update(
+        status=EmailStatus.FAILED,
+        attempts=F("attempts") + 1,
+        last_error=str(err) or repr(err),
+    )
+    email.refresh_delivery_counters()
+
+
+@app.task
+def finish_email_letter(results: list[dict], email_letter: int):
+    """Celery task to mark the letter as sent or failed once all chunks are done."""
+    EmailLetter.objects.get(id=email_letter).finish_delivery()
+
+
+@app.task
+def abort_email_letter(request, exc, traceback, email_letter: int):
+    """
+    Celery task called when the chord of send_emails fails, i.e. a chunk failed with an
+    error it couldn't handle (e.g. it was killed at the time limit). Deliveries which
+    are still pending are marked as failed and the letter is finished, so it doesn't
+    stay 'In Progress' forever.
+    """
+    email = EmailLetter.objects.get(id=email_letter)
+    fail_pending_deliveries(email, email.deliveries.filter(status=EmailStatus.CREATED), exc)
+    email.finish_delivery()
@@ -0,0 +1,101 @@
+from unittest import mock
+
+from apps.accounts.factories import UserFactory
+from apps.candidates.factories import CandidateFactory
+from apps.emails.factories import EmailLetterFactory
+from apps.emails.models import EmailLetter
+from base.models import EmailStatus
+from config.celery import app
+from django.core import mail
+from django.test import TestCase
+from django.urls import reverse
+from kombu.exceptions import OperationalError
+
+
+class TestSendEmailsAction(TestCase):
+    """This class tests 'Send emails' action of EmailLetter admin."""
+
+    def setUp(self) -> None:
+        app.conf.task_always_eager = True
+        self.addCleanup(setattr, app.conf, "task_always_eager", False)
+        self.client.force_login(UserFactory(is_staff=True, is_superuser=True))
+        self.letters = [
+            EmailLetterFactory(recipients=CandidateFactory.create_batch(2)) for _ in range(2)
+        ]
+
+    def send(self, letters):
+        return self.client.post(
+            reverse("admin:emails_emailletter_changelist"),
+            {"action": "send_emails_admin", "_selected_action": [letter.id for letter in letters]},
+            follow=True,
+        )
+
+    def test_letters_queued(self):
+        """Selected letters should be claimed and sent."""
+        response = self.send(self.letters)
+
+        self.assertContains(response, "2 letter(s) queued, 0 skipped")
+        self.assertEqual(len(mail.outbox), 4)
+        for letter in self.letters:
+            letter.refresh_from_db()
+            self.assertEqual(letter.status, EmailStatus.SENT)
+
+    def test_letters_sent_once(self):
+        """Running the action twice shouldn't send a letter twice."""
+        self.send(self.letters[:1])
+
+        response = self.send(self.letters)
+
+        self.assertContains(response, "1 letter(s) queued, 1 skipped")
+        self.assertEqual(len(mail.outbox), 4)
+
+    def test_failed_letters_retried(self):
+        """Failed letters should be sent again to the recipients who didn't get them."""
+        self.send(self.letters[:1])
+        letter = self.letters[0]
+        delivery = letter.deliveries.first()
+        delivery.status = EmailStatus.FAILED
+        delivery.save()
+        letter.mark_failed()
+
+        response = self.send(self.letters[:1])
+
+        self.assertContains(response, "1 letter(s) queued, 0 skipped")
+        self.assertEqual(len(mail.outbox), 3)
+        self.assertEqual(mail.outbox[-1].to, [delivery.candidate.email])
+
+    def test_unpublished_letters_released(self):
+        """
+        Only letters which couldn't be published should be put back to their previous
+        statuses, all of them over one broker connection.
+        """
+        self.letters[0].mark_failed()
+        previous = dict(EmailLetter.objects.values_list("id", "status"))
+        apply_async = mock.Mock(side_effect=[None, OperationalError("Broker is down")])
+
+        with mock.patch("apps.emails.tasks.send_emails.apply_async", apply_async):
+            response = self.send(self.letters)
+
+        self.assertContains(response, "1 letter(s) couldn&#x27;t be queued, try again.")
+        self.assertContains(response, "1 letter(s) queued, 0 skipped")
+        calls = apply_async.call_args_list
+        self.assertIs(calls[0].kwargs["producer"], calls[1].kwargs["producer"])
+        published, unpublished = (call.kwargs["kwargs"]["email_letter"] for call in calls)
+        statuses = dict(EmailLetter.objects.values_list("id", "status"))
+        self.assertEqual(statuses[published], EmailStatus.IN_PROCESS)
+        self.assertEqual(statuses[unpublished], previous[unpublished])
+
+    def test_claim(self):
+        """Only letters that haven't been sent yet or have failed should be claimed."""
+        self.letters[0].mark_sent()
+        failed = EmailLetterFactory()
+        failed.mark_failed()
+        letters = EmailLetter.objects.order_by("id")
+
+        self.assertEqual(
+            letters.claim(),
+            {self.letters[1].id: EmailStatus.CREATED, failed.id: EmailStatus.FAILED},
+        )
+        self.assertEqual(letters.claim(), {})
+        self.letters[1].refresh_from_db()
+        self.assertEqual(self.letters[1].status, EmailStatus.IN_PROCESS)
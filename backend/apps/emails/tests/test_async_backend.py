@@ -0,0 +1,121 @@
+import asyncio
+import smtplib
+
+from apps.candidates.factories import CandidateFactory
+from apps.emails.backends import AsyncSMTPEmailBackend
+from apps.emails.delivery import BatchEmailSender
+from apps.emails.factories import EmailLetterFactory
+from apps.emails.smtp_sink import SMTPSink
+from apps.emails.tasks import send_emails
+from base.models import EmailStatus
+from config.celery import app
+from django.core.mail import EmailMessage
+from django.test import TestCase, override_settings
+
+BACKEND = "apps.emails.backends.AsyncSMTPEmailBackend"
+
+
+def make_messages(count: int, to: str = "to@ex.com") -> list[EmailMessage]:
+    return [
+        EmailMessage(subject=f"Message {i}", body="Hello", from_email="hr@ex.com", to=[to])
+        for i in range(count)
+    ]
+
+
+class TestAsyncSMTPEmailBackend(TestCase):
+    """This class tests AsyncSMTPEmailBackend against the in-process SMTP sink."""
+
+    def setUp(self) -> None:
+        self.sink = SMTPSink(delay=0.02, refuse=["refused@ex.com"])
+        self.sink.start()
+        self.addCleanup(self.sink.stop)
+
+    def backend(self, **kwargs) -> AsyncSMTPEmailBackend:
+        return AsyncSMTPEmailBackend(host=self.sink.host, port=self.sink.port, **kwargs)
+
+    def test_concurrent_sessions(self):
+        """Messages should be spread across concurrent sessions."""
+        results = self.backend(concurrency=4).deliver(make_messages(12))
+
+        self.assertEqual(results, [None] * 12)
+        self.assertEqual(len(self.sink.messages), 12)
+        self.assertEqual(self.sink.sessions, 4)
+        self.assertGreater(self.sink.max_active_sessions, 1)
+
+    def test_sessions_reused_while_open(self):
+        """An open backend should keep its sessions between calls."""
+        backend = self.backend(concurrency=2)
+        backend.open()
+        backend.send_messages(make_messages(4))
+        executor = backend._executor
+        backend.send_messages(make_messages(4))
+        self.assertIs(backend._executor, executor)
+        backend.close()
+
+        self.assertEqual(len(self.sink.messages), 8)
+        self.assertEqual(self.sink.sessions, 2)
+        self.assertIsNone(backend._executor)
+        self.assertTrue(executor._shutdown)
+
+    def test_running_loop_rejected(self):
+        """The backend should refuse to block a running event loop."""
+
+        async def deliver():
+            return self.backend().deliver(make_messages(1))
+
+        with self.assertRaisesMessage(RuntimeError, "running event loop"):
+            asyncio.run(deliver())
+        self.assertEqual(self.sink.messages, [])
+
+    def test_per_message_results(self):
+        """A refused recipient should fail only its own message."""
+        messages = make_messages(2) + make_messages(1, to="refused@ex.com")
+
+        results = self.backend().deliver(messages)
+
+        self.assertEqual(results[:2], [None, None])
+        self.assertIsInstance(results[2], smtplib.SMTPRecipientsRefused)
+        with self.assertRaises(smtplib.SMTPRecipientsRefused):
+            self.backend().send_messages(messages)
+
+    def test_dropped_session_resumed(self):
+        """A session dropped by the server should be reopened without duplicates."""
+        self.sink.messages_per_session = 2
+
+        results = self.backend(concurrency=2).deliver(make_messages(9))
+
+        self.assertEqual(results, [None] * 9)
+        self.assertEqual(
+            sorted(message[2].split(b"Subject: ")[1][:9] for message in self.sink.messages),
+            sorted(f"Message {i}".encode() for i in range(9)),
+        )
+
+    def test_sender_groups(self):
+        """BatchEmailSender should hand whole groups to the backend."""
+        outcomes = []
+        with BatchEmailSender(
+            batch_size=5,
+            reuse_connection=True,
+            connection=self.backend(),
+            on_flush=lambda delivered, failed: outcomes.append((delivered, failed)),
+        ) as sender:
+            for i, message in enumerate(make_messages(6) + make_messages(1, "refused@ex.com")):
+                sender.send(message, key=i)
+
+        self.assertEqual((sender.sent, sender.failed), (6, 1))
+        self.assertEqual(outcomes[0], ([0, 1, 2, 3, 4], {}))
+        self.assertEqual(outcomes[1][0], [5])
+        self.assertIn("No such user", outcomes[1][1][6])
+
+    def test_send_emails_with_backend(self):
+        """A letter should be deliverable with the backend chosen for it."""
+        app.conf.task_always_eager = True
+        self.addCleanup(setattr, app.conf, "task_always_eager", False)
+        letter = EmailLetterFactory(recipients=CandidateFactory.create_batch(3))
+
+        with override_settings(EMAIL_HOST=self.sink.host, EMAIL_PORT=self.sink.port):
+            send_emails.apply(kwargs={"email_letter": letter.id, "backend": BACKEND})
+
+        letter.refresh_from_db()
+        self.assertEqual(letter.status, EmailStatus.SENT)
+        self.assertEqual(len(self.sink.messages), 3)
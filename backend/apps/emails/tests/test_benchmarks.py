@@ -0,0 +1,29 @@
+import json
+from io import StringIO
+
+from apps.emails.models import EmailLetter
+from django.core.management import call_command
+from django.test import TestCase
+
+
+class TestBenchmarks(TestCase):
+    """This class tests email benchmark commands."""
+
+    def test_benchmark_delivery(self):
+        """The delivery benchmark should print a JSON report and leave no data behind."""
+        stdout = StringIO()
+        call_command("benchmark_delivery", recipients=5, stdout=stdout)
+
+        report = json.loads(stdout.getvalue())
+        self.assertEqual((report["sent"], report["delivered_to_sink"]), (5, 5))
+        self.assertEqual(report["phases"]["render"]["calls"], 10)
+        self.assertEqual(report["phases"]["smtp"]["calls"], 5)
+        self.assertGreater(report["messages_per_second"], 0)
+        self.assertFalse(EmailLetter.objects.exists())
+
+    def test_benchmark_rendering(self):
+        """The rendering benchmark should render the sample template partially."""
+        stdout = StringIO()
+        call_command("benchmark_rendering", recipients=10, stdout=stdout)
+
+        self.assertIn("body rendered partially", stdout.getvalue())
@@ -0,0 +1,125 @@
+from io import StringIO
+from unittest import mock
+
+from apps.emails import ratelimit
+from apps.emails.delivery import BatchEmailSender
+from apps.emails.ratelimit import LocalTokenBucket, TokenBucket, get_rate_limiter
+from django.core import mail
+from django.core.cache import cache
+from django.core.mail import EmailMessage
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+
+class FakeClock:
+    """Clock that only moves forward when somebody sleeps."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+class TestRateLimit(TestCase):
+    """This class tests the token bucket rate limiter of outgoing emails."""
+
+    def setUp(self) -> None:
+        self.clock = FakeClock()
+        for name in ("monotonic", "sleep"):
+            patcher = mock.patch.object(ratelimit, name, getattr(self.clock, name))
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.addCleanup(ratelimit._buckets.clear)
+        cache.clear()
+
+    def test_burst_then_wait(self):
+        """A full bucket should allow a burst, then wait for the refill."""
+        bucket = LocalTokenBucket("ex.com", rate=2, capacity=3)
+
+        waits = [bucket.acquire() for _ in range(5)]
+
+        self.assertEqual(waits, [0.0, 0.0, 0.0, 0.5, 0.5])
+        self.assertEqual(self.clock.now, 1.0)
+        stats = bucket.stats()
+        self.assertEqual((stats["acquired"], stats["waits"]), (5, 2))
+        self.assertEqual((stats["total_wait"], stats["average_wait"]), (1.0, 0.5))
+        self.assertEqual(stats["level"], 0)
+
+    def test_bucket_refilled_up_to_capacity(self):
+        """Idle time should refill the bucket, but not above its capacity."""
+        bucket = LocalTokenBucket("ex.com", rate=10, capacity=3)
+        bucket.acquire(3)
+
+        self.clock.sleep(0.1)
+        self.assertAlmostEqual(bucket.level(), 1)
+        self.clock.sleep(60)
+        self.assertEqual(bucket.level(), 3)
+
+    def test_zero_rate_unlimited(self):
+        """A zero rate should disable the limit."""
+        bucket = LocalTokenBucket("ex.com", rate=0, capacity=1)
+
+        self.assertEqual(sum(bucket.acquire() for _ in range(10)), 0)
+
+    @override_settings(
+        EMAIL_RATE_LIMIT=5,
+        EMAIL_DOMAIN_RATE_LIMITS={"fast.com": 50},
+        EMAIL_RATE_LIMIT_REDIS_URL=None,
+    )
+    def test_rate_per_sender_domain(self):
+        """Every sender domain should have its own bucket and rate."""
+        fast = get_rate_limiter("hr@Fast.com")
+
+        self.assertIs(fast, get_rate_limiter("noreply@fast.com"))
+        self.assertEqual(fast.rate, 50)
+        self.assertEqual(get_rate_limiter("hr@slow.com").rate, 5)
+
+    @override_settings(EMAIL_RATE_LIMIT=5, EMAIL_RATE_LIMIT_REDIS_URL=None)
+    def test_settings_changed(self):
+        """A bucket made with other settings shouldn't be reused."""
+        slow = get_rate_limiter("hr@ex.com")
+
+        with self.settings(EMAIL_RATE_LIMIT=0):
+            self.assertEqual(get_rate_limiter("hr@ex.com").rate, 0)
+        self.assertIs(get_rate_limiter("hr@ex.com"), slow)
+
+    def test_abstract_bucket(self):
+        """A bucket without a way to refill shouldn't be created."""
+        with self.assertRaises(TypeError):
+            TokenBucket("ex.com", rate=1, capacity=1)
+
+    @override_settings(
+        DEFAULT_FROM_EMAIL="noreply@ex.com",
+        EMAIL_RATE_LIMIT=2,
+        EMAIL_DOMAIN_RATE_LIMITS={"fast.com": 0},
+        EMAIL_RATE_LIMIT_REDIS_URL=None,
+    )
+    def test_command(self):
+        """The command should show the stats of every configured domain."""
+        for _ in range(3):
+            get_rate_limiter().acquire()
+        out = StringIO()
+
+        call_command("email_rate_limits", stdout=out)
+
+        self.assertEqual(
+            out.getvalue().splitlines(),
+            [
+                "ex.com: 2/s, 17.0/20 tokens, 3 sent, 0 waits, 0.0s waited (0.000s on average)",
+                "fast.com: unlimited",
+            ],
+        )
+
+    def test_sender_throttled(self):
+        """Messages of a letter should be sent no faster than the limit."""
+        bucket = LocalTokenBucket("ex.com", rate=1, capacity=2)
+        with BatchEmailSender(batch_size=10, rate_limiter=bucket) as sender:
+            for i in range(4):
+                sender.send(EmailMessage(subject=str(i), to=["to@ex.com"]))
+
+        self.assertEqual(len(mail.outbox), 4)
+        self.assertEqual(sender.throttled, 2.0)
@@ -0,0 +1,109 @@
+import tracemalloc
+
+from apps.candidates.factories import CandidateFactory
+from apps.candidates.models import Candidate
+from apps.emails.factories import EmailLetterFactory
+from apps.emails.models import EmailLetter
+from apps.emails.tasks import send_emails
+from config.celery import app
+from django.core import mail
+from django.test import TestCase
+
+LARGE_LETTER_SIZE = 100_000
+# Peak memory allowed for streaming the recipients of the large letter, it takes about
+# 4 MB while materialising all of them takes an order of magnitude more.
+MAX_PEAK_MEMORY = 16 * 1024 * 1024
+
+
+class TestRecipients(TestCase):
+    """This class tests how recipients of a letter are selected."""
+
+    def setUp(self) -> None:
+        app.conf.task_always_eager = True
+        self.addCleanup(setattr, app.conf, "task_always_eager", False)
+
+    def test_duplicate_emails_sent_once(self):
+        """Recipients sharing an address should get a single letter."""
+        first = CandidateFactory(email="john@ex.com")
+        duplicate = CandidateFactory(email=" John@Ex.com")
+        other = CandidateFactory(email="jane@ex.com")
+        letter = EmailLetterFactory(
+            recipients=[duplicate, first, other, CandidateFactory(email="")]
+        )
+
+        send_emails.apply(kwargs={"email_letter": letter.id})
+
+        self.assertEqual(
+            sorted(message.to[0] for message in mail.outbox),
+            [
+                "jane@ex.com",
+                "john@ex.com",
+            ],
+        )
+        self.assertEqual(
+            set(letter.deliveries.values_list("candidate_id", flat=True)), {first.id, other.id}
+        )
+
+    def test_added_duplicate_not_sent(self):
+        """A duplicate added after the letter was sent shouldn't get it again."""
+        first = CandidateFactory(email="john@ex.com", id=1000)
+        letter = EmailLetterFactory(recipients=[first])
+        send_emails.apply(kwargs={"email_letter": letter.id})
+        letter.recipients.add(CandidateFactory(email="JOHN@ex.com", id=1))
+
+        send_emails.apply(kwargs={"email_letter": letter.id})
+
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(letter.deliveries.count(), 1)
+
+    def test_recipient_columns_deferred(self):
+        """Only the columns needed for rendering should be loaded."""
+        letter = EmailLetterFactory(recipients=[CandidateFactory(notes="Long notes")])
+        letter.start_delivery()
+
+        delivery = letter.pending_deliveries(0, 10**9).get()
+
+        self.assertEqual(
+            delivery.candidate.get_deferred_fields(),
+            {field.attname for field in Candidate._meta.concrete_fields}
+            - {"id", "name", "surname", "email", "date_of_birth"},
+        )
+
+    def test_memory_flat_for_large_letter(self):
+        """Peak memory of streaming recipients should stay flat for a large letter."""
+        Candidate.objects.bulk_create(
+            (
+                Candidate(
+                    name="Name",
+                    surname=f"Surname{i}",
+                    email=f"candidate{i}@ex.com",
+                    phone_number=f"+38066{i:07d}",
+                    notes="Some notes about the candidate. " * 30,
+                )
+                for i in range(LARGE_LETTER_SIZE)
+            ),
+            batch_size=5000,
+        )
+        letter = EmailLetterFactory()
+        letter.recipients.through.objects.bulk_create(
+            (
+                letter.recipients.through(emailletter_id=letter.id, candidate_id=candidate_id)
+                for candidate_id in Candidate.objects.values_list("id", flat=True).iterator()
+            ),
+            batch_size=5000,
+        )
+        letter = EmailLetter.objects.get(id=letter.id)
+
+        tracemalloc.start()
+        try:
+            letter.start_delivery()
+            streamed = sum(
+                1 for _ in letter.pending_deliveries(0, 10**9).iterator(chunk_size=1000)
+            )
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        self.assertEqual(streamed, LARGE_LETTER_SIZE)
+        self.assertEqual(letter.pending_count, LARGE_LETTER_SIZE)
+        self.assertLess(peak, MAX_PEAK_MEMORY)
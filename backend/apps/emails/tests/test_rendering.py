@@ -0,0 +1,75 @@
+from datetime import datetime, timedelta, timezone
+
+from apps.accounts.factories import ProfileFactory
+from apps.candidates.factories import CandidateFactory
+from apps.emails.factories import EmailTemplateFactory
+from apps.emails.rendering import RenderPlan
+from apps.events.factories import EventTypeFactory
+from apps.events.models import Event
+from django.template import Template
+from django.test import TestCase
+
+BODY = (
+    "<p>Dear {{candidate_fullname}},</p>"
+    "<p>{{event_title}} starts at {{event_st|date:'H:i d.m.Y'}} & takes {{event_duration}}.</p>"
+    "{% if candidate_age > 17 and event_title %}<p>Adult</p>{% else %}<p>Young</p>{% endif %}"
+    "<p>{{company|default:candidate_name}}</p>"
+    "{% for word in words %}{{word}}{% if forloop.first %}, {{candidate_surname}}{% endif %}"
+    "{% endfor %}{% with name=candidate_name %}<i>{{name|upper}}</i>{% endwith %}"
+    "<p>{{event_description|truncatewords:5}}</p>"
+)
+
+
+class TestPreparedTemplate(TestCase):
+    """This class tests rendering of a template prepared for a letter."""
+
+    def setUp(self) -> None:
+        start_time = datetime(2022, 10, 3, 10, 0, tzinfo=timezone.utc)
+        self.event = Event.objects.create(
+            title="Interview <b>",
+            description="Interview with the team lead, please prepare your questions.",
+            event_type=EventTypeFactory(),
+            owner=ProfileFactory(),
+            start_time=start_time,
+            end_time=start_time + timedelta(hours=1),
+        )
+        self.candidates = CandidateFactory.create_batch(3)
+
+    def assert_same_output(self, template, context):
+        """Prepared template should render exactly what the full render does."""
+        prepared = template.prepare(context, event=self.event)
+        for candidate in self.candidates:
+            self.assertEqual(
+                prepared.render_body(candidate),
+                template.render_body(context, candidate=candidate, event=self.event),
+            )
+            self.assertEqual(
+                prepared.render_subject(candidate),
+                template.render_subject(context, candidate=candidate, event=self.event),
+            )
+        return prepared
+
+    def test_prepared_output_identical(self):
+        """Candidate-dependent parts should be the only ones rendered per recipient."""
+        template = EmailTemplateFactory(body=BODY)
+        prepared = self.assert_same_output(template, {"words": ["a", "b"]})
+
+        self.assertTrue(prepared.body.is_partial)
+        self.assertIn("Interview &lt;b&gt; starts at 10:00 03.10.2022", prepared.body.parts[2])
+
+    def test_context_setting_tags_rendered_in_full(self):
+        """Templates with tags that change the context should fall back to a full render."""
+        template = EmailTemplateFactory(
+            body="{% cycle 'a' 'b' as row %}{{row}} {{candidate_name}} {% now 'Y' as year %}"
+            "{{year}}{% load static %}{% static 'x.css' %}",
+        )
+        prepared = self.assert_same_output(template, {})
+
+        self.assertFalse(prepared.body.is_partial)
+
+    def test_adjacent_static_nodes_merged(self):
+        """Static nodes should be rendered into a single string."""
+        plan = RenderPlan(Template("{{a}} and {{b}}, {{c}}!"), {"a": 1, "b": 2}, frozenset({"c"}))
+
+        self.assertEqual(plan.parts[0], "1 and 2, ")
+        self.assertEqual(plan.render({"c": 3}), "1 and 2, 3!")
@@ -0,0 +1,207 @@
+import smtplib
+from unittest import mock
+
+from apps.candidates.factories import CandidateFactory
+from apps.emails.delivery import BatchEmailSender
+from apps.emails.factories import EmailLetterFactory
+from apps.emails.models import EmailDelivery, EmailLetter
+from apps.emails.ratelimit import LocalTokenBucket
+from apps.emails.tasks import abort_email_letter, chunk_time_limit, send_emails, split_into_chunks
+from base.models import EmailStatus
+from billiard.exceptions import TimeLimitExceeded
+from config.celery import app
+from django.core import mail
+from django.core.mail import EmailMessage
+from django.core.mail.backends.locmem import EmailBackend
+from django.test import TestCase, override_settings
+
+
+class FlakyConnection:
+    """Email backend which drops the session once after the first message."""
+
+    def __init__(self):
+        self.opened = 0
+        self.delivered = []
+
+    def open(self):
+        self.opened += 1
+
+    def close(self):
+        pass
+
+    def send_messages(self, messages):
+        if len(self.delivered) == 1 and self.opened == 1:
+            raise smtplib.SMTPServerDisconnected("Connection unexpectedly closed")
+        self.delivered.extend(messages)
+        return len(messages)
+
+
+class RefusingBackend(EmailBackend):
+    """Email backend which refuses addresses starting with 'refused'."""
+
+    def send_messages(self, messages):
+        for message in messages:
+            if message.to[0].startswith("refused"):
+                raise smtplib.SMTPRecipientsRefused({message.to[0]: (550, b"No such user")})
+        return super().send_messages(messages)
+
+
+class TestSendEmails(TestCase):
+    """This class tests send_emails task and BatchEmailSender."""
+
+    def setUp(self) -> None:
+        app.conf.task_always_eager = True
+        self.addCleanup(setattr, app.conf, "task_always_eager", False)
+        self.candidates = CandidateFactory.create_batch(3)
+        self.letter = EmailLetterFactory(
+            recipients=self.candidates + [CandidateFactory(email="")],
+        )
+
+    def test_send_emails(self):
+        """Every candidate with an email should get a personal letter."""
+        send_emails.apply(kwargs={"email_letter": self.letter.id})
+
+        self.letter.refresh_from_db()
+        self.assertEqual(self.letter.status, EmailStatus.SENT)
+        self.assertEqual(len(mail.outbox), 3)
+        self.assertEqual(
+            sorted(message.to[0] for message in mail.outbox),
+            sorted(candidate.email for candidate in self.candidates),
+        )
+        message = mail.outbox[0]
+        self.assertIn("Dear", message.alternatives[0][0])
+        self.assertNotIn("<p>", message.body)
+
+    @override_settings(EMAIL_CHUNK_SIZE=2)
+    def test_send_emails_in_chunks(self):
+        """Delivery results of all chunks should roll up into the letter counters."""
+        send_emails.apply(kwargs={"email_letter": self.letter.id})
+
+        self.letter.refresh_from_db()
+        self.assertEqual(len(mail.outbox), 3)
+        self.assertEqual(self.letter.status, EmailStatus.SENT)
+        self.assertEqual(self.letter.sent_count, 3)
+        self.assertEqual(self.letter.failed_count, 0)
+        self.assertEqual(self.letter.pending_count, 0)
+
+    @override_settings(EMAIL_CHUNK_SIZE=2, CELERY_TASK_TIME_LIMIT=300)
+    def test_chunk_time_limit(self):
+        """Throttled chunks should get enough time to send the whole letter."""
+        # 8 chunks of 500 recipients sharing 10 messages per second take 400 seconds.
+        self.assertEqual(chunk_time_limit(8 * 500, rate=10), 300 + 400)
+        self.assertEqual(chunk_time_limit(8 * 500, rate=0), 300)
+
+        bucket = LocalTokenBucket("ex.com", rate=0.01, capacity=1)
+        with mock.patch("apps.emails.tasks.get_rate_limiter", return_value=bucket):
+            with mock.patch("apps.emails.tasks.chord") as chord:
+                send_emails.apply(kwargs={"email_letter": self.letter.id})
+
+        chunks = list(chord.call_args.args[0])
+        self.assertEqual(len(chunks), 2)
+        self.assertEqual({chunk.options["time_limit"] for chunk in chunks}, {300 + 300})
+
+    @override_settings(EMAIL_CHUNK_SIZE=2)
+    def test_send_emails_failed(self):
+        """A letter should be marked as failed if some chunk couldn't be delivered."""
+        with self.settings(EMAIL_BACKEND="django.core.mail.backends.smtp.EmailBackend"):
+            send_emails.apply(kwargs={"email_letter": self.letter.id})
+
+        self.letter.refresh_from_db()
+        self.assertEqual(self.letter.status, EmailStatus.FAILED)
+        self.assertEqual(self.letter.failed_count, 3)
+        self.assertEqual(self.letter.pending_count, 0)
+
+    @override_settings(EMAIL_CHUNK_SIZE=2)
+    def test_send_emails_unexpected_error(self):
+        """A chunk failing with a non-SMTP error should fail its deliveries, not the letter."""
+        build_message = EmailLetter.build_message
+
+        def broken_build_message(letter, candidate, **kwargs):
+            if candidate == self.candidates[2]:
+                raise ValueError("Broken template")
+            return build_message(letter, candidate=candidate, **kwargs)
+
+        with mock.patch.object(EmailLetter, "build_message", broken_build_message):
+            send_emails.apply(kwargs={"email_letter": self.letter.id})
+
+        self.letter.refresh_from_db()
+        delivery = self.letter.deliveries.get(candidate=self.candidates[2])
+        self.assertEqual(self.letter.status, EmailStatus.SENT)
+        self.assertEqual((self.letter.sent_count, self.letter.failed_count), (2, 1))
+        self.assertEqual(delivery.status, EmailStatus.FAILED)
+        self.assertEqual(delivery.last_error, "Broken template")
+
+    def test_abort_email_letter(self):
+        """A failed chord should fail the pending deliveries and finish the letter."""
+        self.letter.start_delivery()
+
+        abort_email_letter(None, TimeLimitExceeded(300), None, email_letter=self.letter.id)
+
+        self.letter.refresh_from_db()
+        self.assertEqual(self.letter.status, EmailStatus.FAILED)
+        self.assertEqual((self.letter.failed_count, self.letter.pending_count), (3, 0))
+        self.assertIsNotNone(self.letter.sent_at)
+
+    def test_send_emails_resumed(self):
+        """A restarted letter should only be sent to recipients who haven't got it."""
+        self.letter.start_delivery()
+        delivered = self.letter.deliveries.get(candidate=self.candidates[0])
+        EmailDelivery.objects.mark_sent([delivered.id])
+
+        send_emails.apply(kwargs={"email_letter": self.letter.id})
+
+        self.assertEqual(len(mail.outbox), 2)
+        self.assertNotIn(self.candidates[0].email, [message.to[0] for message in mail.outbox])
+        self.assertEqual(self.letter.delivery_stats()["sent"], 3)
+        self.assertEqual(self.letter.delivery_stats()["attempts"], 3)
+
+    @override_settings(EMAIL_BACKEND="apps.emails.tests.test_send_emails.RefusingBackend")
+    def test_send_emails_refused_recipient(self):
+        """A refused recipient should be recorded without stopping the delivery."""
+        refused = CandidateFactory(email="refused@ex.com")
+        self.letter.recipients.add(refused)
+
+        send_emails.apply(kwargs={"email_letter": self.letter.id})
+
+        self.letter.refresh_from_db()
+        delivery = self.letter.deliveries.get(candidate=refused)
+        self.assertEqual(len(mail.outbox), 3)
+        self.assertEqual(self.letter.status, EmailStatus.SENT)
+        self.assertEqual((self.letter.sent_count, self.letter.failed_count), (3, 1))
+        self.assertEqual(delivery.status, EmailStatus.FAILED)
+        self.assertEqual(delivery.attempts, 1)
+        self.assertIn("No such user", delivery.last_error)
+
+    def test_split_into_chunks(self):
+        """Chunks should be described by their first and last id and size."""
+        self.assertEqual(split_into_chunks([1, 3, 4, 8, 9], 2), [(1, 3, 2), (4, 8, 2), (9, 9, 1)])
+        self.assertEqual(split_into_chunks([], 2), [])
+
+    def test_send_emails_per_recipient(self):
+        """Per-recipient delivery should produce the same messages."""
+        send_emails.apply(kwargs={"email_letter": self.letter.id, "batched": False})
+
+        self.assertEqual(len(mail.outbox), 3)
+
+    def test_sender_flushes_in_groups(self):
+        """Messages should be flushed once a group is full and on exit."""
+        with BatchEmailSender(batch_size=2) as sender:
+            for i in range(3):
+                sender.send(EmailMessage(subject=str(i), to=["to@ex.com"]))
+                self.assertEqual(len(mail.outbox), 2 if i else 0)
+
+        self.assertEqual(len(mail.outbox), 3)
+        self.assertEqual(sender.sent, 3)
+        self.assertGreater(sender.rate, 0)
+
+    def test_sender_reconnects(self):
+        """A dropped session should be reopened without resending delivered messages."""
+        connection = FlakyConnection()
+        messages = [EmailMessage(subject=str(i), to=["to@ex.com"]) for i in range(3)]
+        with BatchEmailSender(batch_size=10, reuse_connection=True, connection=connection) as s:
+            for message in messages:
+                s.send(message)
+
+        self.assertEqual(connection.opened, 2)
+        self.assertEqual(connection.delivered, messages)
+        self.assertEqual(s.sent, 3)
@@ -0,0 +1,44 @@
+from apps.candidates.factories import CandidateFactory
+from apps.emails.cache import CompiledTemplateCache, compiled_templates
+from apps.emails.factories import EmailTemplateFactory
+from django.test import TestCase
+
+
+class TestCompiledTemplateCache(TestCase):
+    """This class tests the cache of compiled EmailTemplates."""
+
+    def setUp(self) -> None:
+        compiled_templates.clear()
+        self.template = EmailTemplateFactory()
+        self.candidate = CandidateFactory()
+
+    def test_template_compiled_once(self):
+        """Rendering a template for many recipients should compile it once."""
+        for _ in range(5):
+            body = self.template.render_body(context={}, candidate=self.candidate)
+
+        self.assertIn(self.candidate.full_name, body)
+        self.assertEqual(compiled_templates.misses, 1)
+        self.assertEqual(compiled_templates.hits, 4)
+
+    def test_template_edit_invalidates(self):
+        """An edited template should never be rendered from a stale entry."""
+        self.template.render_body(context={})
+        self.template.body = "<p>Edited</p>"
+        self.template.save()
+
+        self.assertEqual(len(compiled_templates), 0)
+        self.assertEqual(self.template.render_body(context={}), "<p>Edited</p>")
+
+    def test_least_recently_used_evicted(self):
+        """The cache should keep at most `maxsize` entries."""
+        cache = CompiledTemplateCache(maxsize=2)
+        templates = EmailTemplateFactory.create_batch(3)
+        for template in templates:
+            cache.get(template, "body")
+        cache.get(templates[1], "body")
+
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.stats()["hits"], 1)
+        cache.get(templates[0], "body")
+        self.assertEqual(cache.stats()["misses"], 4)
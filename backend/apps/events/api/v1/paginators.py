@@ -1,6 +1,6 @@
-from rest_framework.pagination import PageNumberPagination
+from base.pagination import KeysetPagination
 
 
-class CustomEventPagination(PageNumberPagination):
+class CustomEventPagination(KeysetPagination):
     page_size = 10
-    page_size_query_param = "page_size"
+    max_page_size = 100
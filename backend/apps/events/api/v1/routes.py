@@ -1,4 +1,8 @@
-from apps.events.api.v1.views import ListCreateEventAPIView, RetrieveUpdateDestroyEventView
+from apps.events.api.v1.views import (
+    EventTypeListAPIView,
+    ListCreateEventAPIView,
+    RetrieveUpdateDestroyEventView,
+)
 from django.urls import include, path
 from rest_framework import routers
 
@@ -6,6 +10,7 @@ router = routers.DefaultRouter()
 router.register(r"", ListCreateEventAPIView, basename="events")
 
 urlpatterns = [
+    path("types/", EventTypeListAPIView.as_view(), name="event-type-list"),
     path("", include(router.urls)),
     path(r"<int:pk>/", RetrieveUpdateDestroyEventView.as_view(), name="event-rud-view"),
 ]
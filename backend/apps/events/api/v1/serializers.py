@@ -1,3 +1,4 @@
+from apps.accounts.api.v1.serializers import AvatarField
 from apps.accounts.models import Profile
 from apps.events.models import Event, EventType
 from rest_framework import serializers
@@ -6,6 +7,8 @@ from rest_framework import serializers
 class EventOwnerSerializer(serializers.ModelSerializer):
     """This is a serializer class for the Profile model."""
 
+    avatar_image = AvatarField(read_only=True)
+
     class Meta:
         model = Profile
         fields = (
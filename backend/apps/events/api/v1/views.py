@@ -1,13 +1,19 @@
 from apps.events.api.v1.filters import EventFilter
 from apps.events.api.v1.paginators import CustomEventPagination
-from apps.events.api.v1.serializers import EventListSerializer, EventRUDSerializer
-from apps.events.models import Event
+from apps.events.api.v1.serializers import (
+    EventListSerializer,
+    EventRUDSerializer,
+    EventTypeSerializer,
+)
+from apps.events.models import Event, EventType
+from base.cache import CachedResponseMixin
+from base.export import StreamingExportMixin
 from django.db.models import Case, Count, When
 from django.db.utils import IntegrityError
 from django.utils import timezone
 from django_filters import rest_framework as filters
 from rest_framework import status
-from rest_framework.generics import GenericAPIView
+from rest_framework.generics import GenericAPIView, ListAPIView
 from rest_framework.mixins import (
     CreateModelMixin,
     DestroyModelMixin,
@@ -20,7 +26,9 @@ from rest_framework.response import Response
 from rest_framework.viewsets import GenericViewSet
 
 
-class ListCreateEventAPIView(ListModelMixin, CreateModelMixin, GenericViewSet):
+class ListCreateEventAPIView(
+    StreamingExportMixin, ListModelMixin, CreateModelMixin, GenericViewSet
+):
     """
     LIST / CREATE view for the Event model.
 
@@ -32,6 +40,9 @@ class ListCreateEventAPIView(ListModelMixin, CreateModelMixin, GenericViewSet):
     post:
     Create a new Event instance.
 
+    get export/:
+    Stream filtered Events as a CSV or JSON Lines file.
+
     """
 
     serializer_class = EventListSerializer
@@ -39,6 +50,23 @@ class ListCreateEventAPIView(ListModelMixin, CreateModelMixin, GenericViewSet):
     permission_classes = (IsAuthenticated,)
     filter_backends = (filters.DjangoFilterBackend,)
     filterset_class = EventFilter
+    export_name = "events"
+    export_fields = {
+        "id": "id",
+        "title": "title",
+        "description": "description",
+        "event_type": "event_type__title",
+        "priority": "priority",
+        "owner": "owner__email",
+        "start_time": "start_time",
+        "end_time": "end_time",
+        "duration": "duration",
+        "status": "status",
+        "visitors": "visitors",
+        "is_future": "is_future",
+        "created_at": "created_at",
+        "changed_at": "changed_at",
+    }
 
     def get_queryset(self):
         current_time = timezone.now()
@@ -116,3 +144,20 @@ class RetrieveUpdateDestroyEventView(
     def delete(self, request, *args, **kwargs):
         """DELETE method of the API."""
         return self.destroy(request, *args, **kwargs)
+
+
+class EventTypeListAPIView(CachedResponseMixin, ListAPIView):
+    """
+    LIST view for the EventType model.
+
+    API
+    -----------
+    get:
+    Return a list of Event Types, cached until any of them changes.
+
+    """
+
+    serializer_class = EventTypeSerializer
+    permission_classes = (IsAuthenticated,)
+    queryset = EventType.objects.order_by("title")
+    cache_models = (EventType,)
@@ -4,3 +4,10 @@ from django.apps import AppConfig
 class EventsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "apps.events"
+
+    def ready(self):
+        from base.cache import watch_model
+
+        from .models import EventType
+
+        watch_model(EventType)
@@ -0,0 +1,31 @@
+from apps.accounts.factories import UserFactory
+from apps.events.models import EventType
+from rest_framework import status
+from rest_framework.reverse import reverse
+from rest_framework.test import APITestCase
+
+
+class EventTypeListTestCase(APITestCase):
+    """Class for testing event type list api endpoint."""
+
+    def setUp(self) -> None:
+        EventType.objects.create(title="Meeting")
+        EventType.objects.create(title="Interview")
+        self.url = reverse("events:event-type-list")
+        self.client.force_authenticate(user=UserFactory())
+
+    def test_event_types_cached(self):
+        """Event types should be listed from the cache until any of them changes."""
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [item["title"] for item in response.data["results"]], ["Interview", "Meeting"]
+        )
+
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(self.url)["X-Cache"], "HIT")
+
+        EventType.objects.filter(title="Meeting").first().delete()
+        response = self.client.get(self.url)
+        self.assertEqual(response["X-Cache"], "MISS")
+        self.assertEqual([item["title"] for item in response.data["results"]], ["Interview"])
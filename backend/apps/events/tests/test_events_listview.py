@@ -1,3 +1,5 @@
+import json
+
 from apps.accounts.factories import ProfileFactory
 from apps.events.factories import EventFactory, EventTypeFactory
 from django.test import TestCase
@@ -25,7 +27,7 @@ class TestEventsListView(TestCase):
 
     def test_get_authorized(self):
         """Authorized user should be able to get Events."""
-        response = self.client.get(reverse("events:events-list"))
+        response = self.client.get(reverse("events:events-list"), {"count": "true"})
 
         self.assertEqual(response.data.get("count"), 4)
         self.assertEqual(response.status_code, 200)
@@ -77,3 +79,15 @@ class TestEventsListView(TestCase):
         )
 
         self.assertEqual(response.status_code, 400)
+
+    def test_export(self):
+        """Filtered Events should be exported as JSON Lines with annotated columns."""
+        response = self.client.get(
+            reverse("events:events-export"),
+            {"file_format": "jsonl", "fields": "id,event_type,visitors", "min_visitors": 0},
+        )
+
+        rows = [json.loads(line) for line in b"".join(response.streaming_content).splitlines()]
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(rows), 4)
+        self.assertEqual(set(rows[0]), {"id", "event_type", "visitors"})
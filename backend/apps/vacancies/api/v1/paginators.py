@@ -0,0 +1,6 @@
+from base.pagination import KeysetPagination
+
+
+class VacancyPagination(KeysetPagination):
+    page_size = 20
+    max_page_size = 100
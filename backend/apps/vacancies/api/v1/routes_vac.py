@@ -3,5 +3,6 @@ from django.urls import path
 
 urlpatterns = [
     path("", views.VacancyListViewSet.as_view(), name="vacancies"),
-    path("<int:pk>", views.VacancyViewSet.as_view(), name="vacancy")
+    path("export/", views.VacancyExportAPIView.as_view(), name="vacancies-export"),
+    path("<int:pk>", views.VacancyViewSet.as_view(), name="vacancy"),
 ]
@@ -1,19 +1,29 @@
+from apps.vacancies.api.v1.paginators import VacancyPagination
 from apps.vacancies.api.v1.serializers import CurrencySerializer, VacancySerializer
 from apps.vacancies.models import Currency, Vacancy
+from base.cache import CachedResponseMixin
+from base.export import StreamingExportMixin
+from django.contrib.auth import get_user_model
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.filters import OrderingFilter, SearchFilter
-from rest_framework.generics import ListCreateAPIView, RetrieveUpdateDestroyAPIView
+from rest_framework.generics import GenericAPIView, ListCreateAPIView, RetrieveUpdateDestroyAPIView
 from rest_framework.permissions import IsAuthenticated, IsAuthenticatedOrReadOnly
 from rest_framework.renderers import JSONRenderer
+from taggit.models import Tag
 
+# Models serialized by vacancy views, responses are cached until any of them changes.
+VACANCY_CACHE_MODELS = (Vacancy, Tag, get_user_model())
 
-class VacancyListViewSet(ListCreateAPIView):
+
+class VacancyListViewSet(CachedResponseMixin, ListCreateAPIView):
     """View for create and list views Vacancy endpoint."""
 
     queryset = Vacancy.objects.all()
     serializer_class = VacancySerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
     renderer_classes = [JSONRenderer]
+    pagination_class = VacancyPagination
+    cache_models = VACANCY_CACHE_MODELS
 
     filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
     filterset_fields = (
@@ -31,31 +41,68 @@ class VacancyListViewSet(ListCreateAPIView):
         serializer.save(author=self.request.user, contact_person=self.request.user)
 
 
-class VacancyViewSet(RetrieveUpdateDestroyAPIView):
+class VacancyExportAPIView(StreamingExportMixin, GenericAPIView):
+    """View for streaming filtered vacancies as a CSV or JSON Lines file."""
+
+    queryset = Vacancy.objects.all()
+    permission_classes = [IsAuthenticated]
+    filter_backends = VacancyListViewSet.filter_backends
+    filterset_fields = VacancyListViewSet.filterset_fields
+    search_fields = VacancyListViewSet.search_fields
+    ordering_fields = "__all__"
+    export_name = "vacancies"
+    export_fields = {
+        "id": "id",
+        "title": "title",
+        "type_of_employment": "type_of_employment",
+        "location": "location",
+        "english_level": "english_level",
+        "min_experience": "min_experience",
+        "start_date": "start_date",
+        "end_date": "end_date",
+        "description": "description",
+        "priority": "priority",
+        "salary_min": "salary_min",
+        "salary_max": "salary_max",
+        "salary_currency": "salary_currency__currency_code",
+        "author": "author__email",
+        "contact_person": "contact_person__email",
+        "is_active": "is_active",
+        "is_salary_show": "is_salary_show",
+    }
+
+    def get(self, request, *args, **kwargs):
+        return self.export(request, *args, **kwargs)
+
+
+class VacancyViewSet(CachedResponseMixin, RetrieveUpdateDestroyAPIView):
     """View for create, update, delete and view single Vacancy endpoint."""
 
     queryset = Vacancy.objects.all()
     serializer_class = VacancySerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
     renderer_classes = [JSONRenderer]
+    cache_models = VACANCY_CACHE_MODELS
 
     def perform_update(self, serializer):
         serializer.save(author=self.request.user)
 
 
-class CurrencyListViewSet(ListCreateAPIView):
+class CurrencyListViewSet(CachedResponseMixin, ListCreateAPIView):
     """View for create and list views Currency endpoint."""
 
     queryset = Currency.objects.all()
     serializer_class = CurrencySerializer
     permission_classes = [IsAuthenticated]
     renderer_classes = [JSONRenderer]
+    cache_models = (Currency,)
 
 
-class CurrencyViewSet(RetrieveUpdateDestroyAPIView):
+class CurrencyViewSet(CachedResponseMixin, RetrieveUpdateDestroyAPIView):
     """View for create, update, delete and view single Currency endpoint."""
 
     queryset = Currency.objects.all()
     serializer_class = CurrencySerializer
     permission_classes = [IsAuthenticated]
     renderer_classes = [JSONRenderer]
+    cache_models = (Currency,)
@@ -4,3 +4,15 @@ from django.apps import AppConfig
 class VacanciesConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "apps.vacancies"
+
+    def ready(self):
+        from base.cache import watch_model
+        from django.contrib.auth import get_user_model
+        from taggit.models import Tag
+
+        from .models import Currency, Vacancy
+
+        watch_model(Vacancy)
+        watch_model(Currency)
+        watch_model(Tag)
+        watch_model(get_user_model(), fields=("email",))
@@ -0,0 +1,21 @@
+from importlib import import_module
+
+from base.cache import response_cache_stats
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = (
+        "Show numbers of hits and misses and the hit ratio of every view with cached "
+        "responses (vacancies, currencies and event types), counted by all processes."
+    )
+
+    def handle(self, *args, **options):
+        import_module(settings.ROOT_URLCONF)  # cached views are registered on import
+        for name, stats in sorted(response_cache_stats().items()):
+            self.stdout.write(
+                "{name}: {hits} hits, {misses} misses, {ratio:.1%} hit ratio".format(
+                    name=name, ratio=stats["hit_ratio"], **stats
+                )
+            )
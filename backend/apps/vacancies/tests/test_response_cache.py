@@ -0,0 +1,129 @@
+from datetime import date, timedelta
+from io import StringIO
+
+from apps.vacancies.models import Currency, Vacancy
+from base.cache import response_cache_stats
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import update_last_login
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import override_settings
+from rest_framework.reverse import reverse
+from rest_framework.test import APITestCase
+
+UserModel = get_user_model()
+
+
+class ResponseCacheTestCase(APITestCase):
+    """Class for testing cached responses of vacancy and currency endpoints."""
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.user = UserModel.objects.create(email="author@ex.com", is_active=True)
+        self.currency = Currency.objects.create(currency_title="Dollar", currency_code="USD")
+        self.vacancy = Vacancy.objects.create(
+            title="Developer",
+            type_of_employment="FT",
+            location="remote",
+            english_level="B1",
+            min_experience="2Y",
+            end_date=date.today() + timedelta(days=14),
+            start_date=date.today(),
+            description="Description",
+            priority="Priority",
+            salary_max=2000,
+            salary_min=1500,
+            salary_currency=self.currency,
+            author=self.user,
+            contact_person=self.user,
+        )
+        self.vacancy.keywords.add("python")
+        self.client.force_authenticate(user=self.user)
+
+    def test_cached_until_changed(self):
+        """A cached response should be served without queries until the model changes."""
+        url = reverse("currencies")
+        self.assertEqual(self.client.get(url)["X-Cache"], "MISS")
+
+        with self.assertNumQueries(0):
+            response = self.client.get(url)
+        self.assertEqual(response["X-Cache"], "HIT")
+        self.assertEqual(len(response.data["results"]), 1)
+
+        Currency.objects.create(currency_title="Euro", currency_code="EUR")
+        response = self.client.get(url)
+        self.assertEqual(response["X-Cache"], "MISS")
+        self.assertEqual(len(response.data["results"]), 2)
+
+    def test_evicted_version_not_reused(self):
+        """A response cached before an evicted version was bumped shouldn't be served."""
+        url = reverse("currencies")
+        version_key = "response-cache-version:vacancies.currency"
+        cache.delete(version_key)
+        Currency.objects.create(currency_title="Euro", currency_code="EUR")
+        self.client.get(url)
+        cache.delete(version_key)  # evicted
+
+        Currency.objects.create(currency_title="Pound", currency_code="GBP")
+        response = self.client.get(url)
+
+        self.assertEqual(response["X-Cache"], "MISS")
+        self.assertEqual(len(response.data["results"]), 3)
+
+    def test_permissions_checked_first(self):
+        """A cached response shouldn't be served to users who can't see it."""
+        url = reverse("currency", args=(self.currency.id,))
+        self.client.get(url)
+
+        self.client.force_authenticate(user=None)
+        self.assertEqual(self.client.get(url).status_code, 401)
+
+    def test_related_models_invalidate(self):
+        """Changes of tags and author emails should invalidate vacancy responses."""
+        url = reverse("vacancy", args=(self.vacancy.id,))
+        self.client.get(url)
+
+        update_last_login(None, self.user)  # the email isn't changed
+        self.assertEqual(self.client.get(url)["X-Cache"], "HIT")
+
+        self.vacancy.keywords.add("django")
+        response = self.client.get(url)
+        self.assertEqual(response["X-Cache"], "MISS")
+        self.assertEqual(sorted(response.data["keywords"]), ["django", "python"])
+
+        self.user.email = "new@ex.com"
+        self.user.save()
+        response = self.client.get(url)
+        self.assertEqual(response["X-Cache"], "MISS")
+        self.assertEqual(response.data["author_data"], {"email": "new@ex.com"})
+
+    def test_query_string_varies(self):
+        """Requests with different query strings should be cached separately."""
+        url = reverse("vacancies")
+        self.client.get(url)
+
+        self.assertEqual(self.client.get(url, {"location": "office"})["X-Cache"], "MISS")
+        self.assertEqual(self.client.get(url, {"location": "office"}).data["results"], [])
+
+    @override_settings(ALLOWED_HOSTS=["testserver", "api.example.com"])
+    def test_host_and_scheme_vary(self):
+        """Pages linking by absolute URLs shouldn't be served to other hosts or schemes."""
+        url = reverse("vacancies")
+        self.client.get(url)
+
+        for extra in ({"HTTP_HOST": "api.example.com"}, {"secure": True}):
+            self.assertEqual(self.client.get(url, **extra)["X-Cache"], "MISS")
+            self.assertEqual(self.client.get(url, **extra)["X-Cache"], "HIT")
+
+    def test_stats(self):
+        """Hits and misses should be counted per view."""
+        for _ in range(4):
+            self.client.get(reverse("currencies"))
+
+        stats = response_cache_stats()
+        self.assertEqual(stats["CurrencyListViewSet"], {"hits": 3, "misses": 1, "hit_ratio": 0.75})
+        self.assertEqual(stats["VacancyListViewSet"]["hit_ratio"], 0.0)
+        out = StringIO()
+        call_command("response_cache_stats", stdout=out)
+        self.assertIn("CurrencyListViewSet: 3 hits, 1 misses, 75.0% hit ratio", out.getvalue())
@@ -0,0 +1,53 @@
+import csv
+import io
+from datetime import date, timedelta
+
+from apps.vacancies.models import Currency, Vacancy
+from django.contrib.auth import get_user_model
+from rest_framework.reverse import reverse
+from rest_framework.test import APITestCase
+
+UserModel = get_user_model()
+
+
+class VacancyExportTestCase(APITestCase):
+    """Class for testing the streaming export of vacancies."""
+
+    def setUp(self):
+        self.user = UserModel.objects.create(email="author@ex.com", is_active=True)
+        currency = Currency.objects.create(currency_title="Dollar", currency_code="USD")
+        for title, location in (("Developer", "remote"), ("Designer", "office")):
+            Vacancy.objects.create(
+                title=title,
+                type_of_employment="FT",
+                location=location,
+                english_level="B1",
+                min_experience="2Y",
+                end_date=date.today() + timedelta(days=14),
+                start_date=date.today(),
+                description="Description",
+                priority="Priority",
+                salary_max=2000,
+                salary_min=1500,
+                salary_currency=currency,
+                author=self.user,
+                contact_person=self.user,
+            )
+        self.url = reverse("vacancies-export")
+
+    def test_export_requires_authentication(self):
+        """Anonymous users shouldn't be able to export vacancies."""
+        self.assertEqual(self.client.get(self.url).status_code, 401)
+
+    def test_export_filtered(self):
+        """Vacancies should be exported with related columns and list filters applied."""
+        self.client.force_authenticate(user=self.user)
+
+        response = self.client.get(
+            self.url, {"location": "remote", "fields": "title,salary_currency,author"}
+        )
+
+        rows = list(csv.reader(io.StringIO(b"".join(response.streaming_content).decode())))
+        self.assertEqual(
+            rows, [["title", "salary_currency", "author"], ["Developer", "USD", "author@ex.com"]]
+        )
@@ -0,0 +1,152 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from rest_framework.response import Response
+
+VERSION_KEY = "response-cache-version:{}"
+STATS_KEY = "response-cache-stats:{}:{}"
+# Names of all views with cached responses, see response_cache_stats().
+cached_views = set()
+
+
+def increment(key: str, delta: int = 1):
+    """Increment the counter shared by all processes, starting from zero."""
+    cache.add(key, 0, timeout=None)
+    try:
+        cache.incr(key, delta)
+    except ValueError:  # evicted in between
+        cache.set(key, delta, timeout=None)
+
+
+def get_versions(keys: list[str]) -> dict:
+    """
+    Return versions of cache entries stored under `keys`. A missing version (never set or
+    evicted) is started from the current time rather than zero, so a version is never
+    reused and entries cached under an earlier one can't be served again.
+    """
+    versions = cache.get_many(keys)
+    missing = [key for key in keys if key not in versions]
+    for key in missing:
+        cache.add(key, time.time_ns(), timeout=None)
+    if missing:
+        versions.update(cache.get_many(missing))
+    return versions
+
+
+def bump_version(key: str):
+    """Move entries versioned by the key to a new version which has never been used."""
+    cache.set(key, time.time_ns(), timeout=None)
+
+
+def invalidate_model(model):
+    """Drop cached responses of all views that depend on the model."""
+    bump_version(VERSION_KEY.format(model._meta.label_lower))
+
+
+def watch_model(model, fields: tuple = None):
+    """
+    Invalidate cached responses that depend on the model whenever its rows are saved or
+    deleted, or its many-to-many relations change. If `fields` are given, saves which
+    update other fields only (e.g. `last_login` of a user) are ignored. It should be
+    called from AppConfig.ready(), so both web and Celery processes invalidate.
+    """
+    label = model._meta.label_lower
+
+    def on_save(sender, update_fields=None, **kwargs):
+        if fields and update_fields and not set(update_fields) & set(fields):
+            return
+        invalidate_model(model)
+
+    def on_delete(sender, **kwargs):
+        invalidate_model(model)
+
+    def on_m2m_change(sender, action, **kwargs):
+        if action.startswith("post_"):
+            invalidate_model(model)
+
+    uid = f"response-cache:{label}"
+    post_save.connect(on_save, sender=model, weak=False, dispatch_uid=uid)
+    post_delete.connect(on_delete, sender=model, weak=False, dispatch_uid=uid)
+    for field in model._meta.many_to_many:
+        through = field.remote_field.through
+        m2m_changed.connect(on_m2m_change, sender=through, weak=False, dispatch_uid=uid)
+
+
+def response_cache_stats() -> dict:
+    """Return numbers of hits and misses and the hit ratio of every cached view."""
+    keys = {
+        STATS_KEY.format(name, outcome): (name, outcome)
+        for name in cached_views
+        for outcome in ("hits", "misses")
+    }
+    stats = {name: {"hits": 0, "misses": 0} for name in cached_views}
+    for key, value in cache.get_many(keys).items():
+        name, outcome = keys[key]
+        stats[name][outcome] = value
+    for counters in stats.values():
+        requests = counters["hits"] + counters["misses"]
+        counters["hit_ratio"] = counters["hits"] / requests if requests else 0.0
+    return stats
+
+
+class CachedResponseMixin:
+    """
+    This mixin caches successful responses of `list` and `retrieve` actions in the
+    shared cache. Permissions are checked before the cache is looked up, so cached
+    views must return the same data to everyone who is allowed to see it.
+
+    The key of a response consists of the view name, the absolute URL of the request
+    (cached pages link to other pages by absolute URLs, which depend on the scheme and
+    host) and the versions of all `cache_models`. A version is bumped on every change of the
+    model (see watch_model()), so a change makes all cached responses that depend on
+    it unreachable at once. Responses carry the `X-Cache: HIT` or `X-Cache: MISS`
+    header and hits and misses are counted per view (see response_cache_stats() and the
+    response_cache_stats command).
+
+    Attributes
+    --------------
+    cache_models : tuple
+        models the response depends on, each of them should be watched
+    cache_timeout : int
+        seconds responses are kept for, defaults to settings.RESPONSE_CACHE_TIMEOUT
+
+    """
+
+    cache_models = ()
+    cache_timeout = None
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cached_views.add(cls.__name__)
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(super().retrieve, request, *args, **kwargs)
+
+    def cached_response(self, action, request, *args, **kwargs) -> Response:
+        """Return the cached response of the request, call the action on a miss."""
+        name = type(self).__name__
+        version_keys = [VERSION_KEY.format(model._meta.label_lower) for model in self.cache_models]
+        versions = get_versions(version_keys)
+        url_hash = hashlib.md5(request.build_absolute_uri().encode()).hexdigest()
+        key = "response-cache:{}:{}:{}".format(
+            name, ".".join(str(versions.get(key)) for key in version_keys), url_hash
+        )
+
+        data = cache.get(key)
+        if data is not None:
+            increment(STATS_KEY.format(name, "hits"))
+            return Response(data, headers={"X-Cache": "HIT"})
+
+        response = action(request, *args, **kwargs)
+        if response.status_code == 200:
+            timeout = self.cache_timeout or settings.RESPONSE_CACHE_TIMEOUT
+            cache.set(key, response.data, timeout)
+        increment(STATS_KEY.format(name, "misses"))
+        response["X-Cache"] = "MISS"
+        return response
@@ -0,0 +1,253 @@
+import json
+import logging
+from base64 import b64decode, b64encode
+from binascii import Error as Base64Error
+
+from django.db import connections
+from django.db.models import F, Model, Q, QuerySet
+from django.db.models.expressions import OrderBy
+from django.utils.translation import gettext_lazy as _
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+TRUE_VALUES = ("1", "true", "yes")
+
+logger = logging.getLogger(__name__)
+
+
+def ordering_keys(queryset: QuerySet) -> list[tuple[str, bool]]:
+    """
+    Return (field, descending) pairs of the queryset ordering (or the model default
+    ordering), ending with the primary key, so that every row has a unique position.
+    Positions can't be taken from expressions (e.g. Lower("name")) or a random ordering,
+    such querysets are paginated in the order of the primary key instead.
+    """
+    ordering = queryset.query.order_by or queryset.query.get_meta().ordering
+    keys = []
+    for item in ordering:
+        if isinstance(item, OrderBy) and isinstance(item.expression, F):
+            keys.append((item.expression.name, item.descending))
+        elif isinstance(item, str) and item != "?":
+            keys.append((item.lstrip("-"), item.startswith("-")))
+        else:
+            logger.warning(
+                "Keyset pagination can't order %s by %r, it is ordered by the primary key.",
+                queryset.model._meta.label,
+                item,
+            )
+            return [("pk", False)]
+
+    pk_names = ("pk", queryset.model._meta.pk.name)
+    if not any(field in pk_names for field, _ in keys):
+        keys.append(("pk", keys[0][1] if keys else False))
+    return keys
+
+
+def order_by_keys(queryset: QuerySet, keys: list[tuple[str, bool]]) -> QuerySet:
+    """
+    Order the queryset by the keys. NULLs are greater than any value on all databases,
+    like PostgreSQL does by default, so the ordering can be served by plain indexes.
+    """
+    return queryset.order_by(
+        *(
+            F(field).desc(nulls_first=True) if descending else F(field).asc(nulls_last=True)
+            for field, descending in keys
+        )
+    )
+
+
+def keyset_condition(keys: list[tuple[str, bool]], values: list) -> Q:
+    """Return the condition matching rows which follow the position given by key values."""
+    condition = None  # rows with all the keys equal don't follow the position
+    for (field, descending), value in reversed(list(zip(keys, values))):
+        if value is None:
+            equal = Q(**{f"{field}__isnull": True})
+            after = Q(**{f"{field}__isnull": False}) if descending else None
+        else:
+            equal = Q(**{field: value})
+            if descending:
+                after = Q(**{f"{field}__lt": value})
+            else:
+                after = Q(**{f"{field}__gt": value}) | Q(**{f"{field}__isnull": True})
+        if condition is not None:
+            after = equal & condition if after is None else after | (equal & condition)
+        condition = after
+    return Q(pk__in=[]) if condition is None else condition
+
+
+def key_value(instance, field: str):
+    """Return the value of a key for an instance, following relations like `profile__name`."""
+    value = instance
+    for name in field.split("__"):
+        if value is None:
+            break
+        value = getattr(value, name)
+    return value.pk if isinstance(value, Model) else value
+
+
+class KeysetPagination(BasePagination):
+    """
+    This class paginates lists by the position of the last row of a page instead of
+    an offset, so every page costs the same no matter how deep it is, and rows don't
+    get skipped or repeated when the list changes between requests.
+
+    A position consists of the values of all ordering fields of a row, the ordering
+    is taken from the queryset after filtering (e.g. by OrderingFilter), and the
+    primary key is added to it to break ties. Positions are passed in opaque
+    `cursor` query parameters of the `next` and `previous` links.
+
+    The total number of rows is only returned as `count` if the client asks for it
+    with `count=true`. PostgreSQL estimates it from the query plan, the rows are only
+    counted exactly if the estimate is below `exact_count_threshold`.
+
+    Attributes
+    --------------
+    page_size : int
+        number of rows on a page by default
+    page_size_query_param : str
+        query parameter of the client's page size
+    max_page_size : int
+        upper limit of the page size
+    exact_count_threshold : int
+        row estimates below this number are replaced by exact counts
+
+    """
+
+    page_size = 25
+    page_size_query_param = "page_size"
+    max_page_size = 100
+    cursor_query_param = "cursor"
+    count_query_param = "count"
+    exact_count_threshold = 10000
+    invalid_cursor_message = _("Invalid cursor")
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.count = self.get_count(queryset) if self.count_requested(request) else None
+        self.page_size = self.get_page_size(request)
+        self.keys = ordering_keys(queryset)
+
+        reverse, values = self.decode_cursor(request)
+        keys = [(field, descending != reverse) for field, descending in self.keys]
+        queryset = order_by_keys(queryset, keys)
+        if values is not None:
+            queryset = queryset.filter(keyset_condition(keys, values))
+
+        page = list(queryset[: self.page_size + 1])
+        has_more = len(page) > self.page_size
+        page = page[: self.page_size]
+        if reverse:
+            page.reverse()
+            self.has_next, self.has_previous = values is not None, has_more
+        else:
+            self.has_next, self.has_previous = has_more, values is not None
+        self.page = page
+        return page
+
+    def get_paginated_response(self, data):
+        response = {"next": self.get_next_link(), "previous": self.get_previous_link()}
+        if self.count is not None:
+            response["count"] = self.count
+        response["results"] = data
+        return Response(response)
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "properties": {
+                "next": {"type": "string", "nullable": True},
+                "previous": {"type": "string", "nullable": True},
+                "count": {"type": "integer"},
+                "results": schema,
+            },
+        }
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                "name": self.cursor_query_param,
+                "required": False,
+                "in": "query",
+                "description": "The pagination cursor value.",
+                "schema": {"type": "string"},
+            },
+            {
+                "name": self.page_size_query_param,
+                "required": False,
+                "in": "query",
+                "description": "Number of results to return per page.",
+                "schema": {"type": "integer"},
+            },
+            {
+                "name": self.count_query_param,
+                "required": False,
+                "in": "query",
+                "description": "Return an estimated total number of results.",
+                "schema": {"type": "boolean"},
+            },
+        ]
+
+    def get_page_size(self, request) -> int:
+        """Return the page size asked by the client, capped by max_page_size."""
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            page_size = self.page_size
+        return min(max(page_size, 1), self.max_page_size)
+
+    def count_requested(self, request) -> bool:
+        """Return True if the client asked for the total number of rows."""
+        return request.query_params.get(self.count_query_param, "").lower() in TRUE_VALUES
+
+    def get_count(self, queryset: QuerySet) -> int:
+        """Return the number of rows, estimated on PostgreSQL unless the table is small."""
+        queryset = queryset.order_by()
+        if connections[queryset.db].vendor == "postgresql":
+            plan = json.loads(queryset.explain(format="json"))
+            estimate = plan[0]["Plan"]["Plan Rows"]
+            if estimate >= self.exact_count_threshold:
+                return estimate
+        return queryset.count()
+
+    def get_next_link(self) -> str:
+        if not self.has_next:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self) -> str:
+        if not self.has_previous:
+            return None
+        if not self.page:  # a page past the end, go back from its start
+            return remove_query_param(self.request.build_absolute_uri(), self.cursor_query_param)
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def encode_cursor(self, instance, reverse: bool) -> str:
+        """Return the url of the page following (or preceding) the instance."""
+        cursor = {
+            "k": [field for field, _ in self.keys],
+            "v": [key_value(instance, field) for field, _ in self.keys],
+        }
+        if reverse:
+            cursor["r"] = 1
+        # Dates and times are kept as strings with full precision.
+        encoded = b64encode(json.dumps(cursor, default=str).encode()).decode()
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, encoded)
+
+    def decode_cursor(self, request) -> tuple[bool, list]:
+        """Return the direction and key values of the cursor, or (False, None) without one."""
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return False, None
+        try:
+            cursor = json.loads(b64decode(encoded.encode(), validate=True))
+            fields, values = cursor["k"], cursor["v"]
+            reverse = bool(cursor.get("r"))
+        except (TypeError, KeyError, ValueError, Base64Error):
+            raise NotFound(self.invalid_cursor_message)
+        # A cursor of a different ordering (e.g. another `ordering` parameter) is stale.
+        if fields != [field for field, _ in self.keys] or len(values) != len(fields):
+            raise NotFound(self.invalid_cursor_message)
+        return reverse, values
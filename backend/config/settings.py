@@ -48,6 +48,7 @@ INSTALLED_APPS = [
     "phonenumber_field",
     "storages",
     "taggit",
+    "versatileimagefield",
     # Custom apps
     "apps.accounts",
     "apps.vacancies",
@@ -133,10 +134,10 @@ REST_FRAMEWORK = {
         "anon": "1/second",
         "user": "10/second",
     },
-    "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
-    ),
+    "DEFAULT_AUTHENTICATION_CLASSES": ("apps.accounts.authentication.CachedJWTAuthentication",),
     "TEST_REQUEST_DEFAULT_FORMAT": "json",
+    # List endpoints without their own paginator are paginated by position as well.
+    "DEFAULT_PAGINATION_CLASS": "base.pagination.KeysetPagination",
 }
 
 SIMPLE_JWT = {
@@ -146,6 +147,31 @@ SIMPLE_JWT = {
 }
 
 AUTH_USER_MODEL = "accounts.User"
+# Authenticated users are cached for AUTH_USER_CACHE_TIMEOUT seconds, see CachedJWTAuthentication.
+AUTH_USER_CACHE_TIMEOUT = int(os.environ.get("AUTH_USER_CACHE_TIMEOUT", 60))
+# Bulk provisioned users are created in chunks of USER_PROVISION_CHUNK_SIZE, their
+# passwords are hashed by USER_PROVISION_PROCESSES processes (0 means one per CPU).
+USER_PROVISION_CHUNK_SIZE = int(os.environ.get("USER_PROVISION_CHUNK_SIZE", 1000))
+USER_PROVISION_PROCESSES = int(os.environ.get("USER_PROVISION_PROCESSES", 0))
+# Only one verification email per user is queued within VERIFICATION_EMAIL_WINDOW seconds.
+VERIFICATION_EMAIL_WINDOW = int(os.environ.get("VERIFICATION_EMAIL_WINDOW", 10 * 60))
+# Imported candidates are saved in chunks of CANDIDATE_IMPORT_CHUNK_SIZE rows.
+CANDIDATE_IMPORT_CHUNK_SIZE = int(os.environ.get("CANDIDATE_IMPORT_CHUNK_SIZE", 1000))
+# Exported rows are fetched from the database in batches of EXPORT_CHUNK_SIZE.
+EXPORT_CHUNK_SIZE = int(os.environ.get("EXPORT_CHUNK_SIZE", 2000))
+
+# Cache is shared by all processes through Redis, each process keeps its own otherwise.
+if os.environ.get("REDIS_URL"):
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": os.environ.get("REDIS_CACHE_URL") or os.environ.get("REDIS_URL"),
+        }
+    }
+else:
+    CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+# Responses of read APIs are cached for RESPONSE_CACHE_TIMEOUT seconds, see base.cache.
+RESPONSE_CACHE_TIMEOUT = int(os.environ.get("RESPONSE_CACHE_TIMEOUT", 5 * 60))
 
 # Internationalization
 # https://docs.djangoproject.com/en/4.1/topics/i18n/
@@ -186,6 +212,22 @@ else:
     # For using media on the server, additional server configuration is required.
     MEDIA_ROOT = os.path.join(BASE_DIR, "mediafiles")
 
+# Sized images are never created while serving requests. Avatar renditions of
+# AVATAR_RENDITION_KEY_SET are created by a Celery task right after upload.
+VERSATILEIMAGEFIELD_SETTINGS = {"create_images_on_demand": False}
+VERSATILEIMAGEFIELD_RENDITION_KEY_SETS = {
+    "avatar": [
+        ("full_size", "url"),
+        ("medium", "crop__256x256"),
+        ("thumbnail", "crop__64x64"),
+    ],
+}
+AVATAR_RENDITION_KEY_SET = "avatar"
+# Deleted files are removed from the storage in batches of STORAGE_PURGE_BATCH_SIZE by a
+# task started STORAGE_PURGE_DELAY seconds after the first deletion, see StorageDeletion.
+STORAGE_PURGE_BATCH_SIZE = int(os.environ.get("STORAGE_PURGE_BATCH_SIZE", 1000))
+STORAGE_PURGE_DELAY = int(os.environ.get("STORAGE_PURGE_DELAY", 30))
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/4.1/ref/settings/#default-auto-field
 
@@ -215,6 +257,33 @@ EMAIL_HOST = os.environ.get("EMAIL_HOST")
 EMAIL_PORT = os.environ.get("EMAIL_PORT")
 EMAIL_HOST_USER = os.environ.get("EMAIL_HOST_USER")
 EMAIL_HOST_PASSWORD = os.environ.get("EMAIL_HOST_PASSWORD")
+# Letters are delivered over one connection in groups of EMAIL_BATCH_SIZE messages,
+# set EMAIL_BATCHED_DELIVERY to NO to open a new connection for every recipient.
+EMAIL_BATCHED_DELIVERY = os.environ.get("EMAIL_BATCHED_DELIVERY", "YES") == "YES"
+EMAIL_BATCH_SIZE = int(os.environ.get("EMAIL_BATCH_SIZE", 100))
+# Letters are split into chunks of EMAIL_CHUNK_SIZE recipients, delivered by separate tasks.
+EMAIL_CHUNK_SIZE = int(os.environ.get("EMAIL_CHUNK_SIZE", 500))
+# Number of compiled email templates (subjects and bodies) kept in memory per process.
+EMAIL_TEMPLATE_CACHE_SIZE = int(os.environ.get("EMAIL_TEMPLATE_CACHE_SIZE", 128))
+# Outgoing messages are limited to EMAIL_RATE_LIMIT per second (0 disables the limit) with
+# bursts of up to EMAIL_RATE_LIMIT_BURST messages. The limit is shared by all workers through
+# Redis (REDIS_URL). Limits for particular sender domains are set as "domain=rate,...".
+# Verification and password reset emails take from the same limit as letters.
+EMAIL_RATE_LIMIT = float(os.environ.get("EMAIL_RATE_LIMIT", 0))
+EMAIL_RATE_LIMIT_BURST = int(os.environ.get("EMAIL_RATE_LIMIT_BURST", 20))
+EMAIL_DOMAIN_RATE_LIMITS = {
+    domain.strip().lower(): float(rate)
+    for domain, rate in (
+        item.split("=")
+        for item in os.environ.get("EMAIL_DOMAIN_RATE_LIMITS", "").split(",")
+        if item
+    )
+}
+EMAIL_RATE_LIMIT_REDIS_URL = os.environ.get("REDIS_URL")
+# Backend used to deliver letters, set it to "apps.emails.backends.AsyncSMTPEmailBackend" to
+# keep EMAIL_ASYNC_CONCURRENCY SMTP sessions per worker. Defaults to EMAIL_BACKEND.
+EMAIL_BULK_BACKEND = os.environ.get("EMAIL_BULK_BACKEND") or None
+EMAIL_ASYNC_CONCURRENCY = int(os.environ.get("EMAIL_ASYNC_CONCURRENCY", 4))
 
 # Celery
 CELERY_BROKER_URL = os.environ.get("REDIS_URL")
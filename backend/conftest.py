@@ -0,0 +1,10 @@
+import pytest
+from django.core.cache import cache
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """Cached responses, users and counters shouldn't leak between tests."""
+    cache.clear()
+    yield
+    cache.clear()